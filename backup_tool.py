@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Ferramentas para os backups XLSX exportados pelo app (Produtos, Clientes, Pedidos)
+
+Exemplos:
+    python backup_tool.py validate backups/ --jobs 4
+    python backup_tool.py generate --profile huge --seed 7 -o loja_grande.xlsx
+    python backup_tool.py bench --profile small --profile medium --dir bench/
+    python backup_tool.py convert backup.xlsx loja.db
+    python backup_tool.py export loja.db -o backup.xlsx
+    python backup_tool.py diff backup_antigo.xlsx backup_novo.xlsx -o delta.xlsx
+    python backup_tool.py report loja.db --rollups loja_series.json --monthly
+    python backup_tool.py merge celular1.xlsx celular2.xlsx celular3.xlsx -o loja.xlsx
+"""
+
+import argparse
+import datetime
+import json
+import os
+import sys
+
+from backup_tools.convert import convert
+from backup_tools.diff import diff_backups
+from backup_tools.export import export_database
+from backup_tools.generate import PROFILES, generate, measure_read
+from backup_tools.merge import merge_backups
+from backup_tools.report import Rollups, build_report, open_database
+from backup_tools.validate import validate_many
+
+
+def cmd_validate(args):
+    """Valida um ou mais backups (arquivos ou pastas)"""
+    total = 0
+    failed = 0
+    for report in validate_many(args.paths, jobs=args.jobs):
+        total += 1
+        if report.ok:
+            rows = ', '.join(f"{sheet.name}: {sheet.rows}" for sheet in report.sheets)
+            print(f"✅ {report.path} ({rows})")
+            continue
+        failed += 1
+        print(f"❌ {report.path} ({report.total_errors} erro(s))")
+        for error in report.errors:
+            print(f"   ⚠️ {error}")
+        for sheet in report.sheets:
+            for detail in sheet.details:
+                print(f"   ⚠️ {sheet.name}: {detail}")
+            hidden = sheet.errors - len(sheet.details)
+            if hidden > 0:
+                print(f"   ... mais {hidden} erro(s) em {sheet.name}")
+
+    print(f"\n📋 {total} arquivo(s) validado(s), {failed} com problemas")
+    return failed == 0 and total > 0
+
+
+def _print_summary(summary):
+    print(f"✅ {summary['path']} ({summary['profile']}, semente {summary['seed']})")
+    print(f"   💾 {summary['file_bytes']:,} bytes em {summary['seconds']:.2f}s")
+    for name, sheet in summary['sheets'].items():
+        print(f"   📋 {name}: {sheet['rows']:,} linhas, {sheet['xml_bytes']:,} bytes de XML")
+
+
+def cmd_generate(args):
+    """Gera um backup sintético do perfil escolhido"""
+    summary = generate(args.output, PROFILES[args.profile], args.seed)
+    _print_summary(summary)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+    return True
+
+
+def cmd_bench(args):
+    """Gera os perfis escolhidos e mede a leitura em streaming de cada um"""
+    os.makedirs(args.dir, exist_ok=True)
+    results = []
+    for name in args.profile or list(PROFILES):
+        path = os.path.join(args.dir, f"backup_{name}_{args.seed}.xlsx")
+        print(f"🏭 Gerando perfil {name}...")
+        summary = generate(path, PROFILES[name], args.seed)
+        _print_summary(summary)
+        summary['read'] = measure_read(path)
+        for sheet, read in summary['read'].items():
+            print(f"   ⏱️ Leitura {sheet}: {read['rows_per_second']:,.0f} linhas/s")
+        results.append(summary)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+    return True
+
+
+def cmd_convert(args):
+    """Converte um backup para SQLite com o esquema do app"""
+    print(f"📁 Convertendo {args.backup} -> {args.database}...")
+    summary = convert(args.backup, args.database, indexes=not args.no_indexes,
+                      overwrite=args.force)
+    print(f"   📦 Produtos: {summary['products']:,}")
+    print(f"   👥 Clientes: {summary['customers']:,}")
+    print(f"   📋 Pedidos: {summary['orders']:,} ({summary['order_items']:,} itens)")
+    for message in summary['skipped']:
+        print(f"   ⚠️ {message}")
+    hidden = summary['skipped_count'] - len(summary['skipped'])
+    if hidden > 0:
+        print(f"   ... mais {hidden} linha(s) descartada(s)")
+    print(f"✅ {args.database} ({summary['db_bytes']:,} bytes) em {summary['seconds']:.2f}s")
+    return True
+
+
+def cmd_export(args):
+    """Exporta um banco SQLite para um backup XLSX importável pelo app"""
+    print(f"📁 Exportando {args.database} -> {args.output}...")
+    summary = export_database(args.database, args.output)
+    print(f"   📦 Produtos: {summary['products']:,}")
+    print(f"   👥 Clientes: {summary['customers']:,}")
+    print(f"   📋 Pedidos: {summary['orders']:,} ({summary['order_items']:,} itens, "
+          f"{summary['order_rows']:,} linhas)")
+    print(f"   🔤 {summary['shared_strings']:,} texto(s) compartilhado(s) em "
+          f"{summary['string_refs']:,} célula(s)")
+    print(f"✅ {args.output} ({summary['file_bytes']:,} bytes) em {summary['seconds']:.2f}s")
+    return True
+
+
+def cmd_diff(args):
+    """Compara dois backups e, opcionalmente, grava o delta"""
+    report = diff_backups(args.old, args.new, args.output)
+    for sheet in report.sheets:
+        print(f"📋 {sheet.name}: +{len(sheet.added)} ~{len(sheet.changed)} "
+              f"-{len(sheet.removed)} (={sheet.unchanged})")
+        if args.verbose:
+            for label, keys in (('+', sheet.added), ('~', sheet.changed), ('-', sheet.removed)):
+                for key in keys:
+                    print(f"   {label} {key}")
+    if args.output:
+        print(f"💾 Delta salvo em {args.output}")
+    print(f"✅ {report.total} diferença(s) em {report.seconds:.2f}s")
+    return True
+
+
+def _money(value):
+    """R$ no formato da ReportsScreen (1234.5 -> 'R$ 1.234,50')"""
+    text = f"{value:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.')
+    return f"R$ {text}"
+
+
+def _print_figures(label, figures):
+    print(f"{label}: receita {_money(figures.revenue)}, custo {_money(figures.cost)}, "
+          f"lucro {_money(figures.profit)} ({figures.paid_orders:,} de "
+          f"{figures.orders:,} pedido(s) com pagamento)")
+
+
+def cmd_report(args):
+    """Números da tela de relatórios e séries diárias/mensais"""
+    today = None
+    if args.today:
+        today = (datetime.date.fromisoformat(args.today) - datetime.date(1970, 1, 1)).days
+    print(f"📁 Abrindo {args.source}...")
+    connection = open_database(args.source)
+    try:
+        report = build_report(connection, today, args.days, args.top, args.balances)
+        rollups = None
+        if args.rollups or args.daily or args.monthly:
+            rollups = Rollups.load(args.rollups) if args.rollups else Rollups()
+            added_orders, added_items = rollups.update(connection)
+            if args.rollups:
+                rollups.save(args.rollups)
+                print(f"📈 Séries atualizadas: +{added_orders:,} pedido(s), "
+                      f"+{added_items:,} item(ns) ({args.rollups})")
+                if rollups.rebuilt:
+                    print("   ♻️ Linhas já somadas foram editadas: séries refeitas do zero")
+    finally:
+        connection.close()
+
+    _print_figures("💰 Total", report.total)
+    _print_figures(f"📅 Últimos {report.recent_days} dias", report.recent)
+    print(f"🧾 A receber: {_money(report.to_receive)}")
+    print("🏆 Mais vendidos:")
+    for position, product in enumerate(report.top_products, 1):
+        print(f"   {position}º {product['name']}: {product['sold']:,} vendido(s), "
+              f"{_money(product['revenue'])}")
+    if report.balances:
+        print("👥 Saldos por cliente:")
+        for customer in report.balances:
+            print(f"   {customer['name']}: {_money(customer['balance'])} "
+                  f"(total {_money(customer['total'])}, pago {_money(customer['paid'])})")
+    if rollups is not None:
+        series = []
+        if args.daily:
+            series.append(('📆 Por dia', rollups.daily()))
+        if args.monthly:
+            series.append(('🗓️ Por mês', rollups.monthly()))
+        for title, rows in series:
+            print(f"{title}:")
+            for label, values in rows:
+                print(f"   {label}: {int(values['orders']):,} pedido(s), receita "
+                      f"{_money(values['revenue'])}, custo {_money(values['cost'])}")
+
+    if args.json:
+        data = report.to_dict()
+        if rollups is not None:
+            data['daily'] = rollups.daily()
+            data['monthly'] = rollups.monthly()
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+    print(f"✅ Relatório em {report.seconds:.2f}s")
+    return True
+
+
+def cmd_merge(args):
+    """Mescla os backups de vários aparelhos num só, sem duplicar cadastros"""
+    print(f"📁 Mesclando {len(args.backups)} backup(s) -> {args.output}...")
+    summary = merge_backups(args.backups, args.output)
+    print(f"   📦 Produtos: {summary.products_in:,} -> {summary.products_out:,}")
+    print(f"   👥 Clientes: {summary.customers_in:,} -> {summary.customers_out:,}")
+    print(f"   📋 Pedidos: {summary.orders:,} ({summary.order_rows:,} linhas)")
+    for message in summary.renamed:
+        print(f"   ✏️ Nome repetido renomeado: {message}")
+    for message in summary.unresolved:
+        print(f"   ⚠️ Referência não encontrada: {message}")
+    hidden = summary.unresolved_count - len(summary.unresolved)
+    if hidden > 0:
+        print(f"   ... mais {hidden} referência(s) não encontrada(s)")
+    print(f"✅ {args.output} em {summary.seconds:.2f}s")
+    return True
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Ferramentas para os backups XLSX do app")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    validate_parser = commands.add_parser('validate', help="Valida backups antes da importação")
+    validate_parser.add_argument('paths', nargs='+', help="Arquivos .xlsx ou pastas")
+    validate_parser.add_argument('--jobs', type=int, default=None,
+                                 help="Processos em paralelo (padrão: nº de CPUs)")
+
+    generate_parser = commands.add_parser('generate', help="Gera um backup sintético")
+    generate_parser.add_argument('--profile', choices=sorted(PROFILES), default='small')
+    generate_parser.add_argument('--seed', type=int, default=1)
+    generate_parser.add_argument('-o', '--output', required=True, help="Arquivo .xlsx de saída")
+    generate_parser.add_argument('--json', help="Salvar o resumo em JSON")
+
+    bench_parser = commands.add_parser('bench', help="Gera perfis e mede a leitura")
+    bench_parser.add_argument('--profile', action='append', choices=sorted(PROFILES),
+                              help="Perfil(is) a medir (padrão: todos)")
+    bench_parser.add_argument('--seed', type=int, default=1)
+    bench_parser.add_argument('--dir', default='bench_backups', help="Pasta dos arquivos gerados")
+    bench_parser.add_argument('--json', help="Salvar os resultados em JSON")
+
+    convert_parser = commands.add_parser('convert', help="Converte um backup para SQLite")
+    convert_parser.add_argument('backup', help="Arquivo .xlsx exportado pelo app")
+    convert_parser.add_argument('database', help="Arquivo SQLite de saída")
+    convert_parser.add_argument('--force', action='store_true', help="Substituir o banco existente")
+    convert_parser.add_argument('--no-indexes', action='store_true',
+                                help="Não criar índices após a carga")
+
+    export_parser = commands.add_parser('export', help="Exporta um banco SQLite para XLSX")
+    export_parser.add_argument('database', help="Banco SQLite com o esquema do app")
+    export_parser.add_argument('-o', '--output', required=True, help="Backup .xlsx de saída")
+
+    diff_parser = commands.add_parser('diff', help="Compara dois backups")
+    diff_parser.add_argument('old', help="Backup anterior")
+    diff_parser.add_argument('new', help="Backup atual")
+    diff_parser.add_argument('-o', '--output', help="Gravar o backup incremental (delta)")
+    diff_parser.add_argument('-v', '--verbose', action='store_true', help="Listar as chaves")
+
+    report_parser = commands.add_parser('report', help="Relatórios (receita, custo, lucro)")
+    report_parser.add_argument('source', help="Backup .xlsx ou banco SQLite convertido")
+    report_parser.add_argument('--days', type=int, default=30,
+                               help="Janela dos números recentes em dias (padrão: 30)")
+    report_parser.add_argument('--today', help="Data de referência AAAA-MM-DD (padrão: hoje)")
+    report_parser.add_argument('--top', type=int, default=10,
+                               help="Quantos produtos mais vendidos listar (padrão: 10)")
+    report_parser.add_argument('--balances', type=int, default=10,
+                               help="Quantos saldos de cliente listar (padrão: 10)")
+    report_parser.add_argument('--rollups',
+                               help="Arquivo das séries diárias (atualizado por incremento)")
+    report_parser.add_argument('--daily', action='store_true', help="Mostrar a série diária")
+    report_parser.add_argument('--monthly', action='store_true', help="Mostrar a série mensal")
+    report_parser.add_argument('--json', help="Salvar o relatório em JSON")
+
+    merge_parser = commands.add_parser('merge', help="Mescla backups de vários aparelhos")
+    merge_parser.add_argument('backups', nargs='+',
+                              help="Backups .xlsx (o primeiro vence quando há conflito)")
+    merge_parser.add_argument('-o', '--output', required=True, help="Backup mesclado (.xlsx)")
+
+    return parser.parse_args(argv)
+
+
+COMMANDS = {
+    'validate': cmd_validate,
+    'generate': cmd_generate,
+    'bench': cmd_bench,
+    'convert': cmd_convert,
+    'export': cmd_export,
+    'diff': cmd_diff,
+    'report': cmd_report,
+    'merge': cmd_merge,
+}
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        success = COMMANDS[args.command](args)
+    except Exception as e:
+        print(f"❌ Erro: {e}")
+        success = False
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,7 @@
+"""
+Ferramentas de estação de trabalho para os backups XLSX do app
+(validação, geração, conversão de e para SQLite, diff, relatórios e mesclagem)
+"""
+
+from .schema import CUSTOMERS, ORDERS, PRODUCTS, SHEETS, SHEETS_BY_NAME
+from .xlsx import XlsxError, XlsxReader
@@ -0,0 +1,250 @@
+"""
+Conversão de backup XLSX para um banco SQLite com o esquema do app
+
+As abas são lidas em streaming e inseridas com executemany em lotes, numa
+única transação, com synchronous=OFF; os índices só são criados depois da
+carga. O resultado serve para análise offline e como banco pré-carregado.
+"""
+
+import os
+import sqlite3
+import time
+
+from .schema import (CREATE_TABLES, CUSTOMERS, DEFAULT_ORDER_STATUS, ORDERS, PRODUCTS,
+                     to_number)
+from .xlsx import XlsxReader
+
+# Linhas por executemany
+BATCH_SIZE = 5000
+
+# Índices criados após a carga (consultas de relatório e junções por nome)
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_products_name ON products (name)",
+    "CREATE INDEX IF NOT EXISTS idx_customers_name ON customers (name)",
+    "CREATE INDEX IF NOT EXISTS idx_orders_customer ON orders (customer_id)",
+    "CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items (order_id)",
+    "CREATE INDEX IF NOT EXISTS idx_order_items_product ON order_items (product_id)",
+]
+
+INSERT_PRODUCT = """
+    INSERT INTO products (id, name, quantity, cost_price, created_at, updated_at)
+    VALUES (?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP), COALESCE(?, CURRENT_TIMESTAMP))
+"""
+INSERT_CUSTOMER = """
+    INSERT INTO customers (id, name, phone, email, address, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP), COALESCE(?, CURRENT_TIMESTAMP))
+"""
+INSERT_ORDER = """
+    INSERT INTO orders (id, customer_id, status, notes, total_amount, paid_amount,
+                        created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP), COALESCE(?, CURRENT_TIMESTAMP))
+"""
+INSERT_ORDER_ITEM = """
+    INSERT INTO order_items (order_id, product_id, quantity, unit_price, total_price,
+                             created_at)
+    VALUES (?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+"""
+
+
+def text(value):
+    return '' if value is None else str(value).strip()
+
+
+def integer(value, default=0):
+    number = to_number(value) if value not in (None, '') else None
+    return int(number) if number is not None else default
+
+
+def real(value, default=0.0):
+    number = to_number(value) if value not in (None, '') else None
+    return number if number is not None else default
+
+
+def iso_date(value):
+    """'31/12/2024' -> '2024-12-31 00:00:00' (None se não for uma data pt-BR)"""
+    parts = text(value).split('/')
+    if len(parts) != 3 or not all(part.isdigit() for part in parts):
+        return None
+    day, month, year = parts
+    return f"{int(year):04d}-{int(month):02d}-{int(day):02d} 00:00:00"
+
+
+# Máximo de linhas descartadas listadas no resumo (as demais só são contadas)
+MAX_SKIPPED = 50
+
+
+def _skip(summary, message):
+    summary['skipped_count'] += 1
+    if len(summary['skipped']) < MAX_SKIPPED:
+        summary['skipped'].append(message)
+
+
+class _Batch:
+    """Acumula linhas e grava com executemany a cada BATCH_SIZE"""
+
+    def __init__(self, connection, sql):
+        self.connection = connection
+        self.sql = sql
+        self.rows = []
+        self.count = 0
+
+    def add(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            self.connection.executemany(self.sql, self.rows)
+            self.count += len(self.rows)
+            self.rows = []
+
+
+def create_schema(connection):
+    for sql in CREATE_TABLES.values():
+        connection.execute(sql)
+
+
+def _load_products(reader, connection, summary):
+    batch = _Batch(connection, INSERT_PRODUCT)
+    ids = {}
+    used = set()
+    next_id = 1
+    for row_number, row in reader.iter_records(PRODUCTS.name):
+        name = text(row.get('Nome'))
+        if not name:
+            _skip(summary, f"Produtos linha {row_number}: nome vazio")
+            continue
+        product_id = integer(row.get('ID'), None)
+        if not product_id or product_id in used:
+            product_id = next_id
+        used.add(product_id)
+        next_id = max(next_id, product_id + 1)
+        ids.setdefault(name, product_id)
+        created = iso_date(row.get('Data de Criação'))
+        batch.add((product_id, name, integer(row.get('Quantidade em Estoque')),
+                   real(row.get('Preço de Custo')), created,
+                   iso_date(row.get('Data de Atualização')) or created))
+    batch.flush()
+    summary['products'] = batch.count
+    return ids
+
+
+def _load_customers(reader, connection, summary):
+    batch = _Batch(connection, INSERT_CUSTOMER)
+    ids = {}
+    used = set()
+    next_id = 1
+    for row_number, row in reader.iter_records(CUSTOMERS.name):
+        name = text(row.get('Nome'))
+        if not name:
+            _skip(summary, f"Clientes linha {row_number}: nome vazio")
+            continue
+        customer_id = integer(row.get('ID'), None)
+        if not customer_id or customer_id in used:
+            customer_id = next_id
+        used.add(customer_id)
+        next_id = max(next_id, customer_id + 1)
+        ids.setdefault(name, customer_id)
+        created = iso_date(row.get('Data de Criação'))
+        batch.add((customer_id, name, text(row.get('Telefone')), text(row.get('Email')),
+                   text(row.get('Endereço')), created,
+                   iso_date(row.get('Data de Atualização')) or created))
+    batch.flush()
+    summary['customers'] = batch.count
+    return ids
+
+
+def _load_orders(reader, connection, product_ids, customer_ids, summary):
+    orders = _Batch(connection, INSERT_ORDER)
+    items = _Batch(connection, INSERT_ORDER_ITEM)
+    seen = set()     # IDs de pedido já inseridos
+    skipped = set()  # Pedidos descartados (cliente desconhecido)
+    for row_number, row in reader.iter_records(ORDERS.name):
+        order_id = integer(row.get('ID do Pedido'), None)
+        if order_id is None or order_id in skipped:
+            continue
+        created = iso_date(row.get('Data do Pedido'))
+        if order_id not in seen:
+            customer_id = customer_ids.get(text(row.get('Cliente')))
+            if customer_id is None:
+                # orders.customer_id é NOT NULL no esquema do app
+                skipped.add(order_id)
+                _skip(summary,
+                      f"Pedido {order_id}: cliente \"{text(row.get('Cliente'))}\" não encontrado")
+                continue
+            seen.add(order_id)
+            orders.add((order_id, customer_id,
+                        text(row.get('Status')) or DEFAULT_ORDER_STATUS,
+                        text(row.get('Observações')), real(row.get('Total do Pedido')),
+                        real(row.get('Valor Pago')), created, created))
+
+        product_name = text(row.get('Produto'))
+        if not product_name or row.get('Quantidade') in (None, ''):
+            continue
+        product_id = product_ids.get(product_name)
+        if product_id is None:
+            _skip(summary,
+                  f"Pedidos linha {row_number}: produto \"{product_name}\" não encontrado")
+            continue
+        items.add((order_id, product_id, integer(row.get('Quantidade')),
+                   real(row.get('Preço Unitário')), real(row.get('Total do Item')), created))
+    orders.flush()
+    items.flush()
+    summary['orders'] = orders.count
+    summary['order_items'] = items.count
+
+
+def load_backup(xlsx_path, connection, summary=None):
+    """
+    Carrega as abas do backup numa conexão com o esquema já criado (uma transação)
+
+    Também serve para bancos em memória (relatórios e mesclagem direto do XLSX).
+    """
+    summary = summary if summary is not None else {'skipped': [], 'skipped_count': 0}
+    with XlsxReader(xlsx_path) as reader:
+        connection.execute("BEGIN")
+        product_ids = _load_products(reader, connection, summary)
+        customer_ids = _load_customers(reader, connection, summary)
+        _load_orders(reader, connection, product_ids, customer_ids, summary)
+        connection.execute("COMMIT")
+    return summary
+
+
+def convert(xlsx_path, db_path, indexes=True, overwrite=False):
+    """Converte um backup para SQLite e retorna o resumo da carga"""
+    if os.path.exists(db_path):
+        if not overwrite:
+            raise FileExistsError(f"{db_path} já existe (use overwrite para substituir)")
+        for suffix in ('', '-wal', '-shm', '-journal'):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+    start = time.perf_counter()
+    summary = {'skipped': [], 'skipped_count': 0}
+    connection = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=OFF")
+        connection.execute("PRAGMA cache_size=-65536")
+        connection.execute("PRAGMA temp_store=MEMORY")
+        create_schema(connection)
+
+        load_backup(xlsx_path, connection, summary)
+
+        if indexes:
+            connection.execute("BEGIN")
+            for sql in INDEXES:
+                connection.execute(sql)
+            connection.execute("COMMIT")
+        connection.execute("ANALYZE")
+
+        # Volta ao modo padrão: um único arquivo .db, pronto para ir ao aparelho
+        connection.execute("PRAGMA synchronous=FULL")
+        connection.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        connection.close()
+
+    summary['seconds'] = time.perf_counter() - start
+    summary['db_bytes'] = os.path.getsize(db_path)
+    return summary
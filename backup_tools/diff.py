@@ -0,0 +1,162 @@
+"""
+Diff por linha entre dois backups e exportação incremental (delta)
+
+Cada aba vira um índice chave -> hash do conteúdo (ID para Produtos e
+Clientes, ID do Pedido para Pedidos). Os hashes das linhas de um mesmo pedido
+são somados, então a ordem das linhas não importa e a memória fica limitada
+ao índice. O delta tem as mesmas abas do backup, só com as linhas incluídas
+ou alteradas, mais a aba Removidos com as chaves que sumiram.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+import hashlib
+import time
+
+from .schema import CUSTOMERS, ORDERS, PRODUCTS, SHEETS
+from .xlsx import XlsxReader, XlsxWriter
+
+# Aba extra do delta (ignorada pela importação do app)
+REMOVED_SHEET = 'Removidos'
+REMOVED_HEADERS = ['Aba', 'Chave']
+
+# Coluna usada como chave de cada aba
+KEY_COLUMNS = {
+    PRODUCTS.name: 'ID',
+    CUSTOMERS.name: 'ID',
+    ORDERS.name: 'ID do Pedido',
+}
+
+_HASH_MASK = (1 << 128) - 1
+
+
+@dataclass
+class SheetDiff:
+    """Chaves incluídas, alteradas e removidas de uma aba"""
+    name: str
+    added: list = field(default_factory=list)
+    changed: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def total(self):
+        return len(self.added) + len(self.changed) + len(self.removed)
+
+
+@dataclass
+class DiffReport:
+    """Resultado do diff entre dois backups"""
+    old_path: str
+    new_path: str
+    sheets: list = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def total(self):
+        return sum(sheet.total for sheet in self.sheets)
+
+
+def _normalize(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def row_key(sheet, record):
+    """Chave da linha: o ID (inteiro) ou, sem ID, o nome"""
+    value = record.get(KEY_COLUMNS[sheet.name])
+    text = _normalize(value)
+    if text:
+        try:
+            return int(float(text.replace(',', '.')))
+        except ValueError:
+            return text
+    return _normalize(record.get('Nome')) or None
+
+
+def row_digest(sheet, record):
+    """Hash de 128 bits do conteúdo da linha (colunas do esquema, em ordem fixa)"""
+    payload = '\x1f'.join(_normalize(record.get(header)) for header in sheet.headers)
+    return int.from_bytes(hashlib.blake2b(payload.encode('utf-8'), digest_size=16).digest(),
+                          'big')
+
+
+def index_sheet(reader, sheet):
+    """Índice chave -> soma dos hashes das linhas com essa chave"""
+    index = {}
+    if sheet.name not in reader.sheet_names:
+        return index
+    for _, record in reader.iter_records(sheet.name):
+        key = row_key(sheet, record)
+        if key is None:
+            continue
+        index[key] = (index.get(key, 0) + row_digest(sheet, record)) & _HASH_MASK
+    return index
+
+
+def index_backup(path):
+    """Índices de todas as abas de um backup"""
+    with XlsxReader(path) as reader:
+        return {sheet.name: index_sheet(reader, sheet) for sheet in SHEETS}
+
+
+def _sort_key(key):
+    return (isinstance(key, str), key)
+
+
+def diff_sheet(sheet, old_index, new_index):
+    result = SheetDiff(sheet.name)
+    for key, digest in new_index.items():
+        previous = old_index.get(key)
+        if previous is None:
+            result.added.append(key)
+        elif previous != digest:
+            result.changed.append(key)
+        else:
+            result.unchanged += 1
+    result.removed = [key for key in old_index if key not in new_index]
+    for keys in (result.added, result.changed, result.removed):
+        keys.sort(key=_sort_key)
+    return result
+
+
+def write_delta(reader, report, path):
+    """Copia do backup novo só as linhas incluídas/alteradas, em streaming"""
+    with XlsxWriter(path) as writer:
+        for sheet, sheet_diff in zip(SHEETS, report.sheets):
+            wanted = set(sheet_diff.added) | set(sheet_diff.changed)
+            with writer.sheet(sheet.name, sheet.headers) as out:
+                if not wanted or sheet.name not in reader.sheet_names:
+                    continue
+                for _, record in reader.iter_records(sheet.name):
+                    if row_key(sheet, record) in wanted:
+                        out.write_row([record.get(header) for header in sheet.headers])
+        with writer.sheet(REMOVED_SHEET, REMOVED_HEADERS) as out:
+            for sheet_diff in report.sheets:
+                for key in sheet_diff.removed:
+                    out.write_row([sheet_diff.name, key])
+
+
+def diff_backups(old_path, new_path, delta_path=None, parallel=True):
+    """Compara dois backups; se delta_path for dado, grava o backup incremental"""
+    start = time.perf_counter()
+    report = DiffReport(old_path, new_path)
+    if parallel:
+        # Os dois arquivos são indexados ao mesmo tempo, um processo cada
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            old_indexes, new_indexes = executor.map(index_backup, [old_path, new_path])
+    else:
+        old_indexes, new_indexes = index_backup(old_path), index_backup(new_path)
+    for sheet in SHEETS:
+        report.sheets.append(diff_sheet(sheet, old_indexes[sheet.name],
+                                        new_indexes[sheet.name]))
+    del old_indexes, new_indexes
+
+    if delta_path:
+        with XlsxReader(new_path) as reader:
+            write_delta(reader, report, delta_path)
+    report.seconds = time.perf_counter() - start
+    return report
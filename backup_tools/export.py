@@ -0,0 +1,108 @@
+"""
+Exportação de um banco SQLite (esquema do app) para um backup XLSX
+
+Gera as abas Produtos, Clientes e Pedidos exatamente como ExcelService.js,
+para semear aparelhos novos com a importação do app. As tabelas são lidas
+com cursores em blocos de FETCH_ROWS e cada linha vai direto para o zip (o
+SheetWriter grava a cada FLUSH_ROWS); só a tabela de strings compartilhadas,
+que tem tamanho máximo, fica em memória.
+"""
+
+import os
+import sqlite3
+import time
+
+from .schema import CUSTOMERS, ORDERS, PRODUCTS
+from .xlsx import SharedStringsXlsxWriter
+
+# Linhas buscadas por fetchmany
+FETCH_ROWS = 5000
+
+# Datas no formato de toLocaleDateString('pt-BR'), feitas pelo próprio SQLite
+SELECT_PRODUCTS = """
+    SELECT id, name, quantity, cost_price,
+           strftime('%d/%m/%Y', created_at), strftime('%d/%m/%Y', updated_at)
+    FROM products ORDER BY id
+"""
+SELECT_CUSTOMERS = """
+    SELECT id, name, phone, email, address,
+           strftime('%d/%m/%Y', created_at), strftime('%d/%m/%Y', updated_at)
+    FROM customers ORDER BY id
+"""
+# Uma linha por item; pedidos sem itens vêm uma vez, com o item nulo
+SELECT_ORDER_ROWS = """
+    SELECT o.id, c.name, o.status, o.total_amount, o.paid_amount, o.notes,
+           strftime('%d/%m/%Y', o.created_at),
+           oi.id, p.name, oi.quantity, oi.unit_price, oi.total_price, p.cost_price
+    FROM orders o
+    LEFT JOIN customers c ON c.id = o.customer_id
+    LEFT JOIN order_items oi ON oi.order_id = o.id
+    LEFT JOIN products p ON p.id = oi.product_id
+    ORDER BY o.id, oi.id
+"""
+
+
+def _rows(connection, sql):
+    """Linhas da consulta em blocos, sem materializar o resultado"""
+    cursor = connection.cursor()
+    cursor.arraysize = FETCH_ROWS
+    cursor.execute(sql)
+    try:
+        while True:
+            rows = cursor.fetchmany()
+            if not rows:
+                break
+            yield from rows
+    finally:
+        cursor.close()
+
+
+def _write_orders(connection, sheet):
+    orders = 0
+    items = 0
+    current = None
+    position = 0
+    for (order_id, customer, status, total, paid, notes, date,
+         item_id, product, quantity, unit_price, item_total, cost) in _rows(connection,
+                                                                          SELECT_ORDER_ROWS):
+        if order_id != current:
+            current = order_id
+            position = 0
+            orders += 1
+        row = [order_id, customer or 'Cliente não informado', status, total, paid,
+               (total or 0) - (paid or 0), notes or '', date]
+        if item_id is not None:
+            position += 1
+            items += 1
+            row += [position, product, quantity, unit_price, item_total, cost,
+                    cost * quantity if cost is not None and quantity is not None else None]
+        sheet.write_row(row)
+    return orders, items
+
+
+def export_database(db_path, xlsx_path):
+    """Exporta o banco para um backup XLSX importável pelo app e retorna o resumo"""
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"{db_path} não encontrado")
+    start = time.perf_counter()
+    summary = {'path': xlsx_path}
+    connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        with SharedStringsXlsxWriter(xlsx_path) as writer:
+            for sheet_info, sql, key in ((PRODUCTS, SELECT_PRODUCTS, 'products'),
+                                         (CUSTOMERS, SELECT_CUSTOMERS, 'customers')):
+                with writer.sheet(sheet_info.name, sheet_info.headers) as sheet:
+                    for row in _rows(connection, sql):
+                        sheet.write_row(row)
+                summary[key] = sheet.rows - 1
+            with writer.sheet(ORDERS.name, ORDERS.headers) as sheet:
+                summary['orders'], summary['order_items'] = _write_orders(connection, sheet)
+            summary['order_rows'] = sheet.rows - 1
+            strings = writer.strings
+        summary['shared_strings'] = len(strings.table)
+        summary['string_refs'] = strings.count
+    finally:
+        connection.close()
+    summary['seconds'] = time.perf_counter() - start
+    summary['file_bytes'] = os.path.getsize(xlsx_path)
+    return summary
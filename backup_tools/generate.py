@@ -0,0 +1,148 @@
+"""
+Gerador de backups sintéticos grandes (Produtos, Clientes, Pedidos)
+
+Os dados de cada produto e cliente são derivados do índice e da semente, então
+os pedidos podem referenciá-los sem manter listas em memória: o arquivo é
+escrito em streaming com memória constante e é reproduzível pela semente.
+"""
+
+from dataclasses import dataclass
+import datetime
+import os
+import random
+import time
+
+from .schema import CUSTOMERS, ORDER_STATUSES, ORDERS, PRODUCTS
+from .xlsx import XlsxReader, XlsxWriter
+
+
+@dataclass(frozen=True)
+class Profile:
+    """Tamanho de uma loja sintética"""
+    name: str
+    products: int
+    customers: int
+    order_items: int
+    max_items_per_order: int = 5
+
+
+# Perfis de benchmark da importação
+PROFILES = {
+    'small': Profile('small', 500, 200, 2_000),
+    'medium': Profile('medium', 5_000, 2_000, 20_000),
+    'huge': Profile('huge', 50_000, 20_000, 200_000),
+}
+
+PRODUCT_TYPES = ['Sutiã', 'Calcinha', 'Camisola', 'Pijama', 'Body', 'Cueca', 'Meia',
+                 'Short Doll', 'Robe', 'Top', 'Conjunto', 'Espartilho']
+PRODUCT_STYLES = ['Renda', 'Algodão', 'Microfibra', 'Cetim', 'Tule', 'Seda', 'Básico',
+                  'Push-up', 'Sem Costura', 'Estampado']
+PRODUCT_SIZES = ['PP', 'P', 'M', 'G', 'GG', 'XG']
+FIRST_NAMES = ['Ana', 'Bruna', 'Carla', 'Daniela', 'Eduarda', 'Fernanda', 'Gabriela',
+               'Helena', 'Isabela', 'Júlia', 'Larissa', 'Mariana', 'Natália', 'Patrícia',
+               'Renata', 'Sofia', 'Tatiane', 'Vanessa', 'João', 'Marcos']
+LAST_NAMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Lima', 'Pereira', 'Costa',
+              'Ferreira', 'Almeida', 'Ribeiro', 'Carvalho', 'Gomes', 'Araújo', 'Rocha']
+STREETS = ['Rua das Flores', 'Av. Brasil', 'Rua São João', 'Rua XV de Novembro',
+           'Av. Paulista', 'Rua da Paz', 'Rua Sete de Setembro']
+
+BASE_DATE = datetime.date(2024, 1, 1)
+
+
+_KINDS = {'p': 1, 'c': 2, 'o': 3}
+
+
+def _rng(seed, kind, index):
+    """Gerador determinístico para um registro (independe da ordem de geração)"""
+    # Semente inteira: bem mais barata de inicializar que uma string
+    return random.Random((seed << 40) | (_KINDS[kind] << 36) | index)
+
+
+def _date(rng, days=365):
+    return (BASE_DATE + datetime.timedelta(days=rng.randrange(days))).strftime('%d/%m/%Y')
+
+
+def product(seed, index):
+    """Linha de produto (1-based); o nome é único pelo código"""
+    rng = _rng(seed, 'p', index)
+    name = (f"{rng.choice(PRODUCT_TYPES)} {rng.choice(PRODUCT_STYLES)} "
+            f"{rng.choice(PRODUCT_SIZES)} #{index:06d}")
+    cost = round(rng.uniform(5, 150), 2)
+    created = _date(rng)
+    return [index, name, rng.randrange(0, 200), cost, created, created]
+
+
+def customer(seed, index):
+    """Linha de cliente (1-based); o nome é único pelo sufixo numérico"""
+    rng = _rng(seed, 'c', index)
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    name = f"{first} {last} {index}"
+    phone = f"(11) 9{rng.randrange(10_000_000, 99_999_999)}"
+    email = f"{first.lower()}.{last.lower()}{index}@exemplo.com"
+    address = f"{rng.choice(STREETS)}, {rng.randrange(1, 3000)}"
+    created = _date(rng)
+    return [index, name, phone, email, address, created, created]
+
+
+def iter_order_rows(seed, profile):
+    """Linhas da aba Pedidos (uma por item) até atingir profile.order_items"""
+    rng = _rng(seed, 'o', 0)
+    emitted = 0
+    order_id = 0
+    while emitted < profile.order_items:
+        order_id += 1
+        count = min(rng.randint(1, profile.max_items_per_order), profile.order_items - emitted)
+        customer_name = customer(seed, rng.randint(1, profile.customers))[1]
+        items = []
+        for _ in range(count):
+            item = product(seed, rng.randint(1, profile.products))
+            quantity = rng.randint(1, 4)
+            unit_price = round(item[3] * rng.uniform(1.6, 2.4), 2)
+            items.append((item[1], quantity, unit_price, item[3]))
+        total = round(sum(q * price for _, q, price, _ in items), 2)
+        status = rng.choice(ORDER_STATUSES)
+        paid = total if status == 'paid' else round(total * rng.choice([0, 0, 0.3, 0.5]), 2)
+        notes = rng.choice(['', '', 'Entregar à tarde', 'Presente', 'Trocar tamanho'])
+        date = _date(rng)
+        for position, (name, quantity, unit_price, cost) in enumerate(items, 1):
+            yield [order_id, customer_name, status, total, paid, round(total - paid, 2),
+                   notes, date, position, name, quantity, unit_price,
+                   round(quantity * unit_price, 2), cost, round(cost * quantity, 2)]
+        emitted += count
+
+
+def generate(path, profile, seed=1):
+    """Escreve o backup sintético e retorna o resumo (linhas e bytes por aba)"""
+    start = time.perf_counter()
+    with XlsxWriter(path) as writer:
+        with writer.sheet(PRODUCTS.name, PRODUCTS.headers) as sheet:
+            for index in range(1, profile.products + 1):
+                sheet.write_row(product(seed, index))
+        with writer.sheet(CUSTOMERS.name, CUSTOMERS.headers) as sheet:
+            for index in range(1, profile.customers + 1):
+                sheet.write_row(customer(seed, index))
+        with writer.sheet(ORDERS.name, ORDERS.headers) as sheet:
+            for row in iter_order_rows(seed, profile):
+                sheet.write_row(row)
+    return {
+        'path': path,
+        'profile': profile.name,
+        'seed': seed,
+        'file_bytes': os.path.getsize(path),
+        'seconds': time.perf_counter() - start,
+        'sheets': {name: {'rows': rows, 'xml_bytes': size}
+                   for name, rows, size in writer.sheets},
+    }
+
+
+def measure_read(path):
+    """Tempo de leitura em streaming de cada aba (linhas/s), base para a importação"""
+    results = {}
+    with XlsxReader(path) as reader:
+        for name in reader.sheet_names:
+            start = time.perf_counter()
+            rows = sum(1 for _ in reader.iter_records(name))
+            elapsed = time.perf_counter() - start
+            results[name] = {'rows': rows, 'seconds': elapsed,
+                             'rows_per_second': rows / elapsed if elapsed else 0.0}
+    return results
@@ -0,0 +1,270 @@
+"""
+Mesclagem dos backups de vários aparelhos da mesma loja num só
+
+A importação do app (ExcelServiceImproved.js) só insere linhas, então juntar
+aparelhos duplica clientes e produtos. Aqui cada registro entra em índices
+de hash por chaves normalizadas (nome sem acento/caixa, telefone só com
+dígitos, email minúsculo) e registros que compartilham uma chave viram um
+só (union-find): o custo cresce linearmente com o total de linhas, sem
+comparar backups dois a dois.
+
+Os pedidos referenciam cliente e produto pelo nome (é assim que a importação
+os encontra), então cada pedido é reescrito com o nome do registro
+consolidado e ganha um ID novo, sem colidir com os de outros aparelhos.
+"""
+
+from dataclasses import dataclass, field
+import time
+import unicodedata
+
+from .convert import MAX_SKIPPED, text
+from .schema import CUSTOMERS, ORDERS, PRODUCTS
+from .xlsx import XlsxReader, XlsxWriter
+
+# Telefones com menos dígitos que isso não identificam ninguém
+MIN_PHONE_DIGITS = 8
+
+# Campos completados com o primeiro valor não vazio dos duplicados
+CUSTOMER_FILL = ('Telefone', 'Email', 'Endereço')
+
+
+def fold(value):
+    """Nome para comparação: sem acentos, sem caixa e com espaços normalizados"""
+    decomposed = unicodedata.normalize('NFKD', text(value))
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(stripped.casefold().split())
+
+
+def phone_key(value):
+    """Só os dígitos, sem o código do país (None se curto demais)"""
+    digits = ''.join(char for char in text(value) if char.isdigit())
+    if len(digits) > 11 and digits.startswith('55'):
+        digits = digits[2:]
+    return digits if len(digits) >= MIN_PHONE_DIGITS else None
+
+
+def email_key(value):
+    email = text(value).lower()
+    return email if '@' in email else None
+
+
+def _date_key(value):
+    """'31/12/2024' -> (2024, 12, 31) para comparar datas pt-BR (vazia = mais antiga)"""
+    parts = text(value).split('/')
+    if len(parts) != 3 or not all(part.isdigit() for part in parts):
+        return (0, 0, 0)
+    day, month, year = (int(part) for part in parts)
+    return (year, month, day)
+
+
+class _UnionFind:
+    def __init__(self):
+        self.parent = []
+
+    def add(self):
+        self.parent.append(len(self.parent))
+        return len(self.parent) - 1
+
+    def find(self, item):
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            # O registro visto primeiro continua sendo a raiz (o canônico)
+            if b < a:
+                a, b = b, a
+            self.parent[b] = a
+
+
+@dataclass
+class MergeSummary:
+    """Linhas lidas e geradas pela mesclagem"""
+    sources: list = field(default_factory=list)
+    products_in: int = 0
+    products_out: int = 0
+    customers_in: int = 0
+    customers_out: int = 0
+    orders: int = 0
+    order_rows: int = 0
+    renamed: list = field(default_factory=list)     # Clientes diferentes com o mesmo nome
+    unresolved: list = field(default_factory=list)  # Referências a nomes inexistentes
+    unresolved_count: int = 0
+    seconds: float = 0.0
+
+
+class _Entities:
+    """Registros de uma aba de todos os backups, agrupados pelas chaves"""
+
+    def __init__(self):
+        self.records = []       # (índice do backup, registro)
+        self.groups = _UnionFind()
+        self.index = {}         # (tipo da chave, chave) -> primeiro registro com ela
+        self.names = {}         # nome normalizado -> primeiro registro com ele
+        self.by_name = {}       # (índice do backup, nome exato) -> registro
+        self._by_name_only = []  # (registro, nome) sem outra chave, ligados no fim
+
+    def add(self, source, record, keys):
+        """Registra e une aos registros que já têm alguma das chaves (sem chave: pelo nome)"""
+        position = self.groups.add()
+        self.records.append((source, record))
+        name = fold(record.get('Nome'))
+        self.names.setdefault(name, position)
+        for key in keys:
+            first = self.index.setdefault(key, position)
+            if first != position:
+                self.groups.union(position, first)
+        if not keys:
+            self._by_name_only.append((position, name))
+        # Como o find por nome da importação: o primeiro com o nome vale
+        self.by_name.setdefault((source, text(record.get('Nome'))), position)
+        return position
+
+    def link_names(self):
+        """Registros sem chave própria se juntam ao primeiro com o mesmo nome"""
+        for position, name in self._by_name_only:
+            self.groups.union(position, self.names[name])
+
+    def merged(self):
+        """{raiz: [registros do grupo, na ordem de leitura]} na ordem do primeiro registro"""
+        members = {}
+        for position in range(len(self.records)):
+            members.setdefault(self.groups.find(position), []).append(position)
+        return members
+
+
+def _customer_keys(record):
+    keys = []
+    phone = phone_key(record.get('Telefone'))
+    if phone:
+        keys.append(('phone', phone))
+    email = email_key(record.get('Email'))
+    if email:
+        keys.append(('email', email))
+    # Sem telefone nem email, o nome é a única pista (ver _Entities.link_names)
+    return keys
+
+
+def _product_keys(record):
+    name = fold(record.get('Nome'))
+    return [('name', name)] if name else []
+
+
+def _consolidate_products(entities):
+    """Uma linha por grupo: estoque e custo do registro atualizado por último"""
+    rows = {}
+    for root, members in entities.merged().items():
+        records = [entities.records[position][1] for position in members]
+        latest = max(records, key=lambda record: _date_key(record.get('Data de Atualização')))
+        created = min((record.get('Data de Criação') for record in records
+                       if _date_key(record.get('Data de Criação')) != (0, 0, 0)),
+                      key=_date_key, default=records[0].get('Data de Criação'))
+        rows[root] = {
+            'ID': len(rows) + 1,
+            'Nome': text(records[0].get('Nome')),
+            'Quantidade em Estoque': latest.get('Quantidade em Estoque'),
+            'Preço de Custo': latest.get('Preço de Custo'),
+            'Data de Criação': created,
+            'Data de Atualização': latest.get('Data de Atualização'),
+        }
+    return rows
+
+
+def _consolidate_customers(entities, summary):
+    """Uma linha por grupo, com os contatos vazios completados pelos duplicados"""
+    rows = {}
+    used_names = {}
+    for root, members in entities.merged().items():
+        records = [entities.records[position][1] for position in members]
+        row = {header: records[0].get(header) for header in CUSTOMERS.headers}
+        row['ID'] = len(rows) + 1
+        row['Nome'] = name = text(records[0].get('Nome'))
+        for header in CUSTOMER_FILL:
+            if not text(row.get(header)):
+                row[header] = next((record.get(header) for record in records
+                                    if text(record.get(header))), row.get(header))
+        # A importação acha o cliente pelo nome exato: nomes repetidos de
+        # clientes diferentes ganham um sufixo para os pedidos não se misturarem
+        count = used_names.get(name, 0) + 1
+        used_names[name] = count
+        if count > 1:
+            row['Nome'] = f"{name} ({count})"
+            summary.renamed.append(f"{name} -> {row['Nome']}")
+        rows[root] = row
+    return rows
+
+
+def merge_backups(paths, output):
+    """Mescla os backups (na ordem dada: o primeiro vence empates) em output"""
+    start = time.perf_counter()
+    summary = MergeSummary(sources=list(paths))
+    products = _Entities()
+    customers = _Entities()
+
+    for source, path in enumerate(paths):
+        with XlsxReader(path) as reader:
+            for _, record in reader.iter_records(PRODUCTS.name):
+                if text(record.get('Nome')):
+                    products.add(source, record, _product_keys(record))
+            for _, record in reader.iter_records(CUSTOMERS.name):
+                if text(record.get('Nome')):
+                    customers.add(source, record, _customer_keys(record))
+    customers.link_names()
+    summary.products_in = len(products.records)
+    summary.customers_in = len(customers.records)
+
+    product_rows = _consolidate_products(products)
+    customer_rows = _consolidate_customers(customers, summary)
+    summary.products_out = len(product_rows)
+    summary.customers_out = len(customer_rows)
+
+    def resolve(entities, rows, source, name):
+        # Primeiro o cadastro do próprio aparelho (nome exato, como a importação);
+        # senão o nome normalizado em qualquer backup
+        position = entities.by_name.get((source, name))
+        if position is None:
+            position = entities.names.get(fold(name))
+        if position is None:
+            return None
+        return rows[entities.groups.find(position)]['Nome']
+
+    with XlsxWriter(output) as writer:
+        with writer.sheet(PRODUCTS.name, PRODUCTS.headers) as sheet:
+            for row in product_rows.values():
+                sheet.write_row([row.get(header) for header in PRODUCTS.headers])
+        with writer.sheet(CUSTOMERS.name, CUSTOMERS.headers) as sheet:
+            for row in customer_rows.values():
+                sheet.write_row([row.get(header) for header in CUSTOMERS.headers])
+        with writer.sheet(ORDERS.name, ORDERS.headers) as sheet:
+            order_ids = {}  # (backup, ID antigo) -> ID novo
+            for source, path in enumerate(paths):
+                with XlsxReader(path) as reader:
+                    for row_number, record in reader.iter_records(ORDERS.name):
+                        old_id = record.get('ID do Pedido')
+                        if old_id in (None, ''):
+                            continue
+                        order_id = order_ids.setdefault((source, old_id), len(order_ids) + 1)
+                        record['ID do Pedido'] = order_id
+                        for header, entities, rows in (('Cliente', customers, customer_rows),
+                                                       ('Produto', products, product_rows)):
+                            name = text(record.get(header))
+                            if not name:
+                                continue
+                            resolved = resolve(entities, rows, source, name)
+                            if resolved is None:
+                                summary.unresolved_count += 1
+                                if len(summary.unresolved) < MAX_SKIPPED:
+                                    summary.unresolved.append(
+                                        f"{path} linha {row_number}: {header} \"{name}\"")
+                            else:
+                                record[header] = resolved
+                        sheet.write_row([record.get(header) for header in ORDERS.headers])
+                        summary.order_rows += 1
+            summary.orders = len(order_ids)
+
+    summary.seconds = time.perf_counter() - start
+    return summary
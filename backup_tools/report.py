@@ -0,0 +1,377 @@
+"""
+Relatórios offline (números da tela ReportsScreen) sobre um backup ou banco
+
+O backup XLSX é carregado num SQLite em memória (mesma carga do convert) e o
+banco convertido é lido direto; as tabelas viram arrays numpy por coluna e
+os totais saem de somas e group-bys vetorizados (np.bincount), sem juntar
+order_items com outra tabela de itens — a consulta getTopProducts do
+database.js junta sale_items e order_items no mesmo GROUP BY e multiplica as
+linhas de cada produto.
+
+As séries diárias e mensais (Rollups) guardam a posição (maior ID) até onde
+já somaram e um hash das linhas somadas: numa nova execução só os pedidos e
+itens acrescentados depois entram na soma, a não ser que o app tenha editado
+as linhas antigas (pagamento, total, itens regravados), e aí tudo é refeito.
+"""
+
+from dataclasses import asdict, dataclass, field
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+from .convert import create_schema, load_backup
+
+# Dia (dias desde 1970-01-01) de uma coluna DATETIME; -1 se não for uma data
+DAY_SQL = "COALESCE(CAST(julianday(substr({column}, 1, 10)) - 2440587.5 AS INTEGER), -1)"
+NO_DAY = -1
+
+PRODUCTS_SQL = "SELECT id, cost_price FROM products ORDER BY id"
+CUSTOMERS_SQL = "SELECT id FROM customers ORDER BY id"
+ORDER_COLUMNS = ("id, customer_id, total_amount, paid_amount, "
+                 + DAY_SQL.format(column='created_at'))
+ORDERS_SQL = f"SELECT {ORDER_COLUMNS} FROM orders ORDER BY id"
+ITEMS_SQL = ("SELECT id, order_id, product_id, quantity, total_price "
+             "FROM order_items ORDER BY id")
+
+PRODUCT_DTYPE = [('id', 'i8'), ('cost', 'f8')]
+CUSTOMER_DTYPE = [('id', 'i8')]
+ORDER_DTYPE = [('id', 'i8'), ('customer', 'i8'), ('total', 'f8'), ('paid', 'f8'),
+               ('day', 'i8')]
+ITEM_DTYPE = [('id', 'i8'), ('order', 'i8'), ('product', 'i8'), ('quantity', 'i8'),
+              ('total', 'f8')]
+
+# Janela do bloco "últimos dias" da ReportsScreen
+RECENT_DAYS = 30
+TOP_PRODUCTS = 10
+
+
+def open_database(path):
+    """Conexão com o banco convertido, ou com um banco em memória carregado do XLSX"""
+    if path.lower().endswith('.xlsx'):
+        connection = sqlite3.connect(':memory:', isolation_level=None)
+        create_schema(connection)
+        load_backup(path, connection)
+        return connection
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} não encontrado")
+    return sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+
+def _fetch(connection, sql, dtype, params=()):
+    return np.fromiter(connection.execute(sql, params), dtype=dtype)
+
+
+def _lookup(ids, keys):
+    """Posição de cada chave em ids (ordenados) e máscara das que existem (como um JOIN)"""
+    if len(ids) == 0:
+        return np.zeros(len(keys), dtype=np.int64), np.zeros(len(keys), dtype=bool)
+    positions = np.searchsorted(ids, keys)
+    clipped = np.minimum(positions, len(ids) - 1)
+    return clipped, ids[clipped] == keys
+
+
+@dataclass
+class Tables:
+    """Colunas das tabelas usadas pelos relatórios"""
+    products: np.ndarray
+    customers: np.ndarray
+    orders: np.ndarray
+    items: np.ndarray
+
+    @classmethod
+    def load(cls, connection):
+        """Lê as colunas das tabelas, em ordem de ID"""
+        return cls(_fetch(connection, PRODUCTS_SQL, PRODUCT_DTYPE),
+                   _fetch(connection, CUSTOMERS_SQL, CUSTOMER_DTYPE),
+                   _fetch(connection, ORDERS_SQL, ORDER_DTYPE),
+                   _fetch(connection, ITEMS_SQL, ITEM_DTYPE))
+
+    def item_costs(self, orders=None):
+        """
+        Custo de cada item (quantidade x preço de custo atual) e o pedido a que
+        pertence, só para itens com produto e pedido existentes (os JOINs de
+        getAllOrderItemsWithCosts)
+
+        orders: pedidos em que procurar (padrão: os carregados).
+        """
+        orders = self.orders if orders is None else orders
+        product, has_product = _lookup(self.products['id'], self.items['product'])
+        order, has_order = _lookup(orders['id'], self.items['order'])
+        keep = has_product & has_order
+        costs = self.items['quantity'][keep] * self.products['cost'][product[keep]]
+        return costs, order[keep], keep
+
+
+@dataclass
+class Figures:
+    """Receita (valor pago), custo e lucro de um conjunto de pedidos"""
+    orders: int = 0
+    paid_orders: int = 0
+    revenue: float = 0.0
+    cost: float = 0.0
+
+    @property
+    def profit(self):
+        return self.revenue - self.cost
+
+
+@dataclass
+class Report:
+    """Números da ReportsScreen calculados fora do aparelho"""
+    total: Figures
+    recent: Figures
+    recent_days: int
+    to_receive: float              # Soma de max(0, total - pago) por pedido
+    top_products: list = field(default_factory=list)  # {id, name, sold, revenue}
+    balances: list = field(default_factory=list)      # {id, name, total, paid, balance}
+    seconds: float = 0.0
+
+    def to_dict(self):
+        data = asdict(self)
+        data['total']['profit'] = self.total.profit
+        data['recent']['profit'] = self.recent.profit
+        return data
+
+
+def _figures(orders, costs, selected):
+    """Figures dos pedidos marcados em selected (máscara sobre orders)"""
+    paid = orders['paid'][selected]
+    return Figures(int(selected.sum()), int((paid > 0).sum()), float(paid.sum()),
+                   float(costs.sum()))
+
+
+# Parâmetros por consulta IN (...) (limite antigo do SQLite: 999)
+IN_CHUNK = 900
+
+
+def _names(connection, table, ids):
+    """Nomes só das linhas que vão aparecer no relatório"""
+    names = {}
+    ids = [int(value) for value in ids]
+    for start in range(0, len(ids), IN_CHUNK):
+        chunk = ids[start:start + IN_CHUNK]
+        marks = ','.join('?' * len(chunk))
+        names.update(connection.execute(f"SELECT id, name FROM {table} WHERE id IN ({marks})",
+                                        chunk))
+    return names
+
+
+def today_day():
+    return (datetime.date.today() - datetime.date(1970, 1, 1)).days
+
+
+def build_report(connection, today=None, recent_days=RECENT_DAYS, top=TOP_PRODUCTS,
+                 balances=None):
+    """
+    Receita, custo, lucro (total e dos últimos dias), a receber, produtos mais
+    vendidos e saldo por cliente
+
+    today: dia de referência (dias desde 1970; padrão: hoje). balances: quantos
+    clientes com saldo listar (padrão: todos com saldo diferente de zero).
+    """
+    start = time.perf_counter()
+    tables = Tables.load(connection)
+    orders = tables.orders
+    today = today_day() if today is None else today
+
+    costs, cost_order, _ = tables.item_costs()
+    recent = orders['day'] > today - recent_days
+    recent_items = recent[cost_order]
+
+    report = Report(
+        total=_figures(orders, costs, np.ones(len(orders), dtype=bool)),
+        recent=_figures(orders, costs[recent_items], recent),
+        recent_days=recent_days,
+        to_receive=float(np.maximum(orders['total'] - orders['paid'], 0).sum()),
+    )
+
+    # Mais vendidos: um group-by só de order_items por produto (sem produto
+    # cartesiano); só produtos existentes, como o LEFT JOIN a partir de products
+    if len(tables.products):
+        product, has_product = _lookup(tables.products['id'], tables.items['product'])
+        sold = np.bincount(product[has_product], tables.items['quantity'][has_product],
+                           minlength=len(tables.products))
+        revenue = np.bincount(product[has_product], tables.items['total'][has_product],
+                              minlength=len(tables.products))
+        ranked = np.lexsort((tables.products['id'], -sold))
+        ranked = ranked[sold[ranked] > 0][:top]
+        ids = tables.products['id'][ranked]
+        names = _names(connection, 'products', ids)
+        report.top_products = [{'id': int(product_id), 'name': names.get(int(product_id), ''),
+                                'sold': int(sold[index]), 'revenue': float(revenue[index])}
+                               for product_id, index in zip(ids, ranked)]
+
+    # Saldo por cliente: soma de total - pago dos seus pedidos
+    if len(tables.customers) and len(orders):
+        customer, has_customer = _lookup(tables.customers['id'], orders['customer'])
+        group = customer[has_customer]
+        size = len(tables.customers)
+        totals = np.bincount(group, orders['total'][has_customer], minlength=size)
+        paid = np.bincount(group, orders['paid'][has_customer], minlength=size)
+        balance = totals - paid
+        ranked = np.lexsort((tables.customers['id'], -balance))
+        ranked = ranked[np.abs(balance[ranked]) > 0.005]
+        if balances is not None:
+            ranked = ranked[:balances]
+        ids = tables.customers['id'][ranked]
+        names = _names(connection, 'customers', ids)
+        report.balances = [{'id': int(customer_id), 'name': names.get(int(customer_id), ''),
+                            'total': float(totals[index]), 'paid': float(paid[index]),
+                            'balance': float(balance[index])}
+                           for customer_id, index in zip(ids, ranked)]
+
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def _digest(orders, items):
+    """Hash das colunas de pedidos e itens que entram nas séries"""
+    h = hashlib.sha256(orders.tobytes())
+    h.update(items.tobytes())
+    return h.hexdigest()
+
+
+# Colunas das séries diárias
+ROLLUP_COLUMNS = ('orders', 'paid_orders', 'billed', 'revenue', 'cost', 'items')
+
+
+class Rollups:
+    """
+    Séries diárias (e mensais, derivadas) atualizadas por incremento
+
+    Só pedidos e itens acima das marcas (maior ID já somado) entram na soma,
+    como linhas acrescentadas pelo app. Um item entra no dia do seu pedido,
+    com o preço de custo do produto no momento da soma. As linhas até as
+    marcas têm de bater com o hash guardado (colunas usadas nas séries): se o
+    app editou um pedido (updateOrderPaidAmount, updateOrderTotal), regravou
+    os itens de um pedido ou se linhas sumiram (outro banco, exclusões), as
+    séries são refeitas do zero.
+    """
+
+    VERSION = 2
+
+    def __init__(self):
+        self.first_day = None
+        self.order_mark = 0
+        self.item_mark = 0
+        self.digest = ''       # Hash das linhas com ID até as marcas quando foram somadas
+        self.rebuilt = False   # A última atualização refez as séries
+        self.series = {name: np.zeros(0) for name in ROLLUP_COLUMNS}
+
+    @classmethod
+    def load(cls, path):
+        rollups = cls()
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return rollups
+        if data.get('version') != cls.VERSION:
+            return rollups
+        rollups.first_day = data['first_day']
+        rollups.order_mark = data['order_mark']
+        rollups.item_mark = data['item_mark']
+        rollups.digest = data['digest']
+        rollups.series = {name: np.asarray(data['series'][name], dtype=float)
+                          for name in ROLLUP_COLUMNS}
+        return rollups
+
+    def save(self, path):
+        data = {
+            'version': self.VERSION,
+            'first_day': self.first_day,
+            'order_mark': self.order_mark,
+            'item_mark': self.item_mark,
+            'digest': self.digest,
+            'series': {name: values.tolist() for name, values in self.series.items()},
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    def _grow(self, days):
+        """Estende as séries para cobrir os dias informados"""
+        days = days[days != NO_DAY]
+        if not len(days):
+            return
+        low, high = int(days.min()), int(days.max())
+        if self.first_day is None:
+            self.first_day = low
+            self.series = {name: np.zeros(high - low + 1) for name in ROLLUP_COLUMNS}
+            return
+        before = max(self.first_day - low, 0)
+        after = max(high - (self.first_day + len(self.series['orders']) - 1), 0)
+        if before or after:
+            self.series = {name: np.pad(values, (before, after))
+                           for name, values in self.series.items()}
+            self.first_day -= before
+
+    def _add(self, name, days, weights=None):
+        valid = days != NO_DAY
+        offsets = days[valid] - self.first_day
+        weights = None if weights is None else weights[valid]
+        self.series[name] += np.bincount(offsets, weights, minlength=len(self.series[name]))
+
+    def update(self, connection):
+        """Soma as linhas novas; retorna (pedidos, itens) somados"""
+        tables = Tables.load(connection)
+        old_orders = tables.orders['id'] <= self.order_mark
+        old_items = tables.items['id'] <= self.item_mark
+        self.rebuilt = False
+        if (self.order_mark or self.item_mark) and \
+                _digest(tables.orders[old_orders], tables.items[old_items]) != self.digest:
+            self.__init__()
+            self.rebuilt = True
+            old_orders[:] = False
+            old_items[:] = False
+        orders = tables.orders[~old_orders]
+        new = Tables(tables.products, tables.customers, tables.orders, tables.items[~old_items])
+
+        # Itens novos podem ser de pedidos antigos: o dia vem de todos os pedidos
+        costs, cost_order, kept = new.item_costs()
+        item_days = tables.orders['day'][cost_order]
+        quantities = new.items['quantity'][kept].astype(float)
+
+        self._grow(np.concatenate([orders['day'], item_days]))
+        if self.first_day is not None:
+            self._add('orders', orders['day'])
+            self._add('paid_orders', orders['day'][orders['paid'] > 0])
+            self._add('billed', orders['day'], orders['total'])
+            self._add('revenue', orders['day'], orders['paid'])
+            self._add('cost', item_days, costs)
+            self._add('items', item_days, quantities)
+
+        if len(tables.orders):
+            self.order_mark = max(self.order_mark, int(tables.orders['id'][-1]))
+        if len(tables.items):
+            self.item_mark = max(self.item_mark, int(tables.items['id'][-1]))
+        self.digest = _digest(tables.orders, tables.items)
+        return len(orders), len(new.items)
+
+    def daily(self):
+        """[(data ISO, {coluna: valor})] dos dias com movimento"""
+        if self.first_day is None:
+            return []
+        active = np.nonzero(self.series['orders'] + self.series['items'])[0]
+        dates = (np.datetime64('1970-01-01') + self.first_day + active).astype(str)
+        return [(date, {name: float(self.series[name][index]) for name in ROLLUP_COLUMNS})
+                for date, index in zip(dates, active)]
+
+    def monthly(self):
+        """[('AAAA-MM', {coluna: valor})] somando as séries diárias por mês"""
+        if self.first_day is None:
+            return []
+        days = np.datetime64('1970-01-01') + self.first_day + np.arange(
+            len(self.series['orders']))
+        months = days.astype('datetime64[M]')
+        first = months[0]
+        group = (months - first).astype(int)
+        sums = {name: np.bincount(group, self.series[name]) for name in ROLLUP_COLUMNS}
+        labels = (first + np.arange(len(sums['orders']))).astype(str)
+        return [(label, {name: float(sums[name][index]) for name in ROLLUP_COLUMNS})
+                for index, label in enumerate(labels)
+                if sums['orders'][index] or sums['items'][index]]
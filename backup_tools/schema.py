@@ -0,0 +1,180 @@
+"""
+Esquema dos backups do app (abas Produtos, Clientes e Pedidos)
+
+Os cabeçalhos seguem ExcelService.js (exportação) e ExcelServiceImproved.js
+(importação); as tabelas seguem createTables em src/database/database.js.
+"""
+
+import math
+
+# Tipos de coluna
+TEXT = 'text'
+INTEGER = 'integer'
+NUMBER = 'number'
+DATE = 'date'  # Data pt-BR (dd/mm/aaaa), como exportada pelo app
+
+
+class Column:
+    """Coluna de uma aba do backup"""
+
+    def __init__(self, header, kind=TEXT, required=False, imported=False):
+        self.header = header
+        self.kind = kind
+        self.required = required  # Valor obrigatório em toda linha
+        self.imported = imported  # Lida pela importação do app (cabeçalho obrigatório)
+
+
+class Sheet:
+    """Aba do backup: nome, colunas e tabela correspondente no banco"""
+
+    def __init__(self, name, table, columns):
+        self.name = name
+        self.table = table
+        self.columns = columns
+
+    @property
+    def headers(self):
+        return [column.header for column in self.columns]
+
+    @property
+    def required_headers(self):
+        return [column.header for column in self.columns if column.imported]
+
+    def column(self, header):
+        for column in self.columns:
+            if column.header == header:
+                return column
+        return None
+
+
+PRODUCTS = Sheet('Produtos', 'products', [
+    Column('ID', INTEGER),
+    Column('Nome', TEXT, required=True, imported=True),
+    Column('Quantidade em Estoque', INTEGER, imported=True),
+    Column('Preço de Custo', NUMBER, imported=True),
+    Column('Data de Criação', DATE),
+    Column('Data de Atualização', DATE),
+])
+
+CUSTOMERS = Sheet('Clientes', 'customers', [
+    Column('ID', INTEGER),
+    Column('Nome', TEXT, required=True, imported=True),
+    Column('Telefone', TEXT, imported=True),
+    Column('Email', TEXT, imported=True),
+    Column('Endereço', TEXT, imported=True),
+    Column('Data de Criação', DATE),
+    Column('Data de Atualização', DATE),
+])
+
+# Uma linha por item de pedido; pedidos sem itens têm as colunas do item vazias
+ORDERS = Sheet('Pedidos', 'orders', [
+    Column('ID do Pedido', INTEGER, required=True, imported=True),
+    Column('Cliente', TEXT, imported=True),
+    Column('Status', TEXT, imported=True),
+    Column('Total do Pedido', NUMBER, imported=True),
+    Column('Valor Pago', NUMBER, imported=True),
+    Column('Valor a Receber', NUMBER),
+    Column('Observações', TEXT, imported=True),
+    Column('Data do Pedido', DATE),
+    Column('Item', INTEGER),
+    Column('Produto', TEXT, imported=True),
+    Column('Quantidade', INTEGER, imported=True),
+    Column('Preço Unitário', NUMBER, imported=True),
+    Column('Total do Item', NUMBER, imported=True),
+    Column('Custo Unitário', NUMBER),
+    Column('Custo Total do Item', NUMBER),
+])
+
+SHEETS = [PRODUCTS, CUSTOMERS, ORDERS]
+SHEETS_BY_NAME = {sheet.name: sheet for sheet in SHEETS}
+REQUIRED_SHEETS = [sheet.name for sheet in SHEETS]
+
+# Status usados pela tela de pedidos (OrdersScreen.js)
+ORDER_STATUSES = ('order', 'with_customer', 'paid')
+DEFAULT_ORDER_STATUS = 'with_customer'
+
+# Tabelas de createTables (database.js) usadas pelos backups
+CREATE_TABLES = {
+    'products': """
+      CREATE TABLE IF NOT EXISTS products (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        quantity INTEGER DEFAULT 0,
+        cost_price REAL NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+      )
+    """,
+    'customers': """
+      CREATE TABLE IF NOT EXISTS customers (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        phone TEXT,
+        email TEXT,
+        address TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+      )
+    """,
+    'orders': """
+      CREATE TABLE IF NOT EXISTS orders (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        customer_id INTEGER NOT NULL,
+        status TEXT DEFAULT 'with_customer',
+        notes TEXT,
+        total_amount REAL DEFAULT 0,
+        paid_amount REAL DEFAULT 0,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (customer_id) REFERENCES customers (id)
+      )
+    """,
+    'order_items': """
+      CREATE TABLE IF NOT EXISTS order_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        order_id INTEGER NOT NULL,
+        product_id INTEGER NOT NULL,
+        quantity INTEGER NOT NULL,
+        unit_price REAL NOT NULL,
+        total_price REAL NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (order_id) REFERENCES orders (id),
+        FOREIGN KEY (product_id) REFERENCES products (id)
+      )
+    """,
+}
+
+
+def check_value(column, value):
+    """Retorna uma mensagem de erro se o valor não combina com o tipo da coluna"""
+    if value is None or value == '':
+        if column.required:
+            return f"{column.header} obrigatório"
+        return None
+    if column.kind == INTEGER:
+        number = to_number(value)
+        if number is None or number != int(number):
+            return f"{column.header} deve ser inteiro: {value!r}"
+    elif column.kind == NUMBER:
+        if to_number(value) is None:
+            return f"{column.header} deve ser numérico: {value!r}"
+    elif column.kind == TEXT and column.required and not str(value).strip():
+        return f"{column.header} obrigatório"
+    return None
+
+
+def to_number(value):
+    """
+    Converte célula para float (aceita texto numérico, como o parseFloat do app)
+
+    'inf', 'nan' e números que estouram o float ('1e999') não são números de
+    backup: viram None, em vez de chegar no int() de quem chama.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        number = float(value)
+    else:
+        try:
+            number = float(str(value).strip().replace(',', '.'))
+        except ValueError:
+            return None
+    return number if math.isfinite(number) else None
@@ -0,0 +1,117 @@
+"""
+Validação de backups XLSX do app antes da importação
+
+Lê cada aba em streaming e confere abas obrigatórias, cabeçalhos e o tipo de
+cada célula contra o esquema de database.js. Pastas inteiras são validadas em
+paralelo, um processo por arquivo, com memória constante por arquivo.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+import os
+
+from .schema import REQUIRED_SHEETS, SHEETS, check_value
+from .xlsx import XlsxError, XlsxReader
+
+# Máximo de erros detalhados por aba (os demais só são contados)
+MAX_DETAILS = 20
+
+
+@dataclass
+class SheetReport:
+    name: str
+    rows: int = 0
+    errors: int = 0
+    details: list = field(default_factory=list)
+
+    def add_error(self, message):
+        self.errors += 1
+        if len(self.details) < MAX_DETAILS:
+            self.details.append(message)
+
+
+@dataclass
+class FileReport:
+    path: str
+    size: int = 0
+    sheets: list = field(default_factory=list)
+    errors: list = field(default_factory=list)  # Erros do arquivo como um todo
+
+    @property
+    def ok(self):
+        return not self.errors and all(sheet.errors == 0 for sheet in self.sheets)
+
+    @property
+    def total_errors(self):
+        return len(self.errors) + sum(sheet.errors for sheet in self.sheets)
+
+
+def validate_sheet(reader, sheet):
+    """Valida cabeçalhos e linhas de uma aba"""
+    report = SheetReport(sheet.name)
+    headers = None
+    for row_number, values in reader.iter_rows(sheet.name):
+        if headers is None:
+            headers = [str(value).strip() if value is not None else '' for value in values]
+            missing = [h for h in sheet.required_headers if h not in headers]
+            if missing:
+                report.add_error(f"Cabeçalhos ausentes: {', '.join(missing)}")
+            continue
+        if all(value is None or value == '' for value in values):
+            continue
+        report.rows += 1
+        for index, header in enumerate(headers):
+            column = sheet.column(header)
+            if column is None:
+                continue
+            value = values[index] if index < len(values) else None
+            error = check_value(column, value)
+            if error:
+                report.add_error(f"Linha {row_number}: {error}")
+    if headers is None:
+        report.add_error("Aba vazia (sem cabeçalho)")
+    return report
+
+
+def validate_file(path):
+    """Valida um backup; nunca lança exceção, os problemas vão no relatório"""
+    report = FileReport(path)
+    try:
+        report.size = os.path.getsize(path)
+        # Mesmas verificações iniciais de ExcelServiceImproved.importAllData
+        if report.size < 100:
+            report.errors.append("Arquivo muito pequeno para ser um Excel válido")
+            return report
+        with XlsxReader(path) as reader:
+            missing = [name for name in REQUIRED_SHEETS if name not in reader.sheet_names]
+            if missing:
+                report.errors.append(f"Faltam as abas: {', '.join(missing)}")
+            for sheet in SHEETS:
+                if sheet.name in reader.sheet_names:
+                    report.sheets.append(validate_sheet(reader, sheet))
+    except (XlsxError, OSError) as e:
+        report.errors.append(str(e))
+    return report
+
+
+def find_backups(paths):
+    """Expande pastas em arquivos .xlsx (ordenados)"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in names
+                             if name.lower().endswith('.xlsx') and not name.startswith('~$'))
+        else:
+            files.append(path)
+    return sorted(files)
+
+
+def validate_many(paths, jobs=None):
+    """Valida vários backups em paralelo, gerando os relatórios em ordem"""
+    files = find_backups(paths)
+    if jobs == 1 or len(files) <= 1:
+        yield from map(validate_file, files)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(validate_file, files)
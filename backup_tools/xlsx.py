@@ -0,0 +1,575 @@
+"""
+Leitura de arquivos XLSX em streaming (zipfile + expat)
+
+Só a tabela de strings compartilhadas fica em memória; as linhas das abas são
+lidas e descartadas uma a uma.
+"""
+
+import posixpath
+import re
+from xml.parsers import expat
+import xml.etree.ElementTree as ET
+import zipfile
+import zlib
+
+NS_MAIN = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+NS_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+NS_PKG_REL = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+_CELL_REF = re.compile(r'([A-Z]+)(\d+)')
+
+# Caracteres que o XML não aceita (controles, surrogates soltos) viram _xHHHH_,
+# como no Excel; um '_' que já pareça esse código é protegido como _x005F_
+_UNSAFE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]'
+                     r'|_(?=x[0-9A-Fa-f]{4}_)')
+_SPECIAL = re.compile(r'[&<>"\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]|_x')
+_ENCODED = re.compile(r'_x([0-9A-Fa-f]{4})_')
+
+# Bytes lidos do zip por vez ao percorrer uma aba
+READ_CHUNK = 256 * 1024
+
+
+class XlsxError(Exception):
+    """Arquivo não é um XLSX válido ou está corrompido"""
+
+
+def _local(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def column_index(ref):
+    """'A1' -> 0, 'AB7' -> 27"""
+    match = _CELL_REF.match(ref)
+    if not match:
+        raise XlsxError(f"Referência de célula inválida: {ref}")
+    index = 0
+    for char in match.group(1):
+        index = index * 26 + (ord(char) - 64)
+    return index - 1
+
+
+def column_letter(index):
+    """0 -> 'A', 27 -> 'AB'"""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _unescape(text):
+    """Desfaz os códigos _xHHHH_ do Excel (e do _escape)"""
+    if '_x' not in text:
+        return text
+    return _ENCODED.sub(lambda match: chr(int(match.group(1), 16)), text)
+
+
+def _text(element):
+    """Texto de <si> ou <is>, juntando os trechos <t> (inclusive rich text)"""
+    return _unescape(''.join(node.text or '' for node in element.iter()
+                             if _local(node.tag) == 't'))
+
+
+class XlsxReader:
+    """Abre um XLSX e permite iterar as linhas de cada aba"""
+
+    def __init__(self, path):
+        try:
+            self.zip = zipfile.ZipFile(path)
+        except (zipfile.BadZipFile, OSError) as e:
+            raise XlsxError(f"Não é um arquivo XLSX (ZIP) válido: {e}") from e
+        self.sheet_paths = self._read_sheet_paths()
+        self._shared_strings = None
+
+    def close(self):
+        self.zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    @property
+    def sheet_names(self):
+        return list(self.sheet_paths)
+
+    def _read_sheet_paths(self):
+        try:
+            workbook = ET.fromstring(self.zip.read('xl/workbook.xml'))
+            rels = ET.fromstring(self.zip.read('xl/_rels/workbook.xml.rels'))
+        except KeyError as e:
+            raise XlsxError(f"Estrutura do XLSX incompleta: {e}") from e
+        except ET.ParseError as e:
+            raise XlsxError(f"XML do workbook inválido: {e}") from e
+        except (zipfile.BadZipFile, zlib.error) as e:
+            raise XlsxError(f"Workbook corrompido no ZIP: {e}") from e
+
+        targets = {}
+        for rel in rels.iter(f'{{{NS_PKG_REL}}}Relationship'):
+            target = rel.get('Target')
+            if target.startswith('/'):
+                target = target[1:]
+            else:
+                target = posixpath.normpath(posixpath.join('xl', target))
+            targets[rel.get('Id')] = target
+
+        paths = {}
+        for sheet in workbook.iter(f'{{{NS_MAIN}}}sheet'):
+            rel_id = sheet.get(f'{{{NS_REL}}}id')
+            if rel_id in targets:
+                paths[sheet.get('name')] = targets[rel_id]
+        return paths
+
+    @property
+    def shared_strings(self):
+        if self._shared_strings is None:
+            strings = []
+            if 'xl/sharedStrings.xml' in self.zip.namelist():
+                try:
+                    with self.zip.open('xl/sharedStrings.xml') as f:
+                        for _, element in ET.iterparse(f):
+                            if _local(element.tag) == 'si':
+                                strings.append(_text(element))
+                                element.clear()
+                except ET.ParseError as e:
+                    raise XlsxError(f"XML das strings compartilhadas inválido: {e}") from e
+                except (zipfile.BadZipFile, zlib.error) as e:
+                    raise XlsxError(f"Strings compartilhadas corrompidas no ZIP: {e}") from e
+            self._shared_strings = strings
+        return self._shared_strings
+
+    def iter_rows(self, sheet_name):
+        """Gera (número da linha, lista de valores) de uma aba"""
+        if sheet_name not in self.sheet_paths:
+            raise XlsxError(f"Aba não encontrada: {sheet_name}")
+        rows = _RowCollector(self.shared_strings)
+        parser = expat.ParserCreate()
+        parser.buffer_text = True
+        parser.StartElementHandler = rows.start
+        parser.EndElementHandler = rows.end
+        parser.CharacterDataHandler = rows.data
+        try:
+            stream = self.zip.open(self.sheet_paths[sheet_name])
+        except KeyError as e:
+            raise XlsxError(f"Aba {sheet_name} ausente do ZIP: {e}") from e
+        except (zipfile.BadZipFile, zlib.error) as e:
+            raise XlsxError(f"Aba {sheet_name} corrompida no ZIP: {e}") from e
+        with stream as f:
+            try:
+                while True:
+                    chunk = f.read(READ_CHUNK)
+                    parser.Parse(chunk, not chunk)
+                    # Entrega as linhas completas deste bloco e as descarta
+                    yield from rows.ready
+                    rows.ready.clear()
+                    if not chunk:
+                        break
+            except expat.ExpatError as e:
+                raise XlsxError(f"XML da aba {sheet_name} inválido: {e}") from e
+            except (zipfile.BadZipFile, zlib.error) as e:
+                raise XlsxError(f"Aba {sheet_name} corrompida no ZIP: {e}") from e
+            except XlsxError as e:
+                raise XlsxError(f"Aba {sheet_name}: {e}") from e
+
+    def iter_records(self, sheet_name):
+        """Gera (número da linha, dict cabeçalho -> valor), como sheet_to_json"""
+        headers = None
+        for row_number, values in self.iter_rows(sheet_name):
+            if headers is None:
+                headers = [str(value).strip() if value is not None else None
+                           for value in values]
+                continue
+            if all(value is None or value == '' for value in values):
+                continue
+            record = {}
+            for header, value in zip(headers, values):
+                if header:
+                    record[header] = value
+            yield row_number, record
+
+    def headers(self, sheet_name):
+        for _, values in self.iter_rows(sheet_name):
+            return [str(value).strip() if value is not None else '' for value in values]
+        return []
+
+
+class _RowCollector:
+    """Handlers do expat que montam as linhas de uma aba"""
+
+    def __init__(self, shared):
+        self.shared = shared
+        self.ready = []     # Linhas completas ainda não entregues
+        self.columns = {}   # letras da coluna -> índice (cache)
+        self.values = {}
+        self.row_number = 0
+        self.cell_type = 'n'
+        self.cell_index = 0
+        self.cell_ref = ''
+        self.text = []
+        self.collecting = False
+        self.has_value = False
+
+    def start(self, name, attrs):
+        name = _local_name(name)
+        if name == 'c':
+            self.cell_type = attrs.get('t', 'n')
+            ref = attrs.get('r')
+            self.cell_ref = ref or f"linha {self.row_number}"
+            if ref:
+                letters = ref.rstrip('0123456789')
+                index = self.columns.get(letters)
+                if index is None:
+                    index = self.columns[letters] = column_index(ref)
+                self.cell_index = index
+            else:
+                self.cell_index = len(self.values)
+            self.text = []
+            self.has_value = False
+        elif name == 'v' or name == 't':
+            self.collecting = True
+            self.has_value = True
+        elif name == 'row':
+            try:
+                self.row_number = int(attrs.get('r') or self.row_number + 1)
+            except ValueError:
+                raise XlsxError(f"Número de linha inválido: {attrs.get('r')!r}") from None
+            self.values = {}
+
+    def end(self, name):
+        name = _local_name(name)
+        if name == 'v' or name == 't':
+            self.collecting = False
+        elif name == 'c':
+            if self.has_value or self.cell_type == 'inlineStr':
+                try:
+                    value = _convert(self.cell_type, ''.join(self.text), self.shared)
+                except XlsxError as e:
+                    raise XlsxError(f"Célula {self.cell_ref}: {e}") from e
+                self.values[self.cell_index] = value
+        elif name == 'row':
+            values = self.values
+            width = max(values) + 1 if values else 0
+            self.ready.append((self.row_number, [values.get(i) for i in range(width)]))
+
+    def data(self, text):
+        if self.collecting:
+            self.text.append(text)
+
+
+_LOCAL_NAMES = {}
+
+
+def _local_name(name):
+    """'x:c' -> 'c' (com cache; o expat entrega o nome qualificado)"""
+    local = _LOCAL_NAMES.get(name)
+    if local is None:
+        local = _LOCAL_NAMES[name] = name.rsplit(':', 1)[-1]
+    return local
+
+
+def _convert(cell_type, raw, shared):
+    """Valor de uma célula pelo tipo; conteúdo que não bate com o tipo vira XlsxError"""
+    if cell_type == 'inlineStr' or cell_type == 'str':
+        return _unescape(raw)
+    if cell_type == 'e':
+        return raw
+    if cell_type == 's':
+        try:
+            index = int(raw)
+        except ValueError:
+            raise XlsxError(f"índice de string compartilhada inválido: {raw!r}") from None
+        if not 0 <= index < len(shared):
+            raise XlsxError(f"string compartilhada {index} não existe "
+                            f"({len(shared)} no arquivo)")
+        return shared[index]
+    if cell_type == 'b':
+        return raw == '1'
+    if raw == '':
+        return None
+    try:
+        number = float(raw)
+    except ValueError:
+        raise XlsxError(f"número inválido: {raw!r}") from None
+    return int(number) if number.is_integer() and 'E' not in raw.upper() else number
+
+
+# --- Escrita -----------------------------------------------------------------
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '{sheets}{shared}'
+    '</Types>'
+)
+_SHEET_CONTENT_TYPE = (
+    '<Override PartName="/xl/worksheets/sheet{index}.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+)
+_SHARED_CONTENT_TYPE = (
+    '<Override PartName="/xl/sharedStrings.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    f'<Relationships xmlns="{NS_PKG_REL}">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+    'relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    f'<styleSheet xmlns="{NS_MAIN}">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="1"><fill><patternFill patternType="none"/></fill></fills>'
+    '<borders count="1"><border/></borders>'
+    '<cellStyleXfs count="1"><xf/></cellStyleXfs>'
+    '<cellXfs count="1"><xf xfId="0"/></cellXfs>'
+    '</styleSheet>'
+)
+_REL_TYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/'
+
+# Linhas acumuladas antes de cada escrita no zip
+FLUSH_ROWS = 1000
+
+# Limites da tabela de strings compartilhadas (nomes, status e datas
+# repetidos cabem; textos longos e únicos, como observações, ficam inline)
+MAX_SHARED_STRINGS = 200000
+MAX_SHARED_LENGTH = 120
+
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+
+def _encode_unsafe(match):
+    char = match.group()
+    return '_x005F_' if char == '_' else f'_x{ord(char):04X}_'
+
+
+def _escape(text):
+    """Texto pronto para o XML (entidades e caracteres inválidos como _xHHHH_)"""
+    if _SPECIAL.search(text) is None:
+        return text
+    text = _UNSAFE.sub(_encode_unsafe, text)
+    return (text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+            .replace('"', '&quot;'))
+
+
+class SheetWriter:
+    """Escreve as linhas de uma aba direto no zip, em blocos"""
+
+    def __init__(self, stream, headers):
+        self.stream = stream
+        self.letters = [column_letter(i) for i in range(len(headers))]
+        self.rows = 0
+        self.bytes = 0
+        self._buffer = []
+        self._write(f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                    f'<worksheet xmlns="{NS_MAIN}"><sheetData>')
+        self.write_row(headers)
+
+    def _write(self, text):
+        data = text.encode('utf-8')
+        self.stream.write(data)
+        self.bytes += len(data)
+
+    def write_row(self, values):
+        self.rows += 1
+        r = str(self.rows)
+        letters = self.letters
+        cells = []
+        for index, value in enumerate(values):
+            if value is None or value == '':
+                continue
+            if index >= len(letters):
+                letters.append(column_letter(index))
+            ref = letters[index] + r
+            kind = type(value)
+            if kind is str:
+                cells.append(self._string_cell(ref, value))
+            elif kind is bool:
+                cells.append(f'<c r="{ref}" t="b"><v>{int(value)}</v></c>')
+            elif kind is int or kind is float:
+                cells.append(f'<c r="{ref}"><v>{value!r}</v></c>')
+            else:
+                cells.append(self._string_cell(ref, str(value)))
+        self._buffer.append(f'<row r="{r}">{"".join(cells)}</row>')
+        if len(self._buffer) >= FLUSH_ROWS:
+            self.flush()
+
+    def _string_cell(self, ref, text):
+        return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{_escape(text)}</t></is></c>'
+
+    def flush(self):
+        if self._buffer:
+            self._write(''.join(self._buffer))
+            self._buffer = []
+
+    def close(self):
+        self.flush()
+        self._write('</sheetData></worksheet>')
+
+
+class SharedSheetWriter(SheetWriter):
+    """SheetWriter que grava os textos como referências à tabela de strings compartilhadas"""
+
+    def __init__(self, stream, headers, strings):
+        self.strings = strings
+        super().__init__(stream, headers)
+
+    def _string_cell(self, ref, text):
+        index = self.strings.index(text)
+        if index is None:
+            return super()._string_cell(ref, text)
+        return f'<c r="{ref}" t="s"><v>{index}</v></c>'
+
+
+class SharedStrings:
+    """
+    Tabela de strings compartilhadas montada durante a escrita
+
+    Limitada a MAX_SHARED_STRINGS entradas de até MAX_SHARED_LENGTH
+    caracteres: com a tabela cheia, textos novos saem como inlineStr e a
+    memória não cresce com o número de linhas.
+    """
+
+    def __init__(self, limit=None, max_length=None):
+        self.limit = MAX_SHARED_STRINGS if limit is None else limit
+        self.max_length = MAX_SHARED_LENGTH if max_length is None else max_length
+        self.table = {}  # texto -> índice (na ordem de inserção)
+        self.count = 0   # Referências gravadas
+
+    def index(self, text):
+        index = self.table.get(text)
+        if index is None:
+            if len(self.table) >= self.limit or len(text) > self.max_length:
+                return None
+            index = self.table[text] = len(self.table)
+        self.count += 1
+        return index
+
+    def xml(self):
+        items = ''.join(f'<si><t xml:space="preserve">{_escape(text)}</t></si>'
+                        for text in self.table)
+        return ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                f'<sst xmlns="{NS_MAIN}" count="{self.count}" '
+                f'uniqueCount="{len(self.table)}">{items}</sst>')
+
+
+
+class XlsxWriter:
+    """
+    Gera um XLSX em streaming: uma aba por vez, linhas gravadas em blocos
+
+    Uso:
+        with XlsxWriter('backup.xlsx') as writer:
+            with writer.sheet('Produtos', headers) as sheet:
+                sheet.write_row([...])
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.zip = zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED, compresslevel=6)
+        self.sheets = []  # (nome, linhas, bytes sem compressão)
+
+    def sheet(self, name, headers):
+        return _SheetContext(self, name, headers)
+
+    def _entry(self, name):
+        # Data fixa: o mesmo conteúdo gera o mesmo arquivo, byte a byte
+        info = zipfile.ZipInfo(name, date_time=ZIP_EPOCH)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        return info
+
+    def _open_sheet(self, name, headers):
+        index = len(self.sheets) + 1
+        entry = self._entry(f'xl/worksheets/sheet{index}.xml')
+        stream = self.zip.open(entry, 'w', force_zip64=True)
+        return stream, self._make_sheet_writer(stream, headers)
+
+    def _make_sheet_writer(self, stream, headers):
+        return SheetWriter(stream, headers)
+
+    def _close_sheet(self, name, stream, writer):
+        writer.close()
+        stream.close()
+        self.sheets.append((name, writer.rows - 1, writer.bytes))
+
+    def _extra_parts(self):
+        """Partes adicionais do pacote (nome -> conteúdo); nenhuma por padrão"""
+        return {}
+
+    def close(self):
+        if self.zip is None:
+            return
+        extra = self._extra_parts()
+        sheet_entries = ''.join(
+            f'<sheet name="{_escape(name)}" sheetId="{i}" r:id="rId{i}"/>'
+            for i, (name, _, _) in enumerate(self.sheets, 1))
+        sheet_rels = ''.join(
+            f'<Relationship Id="rId{i}" Type="{_REL_TYPE}worksheet" '
+            f'Target="worksheets/sheet{i}.xml"/>' for i in range(1, len(self.sheets) + 1))
+        n = len(self.sheets)
+        styles_rel = (f'<Relationship Id="rId{n + 1}" Type="{_REL_TYPE}styles" '
+                      f'Target="styles.xml"/>')
+        shared_rel = ''
+        if 'xl/sharedStrings.xml' in extra:
+            shared_rel = (f'<Relationship Id="rId{n + 2}" Type="{_REL_TYPE}sharedStrings" '
+                          f'Target="sharedStrings.xml"/>')
+
+        self.zip.writestr(self._entry('[Content_Types].xml'), _CONTENT_TYPES.format(
+            sheets=''.join(_SHEET_CONTENT_TYPE.format(index=i) for i in range(1, n + 1)),
+            shared=_SHARED_CONTENT_TYPE if 'xl/sharedStrings.xml' in extra else ''))
+        self.zip.writestr(self._entry('_rels/.rels'), _ROOT_RELS)
+        self.zip.writestr(self._entry('xl/workbook.xml'), (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<workbook xmlns="{NS_MAIN}" xmlns:r="{NS_REL}"><sheets>{sheet_entries}</sheets></workbook>'))
+        self.zip.writestr(self._entry('xl/_rels/workbook.xml.rels'), (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<Relationships xmlns="{NS_PKG_REL}">{sheet_rels}{styles_rel}{shared_rel}</Relationships>'))
+        self.zip.writestr(self._entry('xl/styles.xml'), _STYLES)
+        for name, content in extra.items():
+            self.zip.writestr(self._entry(name), content)
+        self.zip.close()
+        self.zip = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class SharedStringsXlsxWriter(XlsxWriter):
+    """XlsxWriter com strings compartilhadas (xl/sharedStrings.xml), como o Excel grava"""
+
+    def __init__(self, path, strings=None):
+        super().__init__(path)
+        self.strings = strings if strings is not None else SharedStrings()
+
+    def _make_sheet_writer(self, stream, headers):
+        return SharedSheetWriter(stream, headers, self.strings)
+
+    def _extra_parts(self):
+        return {'xl/sharedStrings.xml': self.strings.xml()}
+
+
+class _SheetContext:
+    def __init__(self, writer, name, headers):
+        self.writer = writer
+        self.name = name
+        self.headers = headers
+
+    def __enter__(self):
+        self.stream, self.sheet_writer = self.writer._open_sheet(self.name, self.headers)
+        return self.sheet_writer
+
+    def __exit__(self, exc_type, exc, tb):
+        self.writer._close_sheet(self.name, self.stream, self.sheet_writer)
+        return False
@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+Script para gerar os ícones do app com o motor icon_engine
+Grava na árvore do projeto ou direto num arquivo zip/tar (ex.: artefato de CI)
+
+Exemplos:
+    python build_icons.py build --preset perfect
+    python build_icons.py build --preset themed
+    python build_icons.py build --preset app --archive icons.zip
+    python build_icons.py build --preset centered --archive - --format tar > icons.tar
+    python build_icons.py build --preset perfect --preset centered --split --archive review.zip
+    python build_icons.py build --preset app --jobs 8 --memory-mb 512
+    python build_icons.py build --preset app --preset centered --split --plan
+    python build_icons.py build --preset perfect --resume
+    python build_icons.py build --preset centered --proxy
+    python build_icons.py build --preset perfect --linear
+    python build_icons.py build --preset perfect --threshold auto
+    python build_icons.py build --preset perfect --preset adaptive --split --palette auto
+    python build_icons.py build --preset perfect --palette '#2E7D6B'
+    python build_icons.py build --source mestre_p3.png --prepared-dir /tmp/icones_srgb
+    python build_icons.py build --preset app --metrics-jsonl metrics.jsonl --metrics-prom icons.prom
+    python build_icons.py build --preset app --store /mnt/cache/icones
+    python build_icons.py build --preset app --store http://127.0.0.1:8766
+    python build_icons.py recompress
+    python build_icons.py recompress --dry-run --jobs 4
+    python build_icons.py recompress --include-build --dry-run
+    python build_icons.py serve --port 8765
+    python build_icons.py store-serve --root .icon_store --port 8766
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from icon_engine import (ARCHIVE_FORMATS, COLORS_XML, DEFAULT_BUDGET, JOURNAL_FILE, PREPARED_DIR,
+                         PRESETS, PROFILE_FILE, PROXY, PROXY_DIR, RECOMPRESS_INDEX, RELEASE,
+                         THEME_FILE, TREES, ArchiveSink, CostModel, DirectorySink, Evaluator,
+                         Journal, MemoryScheduler, PreparedSources, analyse_background,
+                         analyse_palette, build, collect, collect_targets, colors_xml, find_pngs,
+                         hex_color, make_plan, open_store, palette_from_color, recompress,
+                         render_summary, source_profile, theme_colors, with_backing, with_linear,
+                         with_threshold, write_jsonl, write_openmetrics)
+from icon_engine.variants import parse_color
+
+MB = 1024 * 1024
+
+
+def cmd_build(args, log):
+    """Renderiza os presets escolhidos no destino escolhido"""
+    if not os.path.exists(args.source):
+        print(f"❌ Arquivo {args.source} não encontrado!", file=log)
+        return False
+
+    quality = PROXY if args.proxy else RELEASE
+    if args.linear:
+        quality = with_linear(quality)
+    if args.proxy:
+        # O rascunho nunca vai para as árvores do projeto nem para um artefato de CI
+        if args.archive:
+            print("❌ --proxy não grava em arquivo (--archive); use uma pasta", file=log)
+            return False
+        args.out = args.out or PROXY_DIR
+        if os.path.realpath(args.out) == os.path.realpath('.'):
+            print("❌ --proxy não grava na árvore do projeto; escolha outra --out", file=log)
+            return False
+    args.out = args.out or '.'
+
+    targets = collect_targets(args.preset, split=args.split)
+    print(f"📁 Abrindo {args.source}...", file=log)
+    if args.proxy:
+        print(f"🧪 Modo proxy (rascunho, não usar em release): gravando em {args.out}",
+              file=log)
+    print(f"🎨 {len(targets)} arquivo(s) dos presets: {', '.join(args.preset)}", file=log)
+
+    evaluator = Evaluator(profile=True)
+    prepared = PreparedSources(args.prepared_dir)
+    profile = source_profile(args.source)
+    if profile:
+        print(f"🌈 Perfil de cor {profile}: convertendo para sRGB (cache em "
+              f"{args.prepared_dir})", file=log)
+
+    background = None
+    if args.threshold == 'auto':
+        background = analyse_background(evaluator, args.source, targets, quality, prepared)
+        quality = with_threshold(quality, background.threshold)
+        if background.white:
+            print(f"🎯 Fundo {background.hex} detectado: corte {background.threshold} "
+                  f"(análise em {background.analysed[0]}x{background.analysed[1]}, "
+                  f"{background.seconds * 1000:.0f} ms)", file=log)
+        else:
+            print(f"🎯 Fundo {background.hex} não é branco: nada será removido", file=log)
+    elif args.threshold is not None:
+        quality = with_threshold(quality, args.threshold)
+        print(f"🎯 Corte do fundo fixado em {args.threshold}", file=log)
+
+    palette = None
+    if args.palette == 'auto':
+        palette = analyse_palette(evaluator, args.source, targets, quality, prepared)
+        print(f"🎨 Paleta da arte: dominante {hex_color(palette.dominant)}, complementar "
+              f"{hex_color(palette.complementary)} (análise em {palette.analysed[0]}x"
+              f"{palette.analysed[1]}, {palette.seconds * 1000:.0f} ms)", file=log)
+    elif args.palette:
+        palette = palette_from_color(args.palette)
+        print(f"🎨 Paleta a partir de {hex_color(palette.dominant)}", file=log)
+    if palette is not None:
+        quality = with_backing(quality, palette.background)
+
+    store = open_store(args.store) if args.store else None
+    model = CostModel.load(args.profile_file)
+    scheduler = MemoryScheduler(args.memory_mb * MB, max_workers=args.jobs)
+
+    if args.plan:
+        _print_plan(make_plan(targets, args.source, model, scheduler.max_workers, store,
+                              evaluator, quality, prepared), log)
+        return True
+
+    journal = None
+    if args.archive:
+        if args.resume:
+            print("❌ --resume só funciona com saída em pasta (--out)", file=log)
+            return False
+        sink = ArchiveSink(args.archive, args.format)
+        print(f"📦 Gravando em {args.archive} ({args.format})", file=log)
+    else:
+        sink = DirectorySink(args.out)
+        journal = Journal(os.path.join(args.out, args.journal), resume=args.resume)
+        if args.resume:
+            print(f"🔁 Retomando pelo diário {journal.path}", file=log)
+
+    if store is not None:
+        print(f"🗄️ Repositório de artefatos: {args.store}", file=log)
+
+    def report(target, result):
+        if args.quiet and result.ok:
+            return
+        if not result.ok:
+            print(f"   ❌ {target.path}: {result.error}", file=log)
+            return
+        origin = " 🗄️" if result.from_store else ""
+        print(f"   ✅ {target.path} ({target.size}x{target.size}, {result.nbytes} bytes){origin}",
+              file=log)
+
+    colors_ok = True
+    started = time.time()
+    start = time.perf_counter()
+    try:
+        with sink:
+            results = build(targets, args.source, sink, on_result=report, evaluator=evaluator,
+                            store=store, scheduler=scheduler, cost_model=model,
+                            journal=journal, resume=args.resume, quality=quality,
+                            prepared=prepared)
+            # Com alvos falhando as cores não mudam: os ícones ficariam com a paleta antiga
+            if palette is not None and all(result.ok for result in results):
+                prefixes = [f"{name}/" for name in args.preset] if args.split else ['']
+                colors_ok = _write_colors(palette, sink, log, prefixes)
+    finally:
+        if journal is not None:
+            journal.close()
+
+    metrics = collect(results, started, time.perf_counter() - start, scheduler, evaluator,
+                      store, args.preset, quality.name, args.source, quality.threshold,
+                      background)
+    if args.metrics_jsonl:
+        write_jsonl(metrics, args.metrics_jsonl)
+    if args.metrics_prom:
+        write_openmetrics(metrics, args.metrics_prom)
+    if not args.quiet:
+        render_summary(metrics, log)
+        if profile:
+            if prepared.hits:
+                origin = f"reaproveitada de {args.prepared_dir}"
+            elif prepared.misses:
+                origin = "convertida nesta execução (uma transformação)"
+            else:
+                origin = "nem decodificada (tudo veio do repositório)"
+            print(f"🌈 Mestre em sRGB: {origin}", file=log)
+
+    failed = [result for result in results if not result.ok]
+    # Calibra o modelo de custo com os tempos desta execução
+    if evaluator.timings:
+        model.update(evaluator.timings)
+        model.save(args.profile_file)
+
+    if not colors_ok:
+        return False
+    if failed:
+        print(f"❌ {len(failed)} arquivo(s) com erro:", file=log)
+        for result in failed:
+            print(f"   ⚠️ {result.path}: {result.error}", file=log)
+        if journal is not None:
+            print("🔁 Rode de novo com --resume para refazer só esses arquivos", file=log)
+        return False
+    return True
+
+
+def _write_colors(palette, sink, log, prefixes=('',)):
+    """
+    Grava a paleta nos arquivos de cor do projeto pelo mesmo sink dos ícones
+
+    Os arquivos são lidos da árvore do projeto e só as cores da paleta mudam.
+    prefixes: pastas onde gravar (com --split, a de cada preset, ao lado dos
+    ícones dele; a árvore do projeto fica intacta).
+    """
+    for path, update in ((COLORS_XML, colors_xml), (THEME_FILE, theme_colors)):
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = update(f.read(), palette).encode('utf-8')
+            for prefix in prefixes:
+                written = sink.write(prefix + path, data)
+                state = "atualizado" if written is not False else "sem mudança"
+                print(f"🎨 {prefix}{path}: {state}", file=log)
+        except (OSError, ValueError) as e:
+            print(f"❌ Não foi possível gravar a paleta em {path}: {e}", file=log)
+            return False
+    return True
+
+
+def _describe(node):
+    params = ', '.join(f"{name}={value}" for name, value in node.params
+                       if name not in ('digest', 'dimensions'))
+    return f"{node.op}({params})" if params else node.op
+
+
+def _print_plan(plan, log):
+    """Grafo de jobs na ordem de execução, reaproveitamento e tempo previsto"""
+    print(f"📋 Plano: {len(plan.jobs)} job(s), {plan.stage_count} etapa(s) a calcular, "
+          f"{plan.reused} reaproveitada(s), {plan.cached} no repositório", file=log)
+    for job in plan.jobs:
+        if job.cached:
+            print(f"   🗄️ {job.target.path} (repositório)", file=log)
+            continue
+        print(f"   ⏱️ {job.start * 1000:7.1f} → {job.finish * 1000:7.1f} ms  "
+              f"{job.target.path} (caminho crítico {job.path * 1000:.1f} ms)", file=log)
+        for stage in job.stages:
+            print(f"        + {_describe(stage)}", file=log)
+        for stage in job.shared:
+            print(f"        = {_describe(stage)}", file=log)
+    print(f"⏱️ Previsto: {plan.predicted:.2f}s com {plan.workers} thread(s) "
+          f"(um por vez: {plan.sequential:.2f}s)", file=log)
+
+
+def cmd_recompress(args, log):
+    """Recomprime sem perda os PNGs versionados (res/ e AppIcon; os da build só com opt-in)"""
+    trees = args.tree or list(TREES)
+    missing = [tree for tree in trees if not os.path.isdir(tree)]
+    if missing:
+        print(f"❌ Pasta {missing[0]} não encontrada!", file=log)
+        return False
+    paths = find_pngs(trees, exclude=() if args.include_build else None)
+    print(f"🗜️ {len(paths)} PNG(s) em {', '.join(trees)}", file=log)
+    if args.include_build:
+        print("⚠️ Incluindo os gerados pela build: a próxima build os regrava com os bytes "
+              "da release", file=log)
+    else:
+        skipped = len(find_pngs(trees, exclude=())) - len(paths)
+        if skipped:
+            print(f"   {skipped} gerado(s) pela build ficaram de fora (--include-build os "
+                  f"inclui)", file=log)
+    if args.dry_run:
+        print("🧪 Simulação: nada será gravado", file=log)
+
+    def report(result):
+        if result.status == 'failed':
+            print(f"   ❌ {result.path}: {result.error}", file=log)
+        elif result.status == 'smaller' and not args.quiet:
+            print(f"   ✅ {result.path}: {result.before} → {result.after} bytes "
+                  f"(-{result.saved * 100 / result.before:.1f}%, {result.mode})", file=log)
+
+    scheduler = MemoryScheduler(args.memory_mb * MB, max_workers=args.jobs)
+    start = time.perf_counter()
+    results = recompress(paths, index_path=args.index, scheduler=scheduler,
+                         dry_run=args.dry_run, on_result=report)
+    seconds = time.perf_counter() - start
+
+    counts = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    before = sum(result.before for result in results if result.status != 'failed')
+    saved = sum(result.saved for result in results)
+    verb = "seriam economizados" if args.dry_run else "economizados"
+    print(f"💾 {saved} bytes {verb} ({saved * 100 / max(before, 1):.1f}% de {before}) em "
+          f"{seconds:.2f}s com {scheduler.max_workers} thread(s)", file=log)
+    print(f"   {counts.get('smaller', 0)} recomprimido(s), {counts.get('optimal', 0)} já no "
+          f"menor tamanho, {counts.get('indexed', 0)} pulado(s) pelo índice {args.index}, "
+          f"{counts.get('kept', 0)} mantido(s)", file=log)
+    failed = counts.get('failed', 0)
+    if failed:
+        print(f"❌ {failed} arquivo(s) com erro", file=log)
+    return not failed
+
+
+def cmd_serve(args, log):
+    """Sobe o servidor local de pré-visualização das variantes"""
+    from icon_engine.preview import make_server
+
+    if not os.path.exists(args.source):
+        print(f"❌ Arquivo {args.source} não encontrado!", file=log)
+        return False
+
+    server = make_server(args.source, args.host, args.port, args.cache_mb * 1024 * 1024)
+    print(f"🌐 Pré-visualização em http://{args.host}:{args.port}/ (Ctrl+C para sair)", file=log)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return True
+
+
+def cmd_store_serve(args, log):
+    """Sobe o servidor HTTP do repositório de artefatos"""
+    from icon_engine.store import make_store_server
+
+    server = make_store_server(args.root, args.host, args.port)
+    print(f"🗄️ Repositório {args.root} em http://{args.host}:{args.port}/ "
+          "(Ctrl+C para sair)", file=log)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return True
+
+
+def _threshold(value):
+    """'auto' ou um corte de 0 a 255 (argparse)"""
+    if value == 'auto':
+        return value
+    try:
+        threshold = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"corte inválido: {value} (use 'auto' ou 0-255)")
+    if not 0 <= threshold <= 255:
+        raise argparse.ArgumentTypeError(f"corte fora de 0-255: {value}")
+    return threshold
+
+
+def _palette(value):
+    """'auto' ou uma cor hexadecimal (argparse)"""
+    if value == 'auto':
+        return value
+    try:
+        return parse_color(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"cor inválida: {value} (use 'auto' ou #RRGGBB)")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Gera os ícones do app")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = commands.add_parser('build', help="Renderiza os ícones")
+    build_parser.add_argument('--source', default='custom_icon.png',
+                              help="Imagem mestre (padrão: custom_icon.png)")
+    build_parser.add_argument('--preset', action='append', choices=sorted(PRESETS),
+                              help="Preset(s) a gerar (padrão: app)")
+    build_parser.add_argument('--split', action='store_true',
+                              help="Uma pasta por preset (compara variantes numa execução)")
+    build_parser.add_argument('--out',
+                              help="Raiz da árvore de saída (padrão: repositório; "
+                                   f"com --proxy, {PROXY_DIR})")
+    build_parser.add_argument('--archive',
+                              help="Gravar num arquivo zip/tar em vez da árvore ('-' = stdout)")
+    build_parser.add_argument('--format', default='zip', choices=ARCHIVE_FORMATS,
+                              help="Formato do arquivo de saída (padrão: zip)")
+    build_parser.add_argument('--proxy', action='store_true',
+                              help="Rascunho rápido (mestre reduzida, filtro bilinear, PNG "
+                                   "nível 1) numa pasta à parte, nunca na árvore de release")
+    build_parser.add_argument('--linear', action='store_true',
+                              help="Reamostrar em luz linear (traços finos e bordas claras "
+                                   "não escurecem nos tamanhos pequenos)")
+    build_parser.add_argument('--threshold', type=_threshold,
+                              help="Corte do fundo branco: 'auto' (detectado na mestre) ou "
+                                   "0-255 (padrão: o de cada variante)")
+    build_parser.add_argument('--palette', type=_palette,
+                              help="Cor da marca: 'auto' (dominante da arte) ou #RRGGBB; vira "
+                                   "o fundo das variantes com fundo, o ic_launcher_background "
+                                   "do colors.xml e o primary do tema")
+    build_parser.add_argument('--prepared-dir', default=PREPARED_DIR,
+                              help="Cache das mestres com perfil ICC já convertidas para sRGB "
+                                   f"(padrão: {PREPARED_DIR})")
+    build_parser.add_argument('--store',
+                              help="Repositório de artefatos: pasta compartilhada ou URL http://")
+    build_parser.add_argument('--resume', action='store_true',
+                              help="Refazer só os arquivos que falharam ou faltam (pelo diário)")
+    build_parser.add_argument('--journal', default=JOURNAL_FILE,
+                              help=f"Diário de jobs, relativo a --out (padrão: {JOURNAL_FILE})")
+    build_parser.add_argument('--plan', action='store_true',
+                              help="Só mostrar o plano (jobs, reaproveitamento, tempo previsto)")
+    build_parser.add_argument('--profile-file', default=PROFILE_FILE,
+                              help=f"Perfil de tempos do modelo de custo (padrão: {PROFILE_FILE})")
+    build_parser.add_argument('--metrics-jsonl',
+                              help="Acrescentar as métricas da execução neste arquivo JSON Lines")
+    build_parser.add_argument('--metrics-prom',
+                              help="Gravar as métricas num textfile OpenMetrics (coletor)")
+    build_parser.add_argument('--quiet', action='store_true',
+                              help="Sem progresso por arquivo nem resumo (só erros)")
+    build_parser.add_argument('--jobs', type=int, default=None,
+                              help="Máximo de renderizações em paralelo (padrão: nº de CPUs)")
+    build_parser.add_argument('--memory-mb', type=int, default=DEFAULT_BUDGET // MB,
+                              help="Orçamento de memória dos jobs em execução "
+                                   f"(padrão: {DEFAULT_BUDGET // MB})")
+
+    recompress_parser = commands.add_parser('recompress',
+                                            help="Recomprime sem perda os PNGs versionados "
+                                                 "(os da build só com --include-build)")
+    recompress_parser.add_argument('tree', nargs='*',
+                                   help="Pastas a percorrer (padrão: res/ do Android e "
+                                        "AppIcon.appiconset)")
+    recompress_parser.add_argument('--index', default=RECOMPRESS_INDEX,
+                                   help="Índice dos PNGs já no menor tamanho "
+                                        f"(padrão: {RECOMPRESS_INDEX})")
+    recompress_parser.add_argument('--include-build', action='store_true',
+                                   help="Recomprimir também os PNGs que os presets gravam "
+                                        "(a próxima build os regrava)")
+    recompress_parser.add_argument('--dry-run', action='store_true',
+                                   help="Só calcular a economia, sem gravar nada")
+    recompress_parser.add_argument('--quiet', action='store_true',
+                                   help="Sem progresso por arquivo (só erros e o total)")
+    recompress_parser.add_argument('--jobs', type=int, default=None,
+                                   help="Máximo de arquivos em paralelo (padrão: nº de CPUs)")
+    recompress_parser.add_argument('--memory-mb', type=int, default=DEFAULT_BUDGET // MB,
+                                   help="Orçamento de memória dos arquivos em processamento "
+                                        f"(padrão: {DEFAULT_BUDGET // MB})")
+
+    serve_parser = commands.add_parser('serve', help="Servidor local de pré-visualização")
+    serve_parser.add_argument('--source', default='custom_icon.png',
+                              help="Imagem mestre (padrão: custom_icon.png)")
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8765)
+    serve_parser.add_argument('--cache-mb', type=int, default=64,
+                              help="Orçamento do cache de renderizações em MB (padrão: 64)")
+
+    store_parser = commands.add_parser('store-serve',
+                                       help="Servidor HTTP do repositório de artefatos")
+    store_parser.add_argument('--root', default='.icon_store', help="Pasta dos artefatos")
+    store_parser.add_argument('--host', default='127.0.0.1')
+    store_parser.add_argument('--port', type=int, default=8766)
+
+    args = parser.parse_args(argv)
+    if args.command == 'build' and not args.preset:
+        args.preset = ['app']
+    return args
+
+
+COMMANDS = {
+    'build': cmd_build,
+    'recompress': cmd_recompress,
+    'serve': cmd_serve,
+    'store-serve': cmd_store_serve,
+}
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Com saída em stdout, as mensagens vão para stderr
+    log = sys.stderr if getattr(args, 'archive', None) == '-' else sys.stdout
+
+    try:
+        success = COMMANDS[args.command](args, log)
+    except Exception as e:
+        print(f"❌ Erro ao gerar ícones: {e}", file=log)
+        success = False
+
+    if success:
+        print("\n🎉 Processo concluído com sucesso!", file=log)
+    else:
+        print("\n💥 Falha na geração dos ícones!", file=log)
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,24 @@
+"""
+Motor de geração de ícones do app
+Reúne as variantes dos scripts create_*.py / fix_icon_*.py em um só lugar
+"""
+
+from .aio import Completion, build_async, render_async
+from .background import Background, detect_background, estimate_background
+from .color import PREPARED_DIR, PreparedSources, source_profile
+from .costs import PROFILE_FILE, CostModel, Plan
+from .engine import (analyse_background, analyse_palette, artifact_key, build, encode, make_plan,
+                     render_target)
+from .graph import Evaluator
+from .journal import JOURNAL_FILE, Journal, TargetResult
+from .metrics import RunMetrics, collect, render_summary, write_jsonl, write_openmetrics
+from .palette import (COLORS_XML, THEME_FILE, Palette, colors_xml, extract_palette, hex_color,
+                      palette_from_color, theme_colors)
+from .quality import (PROXY, PROXY_DIR, QUALITIES, RELEASE, Quality, with_backing,
+                      with_linear, with_threshold)
+from .recompress import RECOMPRESS_INDEX, TREES, RecompressResult, find_pngs, recompress
+from .scheduler import DEFAULT_BUDGET, MemoryScheduler
+from .sinks import ARCHIVE_FORMATS, ArchiveSink, DirectorySink, OutputSink
+from .store import ArtifactStore, DirectoryStore, HttpStore, open_store
+from .targets import PRESETS, Target, collect_targets
+from .variants import VARIANTS, Variant, render_variant
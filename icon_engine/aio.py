@@ -0,0 +1,161 @@
+"""
+API assíncrona (asyncio) do motor, para orquestradores de build
+
+Em vez de chamar os scripts como subprocessos, um serviço asyncio pode
+renderizar um conjunto de alvos no mesmo processo:
+
+    async for done in render_async(targets, 'custom_icon.png'):
+        print(done.target.path, done.result.status)
+
+    results = await build_async(targets, 'custom_icon.png', DirectorySink('.'),
+                                timeout=30)
+
+Todo o trabalho de CPU e de disco (hash e decodificação da mestre, etapas do
+grafo, codificação, gravação no sink) roda no executor do motor, então o
+event loop nunca fica bloqueado. Os alvos são admitidos pelo mesmo orçamento
+de memória e na mesma ordem (caminho crítico) do MemoryScheduler. Cancelar a
+tarefa, sair do `async for` ou estourar o timeout para de admitir alvos e
+cancela os que ainda não começaram; os que já estão rodando terminam em
+segundo plano e são descartados.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+import os
+
+from .engine import (artifact_key, largest_size, load_source, run_job, schedule_jobs,
+                     target_result)
+from .graph import Evaluator
+from .journal import RENDERED, TargetResult
+from .quality import RELEASE
+from .scheduler import DEFAULT_BUDGET, admit_next
+
+
+@dataclass
+class Completion:
+    """Um alvo concluído: o alvo, seu resultado e os bytes (None se falhou)"""
+    target: object
+    result: TargetResult
+    data: bytes = None
+
+
+def _remaining(loop, deadline):
+    if deadline is None:
+        return None
+    remaining = deadline - loop.time()
+    if remaining <= 0:
+        raise TimeoutError("Tempo esgotado renderizando os ícones")
+    return remaining
+
+
+async def render_async(targets, source, evaluator=None, store=None, executor=None,
+                       max_workers=None, budget=DEFAULT_BUDGET, cost_model=None,
+                       quality=RELEASE, timeout=None, prepared=None):
+    """
+    Gera um Completion por alvo, na ordem em que terminam (status 'rendered'
+    ou 'failed'; nada é gravado)
+
+    executor: pool onde roda o trabalho de CPU (padrão: um ThreadPoolExecutor
+    próprio com max_workers threads, encerrado no fim). timeout (segundos)
+    vale para a execução inteira e levanta TimeoutError. prepared: cache das
+    mestres convertidas para sRGB (PreparedSources).
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout if timeout is not None else None
+    workers = max_workers or os.cpu_count() or 1
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='icon')
+    evaluator = evaluator or Evaluator()
+    targets = sorted(targets, key=lambda t: t.path)
+
+    def prepare():
+        source_node = load_source(evaluator, source, quality, largest_size(targets), prepared)
+        keys = [artifact_key(target, source_node, quality) for target in targets]
+        order, estimates = schedule_jobs(targets, source_node, evaluator, cost_model,
+                                         workers, quality)
+        return source_node, keys, order, estimates
+
+    running = {}  # future -> (índice do alvo, estimativa)
+    try:
+        source_node, keys, order, estimates = await asyncio.wait_for(
+            loop.run_in_executor(executor, prepare), _remaining(loop, deadline))
+        pending = list(order)
+        in_flight = 0
+        while pending or running:
+            # Admite pelo orçamento (descontando a memória residente) com a
+            # mesma regra do MemoryScheduler
+            available = budget - evaluator.resident_bytes()
+            while True:
+                index, need = admit_next(pending, estimates, len(running), in_flight,
+                                         available, workers)
+                if index is None:
+                    break
+                future = loop.run_in_executor(executor, run_job, evaluator, source_node,
+                                              targets[index], keys[index], store, quality)
+                running[future] = (index, need)
+                in_flight += need
+
+            done, _ = await asyncio.wait(running, timeout=_remaining(loop, deadline),
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                raise TimeoutError("Tempo esgotado renderizando os ícones")
+            for future in sorted(done, key=lambda f: running[f][0]):
+                index, estimate = running.pop(future)
+                in_flight -= estimate
+                data, from_store, seconds, error = future.result()
+                target = targets[index]
+                result = target_result(target, keys[index], data, from_store, seconds, error)
+                if result.ok:
+                    result = replace(result, status=RENDERED)
+                yield Completion(target, result, data)
+    finally:
+        for future in running:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def build_async(targets, source, sink, on_result=None, executor=None, timeout=None,
+                      **options):
+    """
+    Renderiza e grava no sink; retorna um TargetResult por alvo, na ordem dos caminhos
+
+    A gravação segue a ordem dos caminhos (arquivos zip/tar reproduzíveis):
+    cada alvo é gravado assim que ele e todos os anteriores terminam.
+    on_result(target, result) é chamado no event loop.
+    """
+    loop = asyncio.get_running_loop()
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=options.get('max_workers') or os.cpu_count()
+                                      or 1, thread_name_prefix='icon')
+    paths = sorted(target.path for target in targets)
+    finished = {}  # caminho -> Completion ainda não gravado
+    results = {}
+    try:
+        async for done in render_async(targets, source, executor=executor, timeout=timeout,
+                                       **options):
+            finished[done.target.path] = done
+            # Grava o prefixo contíguo já pronto, na ordem dos caminhos
+            while len(results) < len(paths) and paths[len(results)] in finished:
+                ready = finished.pop(paths[len(results)])
+                result = ready.result
+                if result.ok:
+                    try:
+                        written = await loop.run_in_executor(executor, sink.write,
+                                                             ready.target.path, ready.data)
+                        result = target_result(ready.target, result.key, ready.data,
+                                               result.from_store, result.seconds, None,
+                                               written)
+                    except Exception as e:
+                        result = target_result(ready.target, result.key, None, False,
+                                               result.seconds, e)
+                results[ready.target.path] = result
+                if on_result is not None:
+                    on_result(ready.target, result)
+    finally:
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+    return [results[path] for path in paths]
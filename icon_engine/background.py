@@ -0,0 +1,137 @@
+"""
+Detecção automática do fundo branco e do corte usado para removê-lo
+
+O corte fixo de 240 deixa ruído esbranquiçado de JPEG ou come arte rosa
+clara (o primaryLight #F2D1D3 do tema fica perto). Aqui a cor do fundo vem
+da borda da mestre e o corte sai de uma divisão de Otsu do histograma da
+"brancura" (menor canal, o mesmo critério de remove_white_background), tudo
+numa cópia reduzida: a análise custa milissegundos em qualquer resolução.
+"""
+
+from dataclasses import dataclass
+import time
+
+from PIL import Image
+import numpy as np
+
+# Lado menor da cópia reduzida analisada
+ANALYSIS_SIZE = 256
+
+# Largura da borda amostrada, em fração do lado da cópia reduzida
+BORDER_FRACTION = 1 / 32
+
+# Borda menos branca que isso: o fundo não é branco e nada é removido
+MIN_BACKGROUND = 200
+
+# O Otsu só procura o corte entre os tons claros (arte escura não interfere)
+SEARCH_FLOOR = 160
+
+# Percentil da brancura da borda abaixo do qual o corte tem de ficar
+# (todo o ruído do fundo sai, mesmo o mais escuro)
+NOISE_PERCENTILE = 2
+
+# Corte que não remove nada (nenhum canal passa de 255)
+KEEP_ALL = 255
+
+
+@dataclass(frozen=True)
+class Background:
+    """Fundo estimado da mestre e o corte escolhido"""
+    color: tuple          # RGB mediano da borda
+    threshold: int        # Corte da remoção (pixels com os 3 canais acima dele saem)
+    white: bool           # False: a borda não é branca (KEEP_ALL, nada é removido)
+    analysed: tuple       # Tamanho da cópia reduzida analisada
+    seconds: float = 0.0
+    border: bool = True   # False: borda toda transparente (a mestre não tem fundo)
+
+    @property
+    def hex(self):
+        return '#' + ''.join(f'{channel:02X}' for channel in self.color)
+
+
+def _otsu(histogram, floor=0):
+    """Corte t (classes <= t e > t) que maximiza a variância entre classes"""
+    counts = histogram[floor:].astype(np.float64)
+    levels = np.arange(floor, floor + len(counts), dtype=np.float64)
+    weight = np.cumsum(counts)
+    total = weight[-1]
+    if total == 0:
+        return None
+    mass = np.cumsum(counts * levels)
+    background = total - weight
+    with np.errstate(divide='ignore', invalid='ignore'):
+        between = (mass[-1] * weight - total * mass) ** 2 / (weight * background)
+    between[~np.isfinite(between)] = -1
+    best = between.max()
+    if best <= 0:
+        return None
+    # Níveis vazios entre as classes empatam: o corte fica no meio do vale,
+    # longe dos dois lados
+    ties = np.flatnonzero(between >= best * (1 - 1e-9))
+    return floor + int(ties[len(ties) // 2])
+
+
+def estimate_background(img):
+    """Estima o fundo e o corte de uma imagem RGBA (qualquer tamanho)"""
+    start = time.perf_counter()
+    factor = max(1, min(img.size) // ANALYSIS_SIZE)
+    proxy = img.reduce(factor) if factor > 1 else img
+    data = np.asarray(proxy)
+    visible = data[:, :, 3] > 0
+    whiteness = data[:, :, :3].min(axis=2)
+
+    border = max(1, round(min(proxy.size) * BORDER_FRACTION))
+    ring = np.ones(whiteness.shape, dtype=bool)
+    ring[border:-border, border:-border] = False
+    ring &= visible
+    if not ring.any():
+        # Borda toda transparente: não há fundo a remover
+        return Background((255, 255, 255), KEEP_ALL, False, proxy.size,
+                          time.perf_counter() - start, border=False)
+    color = tuple(int(value) for value in np.median(data[:, :, :3][ring], axis=0))
+    if min(color) < MIN_BACKGROUND:
+        return Background(color, KEEP_ALL, False, proxy.size, time.perf_counter() - start)
+
+    histogram = np.bincount(whiteness[visible], minlength=256)
+    threshold = _otsu(histogram, SEARCH_FLOOR)
+    noise = int(np.percentile(whiteness[ring], NOISE_PERCENTILE))
+    if threshold is None or threshold >= noise:
+        threshold = noise - 1
+    return Background(color, max(SEARCH_FLOOR, threshold), True, proxy.size,
+                      time.perf_counter() - start)
+
+
+# Rampa do recorte do fundo nas camadas: distância (maior diferença entre
+# canais) até a cor do fundo; abaixo de KEY_LOW some, acima de KEY_HIGH fica
+KEY_LOW = 16
+KEY_HIGH = 48
+
+# Linhas processadas por vez no recorte (mestres 8K não viram um int16 inteiro)
+KEY_ROWS = 1024
+
+
+def key_background(img, box=None, low=KEY_LOW, high=KEY_HIGH):
+    """
+    Torna transparente a cor do fundo (a da borda, qualquer que seja)
+
+    Diferente de remove_white_background, vale para fundo preto ou colorido e
+    tem uma rampa de alfa nas bordas da arte. box: retângulo da arte, cuja
+    borda dá a cor do fundo (padrão: a imagem toda). Sem borda visível (arte
+    já transparente) a imagem volta como está.
+    """
+    background = estimate_background(img.crop(box) if box else img)
+    if not background.border:
+        return img
+    data = np.array(img.convert('RGBA'))
+    color = np.array(background.color, dtype=np.int16)
+    for top in range(0, data.shape[0], KEY_ROWS):
+        strip = data[top:top + KEY_ROWS]
+        distance = np.abs(strip[:, :, :3].astype(np.int16) - color).max(axis=2)
+        ramp = np.clip((distance.astype(np.int32) - low) * 255 // (high - low), 0, 255)
+        np.minimum(strip[:, :, 3], ramp.astype(np.uint8), out=strip[:, :, 3])
+    return Image.fromarray(data, 'RGBA')
+
+
+def detect_background(evaluator, source_node):
+    """Estimativa para a mestre de um nó fonte (decodifica pelo evaluator, uma vez só)"""
+    return estimate_background(evaluator.evaluate(source_node))
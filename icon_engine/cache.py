@@ -0,0 +1,77 @@
+"""
+Cache LRU em memória com orçamento em bytes
+"""
+
+from collections import OrderedDict
+import threading
+
+
+def entry_size(value):
+    """Estimativa do tamanho de um valor em cache (bytes, imagem PIL ou array)"""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if hasattr(value, 'width') and hasattr(value, 'getbands'):
+        return value.width * value.height * len(value.getbands())
+    if hasattr(value, 'nbytes'):  # Níveis da pirâmide linear (numpy)
+        return value.nbytes
+    return 0
+
+
+class LRUCache:
+    """Cache LRU seguro entre threads, limitado pelo total de bytes"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        size = entry_size(value)
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            # Valores maiores que o orçamento inteiro não entram no cache
+            if size > self.max_bytes:
+                return value
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted
+        return value
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, compute())
+        return value
+
+    def __contains__(self, key):
+        """Presença sem contar acerto/falha nem mexer na ordem do LRU"""
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
@@ -0,0 +1,174 @@
+"""
+Normalização de cor da mestre para sRGB (perfil ICC embutido)
+
+Os scripts faziam convert('RGBA') e ignoravam o perfil: uma mestre exportada
+em Display P3 ou Adobe RGB saía com os rosas deslocados em todos os
+tamanhos. Aqui a mestre é convertida para sRGB uma vez, com ImageCms, logo
+na decodificação. As transformações são montadas uma vez por perfil (cache
+pelo hash do perfil) e a mestre convertida fica no cache de fontes
+preparadas (PreparedSources), então a conversão custa uma transformação por
+mestre, não uma por saída nem uma por execução.
+
+Mestres sem perfil ou já em sRGB seguem o caminho de sempre (os hashes e os
+bytes da release não mudam).
+"""
+
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+
+from PIL import Image, ImageCms
+import numpy as np
+
+# Cache padrão das mestres convertidas (na raiz do repositório, fora do git)
+PREPARED_DIR = '.icon_prepared'
+
+# Mestres convertidas mantidas no cache (as usadas há mais tempo saem)
+MAX_PREPARED = 4
+
+# Cores dentro do gamut do sRGB ficam exatamente onde estão
+INTENT = ImageCms.Intent.RELATIVE_COLORIMETRIC
+
+# Modos de imagem aceitos por espaço de cor do perfil
+_PROFILE_MODES = {
+    'RGB': ('RGB', 'RGBA'),
+    'CMYK': ('CMYK',),
+}
+
+_SRGB = ImageCms.createProfile('sRGB')
+_transforms = {}  # (hash do perfil, modo) -> ImageCmsTransform
+_lock = threading.Lock()
+
+
+def profile_hash(icc):
+    return hashlib.sha256(icc).hexdigest()
+
+
+def _open_profile(icc):
+    return ImageCms.ImageCmsProfile(io.BytesIO(icc))
+
+
+def profile_key(icc, mode):
+    """
+    Hash do perfil que precisa ser convertido (None: sem perfil, já em sRGB
+    ou perfil que não combina com o modo da imagem)
+    """
+    if not icc:
+        return None
+    try:
+        profile = _open_profile(icc)
+    except (OSError, ImageCms.PyCMSError):
+        return None  # Perfil ilegível: tratado como sRGB, como antes
+    if 'srgb' in ImageCms.getProfileDescription(profile).lower():
+        return None
+    space = profile.profile.xcolor_space.strip()
+    if mode not in _PROFILE_MODES.get(space, ()) and not (space == 'RGB' and mode == 'P'):
+        return None
+    return profile_hash(icc)
+
+
+def source_profile(path):
+    """Descrição do perfil que será convertido para sRGB (None: nada a converter)"""
+    with Image.open(path) as img:
+        icc = img.info.get('icc_profile')
+        if profile_key(icc, img.mode) is None:
+            return None
+    return ImageCms.getProfileDescription(_open_profile(icc)).strip()
+
+
+def transform_for(icc, mode):
+    """Transformação perfil -> sRGB para o modo, montada uma vez por perfil"""
+    key = (profile_hash(icc), mode)
+    with _lock:
+        transform = _transforms.get(key)
+        if transform is None:
+            out_mode = 'RGBA' if mode == 'RGBA' else 'RGB'
+            transform = _transforms[key] = ImageCms.buildTransform(
+                _open_profile(icc), _SRGB, mode, out_mode, INTENT)
+        return transform
+
+
+def transforms_built():
+    return len(_transforms)
+
+
+def to_srgb(img):
+    """Imagem decodificada -> RGBA em sRGB (aplica o perfil ICC, se houver)"""
+    icc = img.info.get('icc_profile')
+    if profile_key(icc, img.mode) is not None:
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        img = ImageCms.applyTransform(img, transform_for(icc, img.mode))
+        # Os pixels já estão em sRGB: o perfil antigo não pode seguir para os
+        # encoders (o ICO o embutiria nos quadros)
+        img.info.pop('icc_profile', None)
+    if img.mode != 'RGBA':
+        img = img.convert('RGBA')
+    return img
+
+
+class PreparedSources:
+    """
+    Mestres já convertidas para sRGB, em disco (.npy, lidas sem decodificar)
+
+    A chave é (hash do arquivo, hash do perfil, tamanho decodificado, versão
+    do lcms e intenção); com ela, execuções seguintes pulam a transformação.
+    """
+
+    def __init__(self, directory=PREPARED_DIR, max_entries=MAX_PREPARED):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(digest, profile, size):
+        payload = json.dumps({'source': digest, 'profile': profile, 'size': list(size),
+                              'lcms': ImageCms.core.littlecms_version,
+                              'intent': int(INTENT)}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npy")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            data = np.load(path)
+            os.utime(path)  # Usada agora: fica por último na fila de remoção
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return Image.fromarray(data, 'RGBA')
+
+    def put(self, key, image):
+        """Grava de forma atômica e remove as entradas mais antigas além do limite"""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp = tempfile.mkstemp(dir=self.directory, prefix='.prepared-')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    np.save(f, np.asarray(image))
+                os.replace(temp, self._path(key))
+            except BaseException:
+                os.unlink(temp)
+                raise
+            entries = sorted((entry for entry in os.scandir(self.directory)
+                              if entry.name.endswith('.npy')),
+                             key=lambda entry: entry.stat().st_mtime, reverse=True)
+            for entry in entries[self.max_entries:]:
+                os.unlink(entry.path)
+        except OSError:
+            pass  # Sem cache em disco a mestre só é convertida de novo na próxima vez
+
+    def load(self, key, decode):
+        """Mestre do cache, ou decode() (já convertida) gravada para as próximas vezes"""
+        image = self.get(key)
+        if image is None:
+            image = decode()
+            self.put(key, image)
+        return image
@@ -0,0 +1,238 @@
+"""
+Modelo de custo por etapa, caminho crítico e plano de execução (--plan)
+
+Cada execução registra quanto tempo cada etapa do grafo levou; o modelo
+guarda, por operação, os nanossegundos por unidade de trabalho (pixels lidos
+e escritos) numa média móvel salva em disco. Com ele os alvos são ordenados
+do caminho mais longo para o mais curto (icon-1024 e o foreground de 432px
+começam primeiro) e o plano prevê o tempo sem renderizar nada.
+"""
+
+from dataclasses import dataclass, field
+import heapq
+import json
+
+from .graph import Node
+from .scheduler import node_shape
+
+# Arquivo padrão do perfil (na raiz do repositório, fora do git)
+PROFILE_FILE = '.icon_profile.json'
+
+# Valores iniciais (ns por unidade de trabalho), medidos no Pillow 12
+DEFAULT_NS_PER_UNIT = {
+    'source': 20.0,       # decodificação do PNG
+    'remove_white': 8.0,
+    'key_background': 10.0,   # fundo das camadas temáticas
+    'resize': 23.0,
+    'resize_bilinear': 5.0,   # proxy
+    'reduce': 5.0,            # proxy
+    'linearize': 12.0,        # pirâmide linear (--linear)
+    'halve': 6.0,
+    'resize_linear': 60.0,
+    'circle_mask': 2.0,
+    'compose': 2.0,
+    'alpha': 0.2,
+    'crop_center': 0.1,
+    'silhouette': 4.0,
+    'encode': 85.0,
+}
+
+# Peso das medições novas na média móvel
+SMOOTHING = 0.3
+
+# Custo fixo por etapa (chamada Python, objetos PIL)
+STAGE_OVERHEAD = 50e-6
+
+
+def encode_node(nodes, format='PNG'):
+    """Nó (só para o modelo de custo) da codificação dos nós de saída de um alvo"""
+    return Node('encode', (('format', format),), tuple(nodes))
+
+
+def _pixels(shape):
+    return shape[0] * shape[1]
+
+
+def rate_key(node):
+    """Operação no perfil (os redimensionamentos do proxy e em luz linear têm taxa própria)"""
+    if node.op != 'resize':
+        return node.op
+    params = dict(node.params)
+    return '_'.join(part for part in (node.op, params.get('filter'), params.get('space'))
+                    if part)
+
+
+def work_units(node):
+    """Unidades de trabalho de um nó: pixels lidos + pixels escritos"""
+    if node.op == 'encode':
+        return sum(_pixels(node_shape(child)) for child in node.inputs)
+    out = _pixels(node_shape(node))
+    if node.op == 'source':
+        return out
+    if node.op == 'resize':
+        # Pré-multiplicação da entrada + passada horizontal + vertical
+        in_width, in_height, _ = node_shape(node.inputs[0])
+        out_width, _, _ = node_shape(node)
+        return in_width * in_height + out_width * in_height + out
+    return sum(_pixels(node_shape(child)) for child in node.inputs) + out
+
+
+class CostModel:
+    """Custo previsto de cada etapa, calibrado com as execuções anteriores"""
+
+    def __init__(self, ns_per_unit=None, samples=None):
+        self.ns_per_unit = dict(DEFAULT_NS_PER_UNIT)
+        self.ns_per_unit.update(ns_per_unit or {})
+        self.samples = dict(samples or {})  # operação -> nº de medições já usadas
+
+    @classmethod
+    def load(cls, path=PROFILE_FILE):
+        """Carrega o perfil salvo (ou os valores iniciais, se não houver)"""
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+        return cls(data.get('ns_per_unit'), data.get('samples'))
+
+    def save(self, path=PROFILE_FILE):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'ns_per_unit': self.ns_per_unit, 'samples': self.samples},
+                      f, indent=2, sort_keys=True)
+
+    def cost(self, node):
+        """Segundos previstos para calcular um nó (ou codificar, op 'encode')"""
+        rate = self.ns_per_unit.get(rate_key(node), DEFAULT_NS_PER_UNIT['compose'])
+        return work_units(node) * rate * 1e-9 + STAGE_OVERHEAD
+
+    def update(self, timings):
+        """Calibra com as medições de uma execução: [(nó, segundos), ...]"""
+        totals = {}
+        for node, seconds in timings:
+            units = work_units(node)
+            if units <= 0:
+                continue
+            total = totals.setdefault(rate_key(node), [0, 0.0, 0])
+            total[0] += units
+            total[1] += max(seconds - STAGE_OVERHEAD, 0.0)
+            total[2] += 1
+        for op, (units, seconds, count) in totals.items():
+            measured = seconds * 1e9 / units
+            if self.samples.get(op):
+                self.ns_per_unit[op] = ((1 - SMOOTHING) * self.ns_per_unit[op]
+                                        + SMOOTHING * measured)
+            else:
+                self.ns_per_unit[op] = measured
+            self.samples[op] = self.samples.get(op, 0) + count
+
+
+def stages(node):
+    """Nós de que um nó depende (incluindo a decodificação da fonte), das folhas até ele"""
+    order = []
+    seen = set()
+
+    def visit(current):
+        if current.digest in seen:
+            return
+        seen.add(current.digest)
+        for child in current.inputs:
+            visit(child)
+        order.append(current)
+
+    visit(node)
+    return order
+
+
+def critical_path(node, model, finish):
+    """
+    Tempo do caminho mais longo da fonte até o nó (a codificação de um alvo)
+
+    finish (digest -> segundos) é compartilhado entre alvos para não
+    recalcular os ancestrais comuns.
+    """
+    for stage in stages(node):
+        if stage.digest not in finish:
+            start = max((finish.get(child.digest, 0.0) for child in stage.inputs),
+                        default=0.0)
+            finish[stage.digest] = start + model.cost(stage)
+    return finish[node.digest]
+
+
+@dataclass
+class PlannedJob:
+    """Um alvo no plano: etapas próprias, reaproveitadas e tempos previstos"""
+    target: object
+    node: Node                 # Nó de codificação do alvo
+    path: float                # Caminho crítico até o alvo (prioridade)
+    stages: list = field(default_factory=list)  # Etapas que este job calcula
+    shared: list = field(default_factory=list)  # Etapas calculadas por outro job
+    cost: float = 0.0          # Etapas próprias + codificação
+    cached: bool = False       # Já está no repositório de artefatos
+    start: float = 0.0
+    finish: float = 0.0
+
+
+@dataclass
+class Plan:
+    """Jobs na ordem de execução e tempo previsto"""
+    jobs: list = field(default_factory=list)
+    workers: int = 1
+    predicted: float = 0.0    # Tempo de parede previsto
+    sequential: float = 0.0   # Soma dos custos (um job por vez)
+
+    @property
+    def stage_count(self):
+        return sum(len(job.stages) for job in self.jobs)
+
+    @property
+    def reused(self):
+        return sum(len(job.shared) for job in self.jobs)
+
+    @property
+    def cached(self):
+        return sum(1 for job in self.jobs if job.cached)
+
+
+def plan_jobs(targets, nodes, model, workers=1, cached=None):
+    """
+    Ordena os alvos pelo caminho crítico (mais longo primeiro) e simula a
+    execução em `workers` threads
+
+    nodes: nó de codificação de cada alvo; cached: alvos já no repositório.
+    Cada etapa pertence ao primeiro job (na ordem de execução) que a usa; os
+    outros esperam por ela, como o Evaluator faz.
+    """
+    cached = cached or [False] * len(targets)
+    finish = {}
+    jobs = [PlannedJob(target, node, critical_path(node, model, finish), cached=hit)
+            for target, node, hit in zip(targets, nodes, cached)]
+    jobs.sort(key=lambda job: -job.path)
+
+    owner = {}
+    for job in jobs:
+        if job.cached:
+            continue
+        for stage in stages(job.node)[:-1]:
+            if stage.digest in owner:
+                job.shared.append(stage)
+            else:
+                owner[stage.digest] = job
+                job.stages.append(stage)
+        job.cost = sum(model.cost(stage) for stage in job.stages) + model.cost(job.node)
+
+    plan = Plan(jobs, workers, sequential=sum(job.cost for job in jobs))
+    ready = {}  # digest -> instante em que a etapa fica pronta
+    free = [0.0] * workers  # instante em que cada thread fica livre
+    for job in jobs:
+        clock = job.start = heapq.heappop(free)
+        if not job.cached:
+            for stage in job.stages:
+                clock = max([clock] + [ready.get(child.digest, 0.0) for child in stage.inputs])
+                clock += model.cost(stage)
+                ready[stage.digest] = clock
+            clock = max([clock] + [ready.get(stage.digest, 0.0) for stage in job.shared])
+            clock += model.cost(job.node)
+        job.finish = clock
+        heapq.heappush(free, clock)
+    plan.predicted = max((job.finish for job in jobs), default=0.0)
+    return plan
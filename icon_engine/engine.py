@@ -0,0 +1,298 @@
+"""
+Núcleo do motor: renderiza os alvos e entrega os bytes a um destino (sink)
+"""
+
+from dataclasses import replace
+import hashlib
+import io
+import json
+import time
+import zlib
+
+import PIL
+from PIL import Image
+
+from . import color
+from . import operations as ops
+from .background import detect_background
+from .costs import CostModel, encode_node, plan_jobs
+from .graph import (FOREGROUND_DP, NOTIFICATION_DP, Evaluator, layer_node, reduced_source,
+                    variant_node)
+from .journal import FAILED, RESUMED, UNCHANGED, WRITTEN, TargetResult
+from .palette import detect_palette
+from .quality import RELEASE, reduce_factor
+from .scheduler import MemoryScheduler, estimate_nodes
+from .variants import VARIANTS
+
+
+# Configuração fixa do codificador: mesma entrada -> mesmos bytes em qualquer
+# máquina (sem perfil ICC, textos ou datas herdados da mestre)
+PNG_SETTINGS = RELEASE.png
+
+
+def encoder_version(quality=RELEASE):
+    """Entra na chave dos artefatos: outra versão do Pillow/zlib ou outro nível muda os bytes"""
+    return (f"Pillow {PIL.__version__}; zlib {zlib.ZLIB_RUNTIME_VERSION}; "
+            f"png {json.dumps(quality.png, sort_keys=True)}")
+
+
+ENCODER_VERSION = encoder_version()
+
+
+def encode(image, format='PNG', frames=(), png_settings=PNG_SETTINGS):
+    """Codifica uma imagem (ou os quadros de um ICO) em bytes reproduzíveis"""
+    buffer = io.BytesIO()
+    if format == 'ICO':
+        # O maior quadro é a base; os demais são passados prontos
+        frames = sorted(frames, key=lambda img: img.width, reverse=True)
+        frames[0].save(buffer, format='ICO',
+                       sizes=[(img.width, img.height) for img in frames],
+                       append_images=frames[1:])
+    elif format == 'PNG':
+        image.save(buffer, format='PNG', icc_profile=None, **png_settings)
+    else:
+        image.save(buffer, format=format)
+    return buffer.getvalue()
+
+
+def target_nodes(target, source, quality=RELEASE):
+    """Nós de saída do grafo para um alvo (um por quadro no ICO)"""
+    variant = VARIANTS[target.variant]
+    if quality.threshold is not None and variant.remove_background:
+        variant = replace(variant, threshold=quality.threshold)
+    if quality.backing is not None and variant.layout == 'backing':
+        variant = replace(variant, background=quality.backing)
+    filter = quality.filter or None
+    if target.layer:
+        return [layer_node(target.layer, variant, target.size, source, filter, quality.linear)]
+    return [variant_node(variant, size, source, filter, quality.linear)
+            for size in target.frames or (target.size,)]
+
+
+def largest_size(targets):
+    """Maior lado que algum alvo lê da mestre (a notificação parte do foreground)"""
+    sizes = [0]
+    for target in targets:
+        size = max(target.frames or (target.size,))
+        if target.layer == 'notification':
+            size = size * FOREGROUND_DP // NOTIFICATION_DP
+        sizes.append(size)
+    return max(sizes)
+
+
+def artifact_key(target, source, quality=RELEASE):
+    """Chave do artefato: nós do grafo (mestre + etapas), formato e codificador"""
+    payload = json.dumps({
+        'nodes': [node.digest for node in target_nodes(target, source, quality)],
+        'format': target.format,
+        'encoder': encoder_version(quality),
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def render_target(evaluator, source, target, quality=RELEASE):
+    """Renderiza e codifica um alvo avaliando seus nós no grafo"""
+    nodes = target_nodes(target, source, quality)
+    images = [evaluator.evaluate(node) for node in nodes]
+    start = time.perf_counter()
+    if target.frames:
+        data = encode(None, 'ICO', images)
+    else:
+        data = encode(images[0], png_settings=quality.png)
+    evaluator.record(encode_node(nodes, target.format), time.perf_counter() - start)
+    return data
+
+
+def load_source(evaluator, source, quality=RELEASE, largest=0, prepared=None):
+    """
+    Registra o nó fonte da mestre (caminho ou imagem)
+
+    Para um caminho só o cabeçalho é lido agora; os pixels são decodificados na
+    primeira etapa que precisar deles (nunca, se tudo vier do repositório).
+    No proxy (quality.reduce) a mestre é reduzida até perto de `largest`: em
+    JPEG já na decodificação (draft), nos demais por um nó 'reduce' logo
+    depois dela. Uma mestre com perfil ICC é convertida para sRGB na
+    decodificação; com prepared (PreparedSources) a versão convertida vem do
+    cache em disco. Retorna o nó de onde as variantes partem.
+    """
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        draft = None
+        with Image.open(source) as img:
+            size = img.size
+            profile = color.profile_key(img.info.get('icc_profile'), img.mode)
+            if quality.reduce and largest:
+                factor = reduce_factor(size, largest)
+                if factor > 1:
+                    draft = (size[0] // factor, size[1] // factor)
+                    img.draft(None, draft)
+                    size = img.size
+
+        def decode():
+            return ops.decode(source, draft)
+
+        if profile and prepared is not None:
+            key = prepared.key(digest, profile, size)
+
+            def loader():
+                return prepared.load(key, decode)
+        else:
+            loader = decode
+        node = evaluator.add_source(loader, digest, size, profile)
+    else:
+        node = evaluator.add_source(source, ops.image_digest(source))
+    if quality.reduce and largest:
+        node = reduced_source(node, reduce_factor(node.param('dimensions'), largest))
+    return node
+
+
+def analyse_background(evaluator, source, targets=(), quality=RELEASE, prepared=None):
+    """
+    Fundo e corte detectados na mestre (ver background.py)
+
+    Usa o mesmo nó fonte que o build vai usar com este evaluator, então a
+    mestre decodificada aqui é reaproveitada pelas etapas.
+    """
+    return detect_background(evaluator, load_source(evaluator, source, quality,
+                                                    largest_size(targets), prepared))
+
+
+def analyse_palette(evaluator, source, targets=(), quality=RELEASE, prepared=None):
+    """Paleta da arte da mestre (ver palette.py), pelo mesmo nó fonte do build"""
+    return detect_palette(evaluator, load_source(evaluator, source, quality,
+                                                 largest_size(targets), prepared))
+
+
+def make_plan(targets, source, model=None, workers=1, store=None, evaluator=None,
+              quality=RELEASE, prepared=None):
+    """
+    Plano sem renderizar: ordem pelo caminho crítico, etapas reaproveitadas,
+    alvos já no repositório e tempo previsto em `workers` threads
+    """
+    evaluator = evaluator or Evaluator()
+    model = model or CostModel()
+    source_node = load_source(evaluator, source, quality, largest_size(targets), prepared)
+    targets = sorted(targets, key=lambda t: t.path)
+    nodes = [encode_node(target_nodes(target, source_node, quality), target.format)
+             for target in targets]
+    cached = None
+    if store is not None:
+        cached = [store.contains(artifact_key(target, source_node, quality))
+                  for target in targets]
+    return plan_jobs(targets, nodes, model, workers, cached)
+
+
+def run_job(evaluator, source_node, target, key, store=None, quality=RELEASE):
+    """
+    Bytes de um alvo: do repositório ou renderizados (e publicados)
+
+    Retorna (bytes, veio do repositório, segundos, erro) — nunca levanta
+    exceção, para que a falha de um alvo não derrube os demais.
+    """
+    start = time.perf_counter()
+    try:
+        if store is not None:
+            data = store.get(key)
+            if data is not None:
+                return data, True, time.perf_counter() - start, None
+        data = render_target(evaluator, source_node, target, quality)
+        if store is not None:
+            store.put(key, data)
+        return data, False, time.perf_counter() - start, None
+    except Exception as e:
+        return None, False, time.perf_counter() - start, e
+
+
+def schedule_jobs(targets, source_node, evaluator, cost_model=None, workers=1,
+                  quality=RELEASE):
+    """
+    Ordem de início (índices, caminho crítico mais longo primeiro) e pico de
+    memória estimado de cada alvo
+
+    As estimativas seguem a ordem de execução: cada etapa comum é cobrada do
+    primeiro alvo que a usa.
+    """
+    plan = plan_jobs(targets, [encode_node(target_nodes(target, source_node, quality),
+                                           target.format) for target in targets],
+                     cost_model or CostModel(), workers)
+    index = {target.path: position for position, target in enumerate(targets)}
+    order = [index[planned.target.path] for planned in plan.jobs]
+    claimed = set()
+    estimates = [0] * len(targets)
+    for position in order:
+        estimates[position] = estimate_nodes(
+            target_nodes(targets[position], source_node, quality), evaluator, claimed)
+    return order, estimates
+
+
+def target_result(target, key, data, from_store, seconds, error, written=None):
+    """TargetResult de um job (written: retorno do sink.write, False = sem mudança)"""
+    if error is not None:
+        return TargetResult(target.path, FAILED, seconds=seconds, key=key,
+                            error=f"{type(error).__name__}: {error}")
+    return TargetResult(target.path, UNCHANGED if written is False else WRITTEN,
+                        len(data), seconds, from_store, key, hashlib.sha256(data).hexdigest())
+
+
+def build(targets, source, sink, on_result=None, evaluator=None, store=None,
+          scheduler=None, cost_model=None, journal=None, resume=False, quality=RELEASE,
+          prepared=None):
+    """
+    Renderiza os alvos e grava cada um no sink, na ordem dos caminhos
+
+    Todos os alvos (de quantas variantes forem) compartilham o mesmo grafo:
+    cada etapa comum é calculada uma vez. Com um repositório de artefatos
+    (store), alvos já publicados são baixados em vez de renderizados e os
+    novos são publicados. Os alvos rodam no scheduler (padrão: um por vez),
+    do caminho crítico mais longo para o mais curto segundo o modelo de
+    custo; a gravação no sink segue sempre a ordem dos caminhos.
+
+    A falha de um alvo não interrompe os demais. Com um diário (journal),
+    cada resultado é registrado na hora e, com resume=True, alvos concluídos
+    numa execução anterior (mesma chave, mesmo conteúdo no destino) são
+    pulados. Retorna um TargetResult por alvo, na ordem dos caminhos.
+
+    quality escolhe release (padrão) ou proxy; a chave de cada artefato
+    inclui o modo, então um proxy nunca é servido a uma build de release.
+    prepared (PreparedSources) guarda a mestre já convertida para sRGB.
+    """
+    evaluator = evaluator or Evaluator(profile=True)
+    scheduler = scheduler or MemoryScheduler(max_workers=1)
+    if scheduler.resident is None:
+        scheduler.resident = evaluator.resident_bytes
+    source_node = load_source(evaluator, source, quality, largest_size(targets), prepared)
+    targets = sorted(targets, key=lambda t: t.path)
+    keys = {target.path: artifact_key(target, source_node, quality) for target in targets}
+
+    results = {}
+    if journal is not None and resume:
+        for target in targets:
+            entry = journal.completed(target.path, keys[target.path])
+            if entry is not None and sink.contains(target.path, entry['sha256']):
+                results[target.path] = TargetResult(target.path, RESUMED, entry['nbytes'],
+                                                    key=entry['key'], sha256=entry['sha256'])
+    pending = [target for target in targets if target.path not in results]
+
+    def job(target):
+        return run_job(evaluator, source_node, target, keys[target.path], store, quality)
+
+    order, estimates = schedule_jobs(pending, source_node, evaluator, cost_model,
+                                     scheduler.max_workers, quality)
+    outputs = scheduler.map(job, pending, estimates, [target.path for target in pending],
+                            order=order)
+    for target, (data, from_store, seconds, error) in zip(pending, outputs):
+        written = None
+        if error is None:
+            try:
+                written = sink.write(target.path, data)
+            except Exception as e:
+                error = e
+        result = target_result(target, keys[target.path], data, from_store, seconds, error,
+                               written)
+        results[target.path] = result
+        if journal is not None:
+            journal.record(result)
+        if on_result is not None:
+            on_result(target, result)
+    return [results[target.path] for target in targets]
@@ -0,0 +1,306 @@
+"""
+Grafo de etapas (DAG) das variantes de ícone
+
+Cada variante num tamanho vira uma cadeia de nós (fonte -> remoção do fundo ->
+redimensionamento -> máscara/composição). Nós iguais têm o mesmo hash, então
+uma etapa comum a várias variantes (ex.: "fundo removido, 144px") é calculada
+uma única vez por execução.
+"""
+
+from dataclasses import dataclass, field
+import hashlib
+import threading
+import time
+
+from . import operations as ops
+from .background import key_background
+from .cache import LRUCache, entry_size
+
+
+@dataclass(frozen=True)
+class Node:
+    """Uma etapa do grafo: operação, parâmetros e nós de entrada"""
+    op: str
+    params: tuple = ()
+    inputs: tuple = ()
+    digest: str = field(default='', compare=False)
+
+    def __post_init__(self):
+        h = hashlib.sha256(self.op.encode())
+        h.update(repr(self.params).encode())
+        for node in self.inputs:
+            h.update(node.digest.encode())
+        object.__setattr__(self, 'digest', h.hexdigest())
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def __eq__(self, other):
+        return isinstance(other, Node) and self.digest == other.digest
+
+    def param(self, name):
+        return dict(self.params)[name]
+
+
+def _resize_node(node, width, height, filter=None, linear=None):
+    # Sem filtro explícito é o LANCZOS de sempre (mantém os hashes da release);
+    # linear: dimensões da mestre, para reamostrar a partir da pirâmide linear
+    params = (('size', (width, height)),)
+    if filter:
+        params += (('filter', filter),)
+    if linear:
+        node = linear_level(node, linear, max(width, height))
+        params += (('space', 'linear'),)
+    return Node('resize', params, (node,))
+
+
+def largest_side(node):
+    """Maior lado que um redimensionamento ou composição do nó (ou das entradas) produz"""
+    largest = 0
+    pending = [node]
+    seen = set()
+    while pending:
+        current = pending.pop()
+        if current.digest in seen:
+            continue
+        seen.add(current.digest)
+        if current.op == 'resize':
+            largest = max(largest, *current.param('size'))
+        elif current.op == 'compose':
+            largest = max(largest, current.param('size'))
+        pending.extend(current.inputs)
+    return largest
+
+
+def reduced_source(source, factor):
+    """Mestre reduzida por um fator inteiro (modo proxy); factor 1 = a própria"""
+    if factor <= 1:
+        return source
+    width, height = source.param('dimensions')
+    return Node('reduce', (('factor', factor),
+                           ('dimensions', (width // factor, height // factor))), (source,))
+
+
+# Cada saída parte do menor nível da pirâmide com lado >= LEVEL_MARGIN x o dela
+LEVEL_MARGIN = 2
+
+
+def linear_level(node, dimensions, size):
+    """
+    Nível da pirâmide linear (pré-multiplicada, 16 bits) de onde sai um alvo de lado size
+
+    Nível 0 é a mestre convertida; nível 1 é convertido e reduzido de uma vez
+    (sem a mestre inteira em 16 bits); os demais são metades do anterior. Os
+    nós são os mesmos para todos os alvos, então cada nível é calculado uma vez.
+    """
+    width, height = dimensions
+    level = 0
+    while min(-(-width >> (level + 1)), -(-height >> (level + 1))) >= size * LEVEL_MARGIN:
+        level += 1
+    return _pyramid(node, dimensions, level)
+
+
+def _pyramid(node, dimensions, level):
+    width, height = dimensions
+    shape = (-(-width >> level), -(-height >> level))
+    if level <= 1:
+        return Node('linearize', (('factor', 1 << level), ('dimensions', shape)), (node,))
+    return Node('halve', (('dimensions', shape),), (_pyramid(node, dimensions, level - 1),))
+
+
+def variant_node(variant, size, source, filter=None, linear=False):
+    """Nó de saída de uma variante num tamanho, a partir do nó fonte"""
+    node = source
+    if variant.remove_background:
+        node = Node('remove_white', (('threshold', variant.threshold),), (node,))
+    # Dimensões da mestre, guardadas no nó fonte
+    width, height = dict(source.params).get('dimensions', (1, 1))
+    linear = (width, height) if linear else None
+
+    if variant.layout == 'stretch':
+        return _resize_node(node, size, size, filter, linear)
+    if variant.layout == 'circle':
+        # canvas entra no hash: o resultado mudou (cor sob alfa 0 zerada, como no script)
+        return Node('circle_mask', (('canvas', 'transparent'),),
+                    (_resize_node(node, size, size, filter, linear),))
+
+    if variant.layout not in ('backing', 'pad', 'cover'):
+        raise ValueError(f"Layout desconhecido: {variant.layout}")
+    inner = _resize_node(node, *_inner_size(variant, size, width, height), filter, linear)
+    return Node('compose', (('size', size), ('background', variant.background)), (inner,))
+
+
+def _inner_size(variant, size, width, height):
+    """(largura, altura) da mestre redimensionada dentro do canvas do layout"""
+    if variant.layout == 'backing':
+        icon_size = int(size * variant.scale)
+        return icon_size, icon_size
+    if variant.layout == 'pad':
+        padding = int(size * variant.padding)
+        return ops.fit_size(width, height, size - padding * 2)
+    if variant.layout == 'cover':
+        return ops.cover_size(width, height, size)
+    return size, size
+
+
+def art_box(variant, size, dimensions):
+    """Retângulo (esquerda, topo, direita, base) ocupado pela arte no canvas da variante"""
+    width, height = _inner_size(variant, size, *dimensions)
+    left, top = (size - width) // 2, (size - height) // 2
+    return max(left, 0), max(top, 0), min(left + width, size), min(top + height, size)
+
+
+# Densidades do ícone adaptativo: canvas de 108dp, área visível de 72dp;
+# ícones de notificação têm 24dp
+FOREGROUND_DP = 108
+VIEWPORT_DP = 72
+NOTIFICATION_DP = 24
+
+LAYERS = ('monochrome', 'notification')
+
+
+def keyed_foreground(variant, size, source, filter=None, linear=False):
+    """
+    Foreground da variante num tamanho com a cor do fundo da arte transparente
+
+    Parte do mesmo nó do foreground (nada de novo é redimensionado); o fundo
+    é estimado na borda da arte (art_box), não na borda do canvas.
+    """
+    foreground = variant_node(variant, size, source, filter, linear)
+    box = art_box(variant, size, dict(source.params).get('dimensions', (1, 1)))
+    return Node('key_background', (('box', box),), (foreground,))
+
+
+def layer_node(layer, variant, size, source, filter=None, linear=False):
+    """
+    Camada derivada do alfa do foreground (Android 13+)
+
+    monochrome: o alfa do foreground no tamanho do drawable.
+    notification: a área visível (72dp) do foreground da mesma densidade,
+    reduzida a 24dp. As duas partem do nó do próprio foreground naquele
+    tamanho, com o fundo da arte recortado (keyed_foreground, qualquer cor):
+    numa mestre com fundo opaco a silhueta sai da arte, não do quadrado do
+    fundo, e a mestre não é reamostrada de novo. O alfa já é linear: a
+    redução da notificação nunca passa pela pirâmide.
+    """
+    if layer == 'monochrome':
+        alpha = Node('alpha', (), (keyed_foreground(variant, size, source, filter, linear),))
+        return Node('silhouette', (('threshold', ops.MONOCHROME_THRESHOLD),), (alpha,))
+    if layer == 'notification':
+        base = size * FOREGROUND_DP // NOTIFICATION_DP
+        alpha = Node('alpha', (), (keyed_foreground(variant, base, source, filter, linear),))
+        viewport = Node('crop_center', (('size', base * VIEWPORT_DP // FOREGROUND_DP),),
+                        (alpha,))
+        return Node('silhouette', (('threshold', ops.NOTIFICATION_THRESHOLD),),
+                    (_resize_node(viewport, size, size, filter),))
+    raise ValueError(f"Camada desconhecida: {layer}")
+
+
+def _run(node, inputs):
+    """Executa a operação de um nó sobre as imagens de entrada"""
+    if node.op == 'remove_white':
+        return ops.remove_white_background(inputs[0], node.param('threshold'))
+    if node.op == 'key_background':
+        return key_background(inputs[0], node.param('box'))
+    if node.op == 'resize':
+        params = dict(node.params)
+        filter = params.get('filter', 'lanczos')
+        if params.get('space') == 'linear':
+            return ops.resize_linear(inputs[0], node.param('size'), filter)
+        return ops.resize_to(inputs[0], node.param('size'), filter)
+    if node.op == 'reduce':
+        return ops.reduce(inputs[0], node.param('factor'))
+    if node.op == 'linearize':
+        return ops.linearize(inputs[0], node.param('factor'))
+    if node.op == 'halve':
+        return ops.halve(inputs[0])
+    if node.op == 'circle_mask':
+        return ops.circle_mask(inputs[0])
+    if node.op == 'compose':
+        return ops.compose(inputs[0], node.param('size'), node.param('background'))
+    if node.op == 'alpha':
+        return ops.alpha_channel(inputs[0])
+    if node.op == 'crop_center':
+        return ops.crop_center(inputs[0], node.param('size'))
+    if node.op == 'silhouette':
+        return ops.silhouette(inputs[0], node.param('threshold'))
+    raise ValueError(f"Operação desconhecida: {node.op}")
+
+
+class Evaluator:
+    """Avalia nós do grafo com memoização pelo hash do nó"""
+
+    def __init__(self, memo=None, profile=False):
+        self.memo = memo if memo is not None else LRUCache(256 * 1024 * 1024)
+        self.sources = {}  # digest do nó fonte -> imagem mestre (ou função que a carrega)
+        self.computed = 0
+        self._lock = threading.Lock()
+        self._running = {}  # digest -> Event dos nós sendo calculados agora
+        # (nó, segundos) de cada etapa calculada, para o modelo de custo
+        self.timings = [] if profile else None
+
+    def add_source(self, image, digest, size=None, profile=None):
+        """
+        Registra a mestre e retorna seu nó fonte
+
+        image pode ser uma função sem argumentos (carga adiada); nesse caso as
+        dimensões vêm em size. profile: hash do perfil ICC convertido para sRGB
+        na carga (entra no hash do nó). Registrar de novo a mesma mestre mantém
+        a imagem já decodificada.
+        """
+        params = (('digest', digest), ('dimensions', size or image.size))
+        if profile:
+            params += (('profile', profile),)
+        node = Node('source', params)
+        self.sources.setdefault(node.digest, image)
+        return node
+
+    def record(self, node, seconds):
+        """Registra o tempo de uma etapa (ou da codificação) se o perfil estiver ligado"""
+        if self.timings is not None:
+            with self._lock:
+                self.timings.append((node, seconds))
+
+    def is_loaded(self, node):
+        return not callable(self.sources.get(node.digest))
+
+    def resident_bytes(self):
+        """Memória que fica ocupada entre avaliações: mestres carregadas + memo"""
+        sources = sum(entry_size(image) for image in list(self.sources.values())
+                      if not callable(image))
+        return sources + self.memo.current_bytes
+
+    def evaluate(self, node):
+        if node.op == 'source':
+            # Com jobs em paralelo, só um deles decodifica a mestre
+            with self._lock:
+                image = self.sources[node.digest]
+                if callable(image):
+                    start = time.perf_counter()
+                    image = self.sources[node.digest] = image()
+                    if self.timings is not None:
+                        self.timings.append((node, time.perf_counter() - start))
+            return image
+        while True:
+            value = self.memo.get(node.digest)
+            if value is not None:
+                return value
+            # Se outro job já calcula este nó, espera por ele em vez de repetir
+            with self._lock:
+                running = self._running.get(node.digest)
+                if running is None:
+                    running = self._running[node.digest] = threading.Event()
+                    break
+            running.wait()
+        try:
+            inputs = [self.evaluate(child) for child in node.inputs]
+            start = time.perf_counter()
+            value = self.memo.put(node.digest, _run(node, inputs))
+            self.record(node, time.perf_counter() - start)
+            with self._lock:
+                self.computed += 1
+            return value
+        finally:
+            with self._lock:
+                del self._running[node.digest]
+            running.set()
@@ -0,0 +1,90 @@
+"""
+Resultado por alvo e diário (journal) de jobs concluídos para retomar builds
+
+Cada alvo terminado (gravado ou com falha) vira uma linha JSON no diário,
+gravada na hora. Ao retomar, alvos cujo registro tem a mesma chave de
+artefato (mestre + grafo + codificador) e cujo arquivo no destino ainda tem
+o mesmo conteúdo são pulados; só os que falharam ou faltam são refeitos.
+"""
+
+from dataclasses import asdict, dataclass
+import json
+import os
+
+# Arquivo padrão do diário, dentro da pasta de saída (fora do git)
+JOURNAL_FILE = '.icon_journal.jsonl'
+
+# Status de um alvo
+WRITTEN = 'written'       # Bytes gravados no destino
+UNCHANGED = 'unchanged'   # Destino já tinha o mesmo conteúdo
+RESUMED = 'resumed'       # Pulado: concluído numa execução anterior
+RENDERED = 'rendered'     # Bytes prontos, sem destino (API assíncrona)
+FAILED = 'failed'
+
+
+@dataclass
+class TargetResult:
+    """O que aconteceu com um alvo na execução"""
+    path: str
+    status: str
+    nbytes: int = 0
+    seconds: float = 0.0
+    from_store: bool = False  # Bytes vieram do repositório de artefatos
+    key: str = ''             # Chave do artefato
+    sha256: str = ''          # Hash dos bytes gravados
+    error: str = ''
+
+    @property
+    def ok(self):
+        return self.status != FAILED
+
+
+class Journal:
+    """Diário em JSON Lines: uma linha por alvo concluído, a última vale"""
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.entries = {}  # caminho -> último registro
+        if resume:
+            self._load()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Sem retomar, começa um diário novo
+        self._file = open(path, 'a' if resume else 'w', encoding='utf-8')
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Linha cortada por uma interrupção
+                    self.entries[entry['path']] = entry
+        except FileNotFoundError:
+            pass
+
+    def completed(self, path, key):
+        """Registro de sucesso do alvo com a mesma chave (None se precisa refazer)"""
+        entry = self.entries.get(path)
+        if entry is None or entry['status'] == FAILED or entry['key'] != key:
+            return None
+        return entry
+
+    def record(self, result):
+        """Grava o resultado já (uma interrupção não perde os anteriores)"""
+        entry = asdict(result)
+        self.entries[result.path] = entry
+        self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -0,0 +1,191 @@
+"""
+Métricas de uma execução em formato de máquina (dashboards de CI)
+
+Um registro por execução com os tempos e bytes de cada alvo, acertos do
+repositório de artefatos e do memo, uso dos workers e pico de memória. Sai em
+JSON Lines (uma linha por execução, acumulando o histórico) e num textfile
+OpenMetrics para um coletor no estilo do node-exporter. O resumo com emojis
+do build_icons.py é só mais um renderizador sobre os mesmos dados.
+"""
+
+from dataclasses import asdict, dataclass, field
+import json
+import os
+import tempfile
+
+from .journal import FAILED, RESUMED, UNCHANGED, WRITTEN
+
+# Prefixo das métricas no OpenMetrics
+METRIC_PREFIX = 'icon_build'
+
+MB = 1024 * 1024
+
+
+@dataclass
+class RunMetrics:
+    """Tudo o que uma execução mediu"""
+    started: float                     # Início (epoch, segundos)
+    seconds: float                     # Tempo de parede
+    presets: list = field(default_factory=list)
+    quality: str = 'release'
+    source: str = ''
+    threshold: int = None              # Corte do fundo aplicado a todas as variantes
+    background: str = ''               # Cor do fundo detectada (#RRGGBB), se houve detecção
+    targets: list = field(default_factory=list)  # TargetResult em dict, por caminho
+    status: dict = field(default_factory=dict)   # status -> nº de alvos
+    bytes_written: int = 0             # Bytes de fato gravados no destino
+    bytes_saved: int = 0               # Bytes que não precisaram ser gravados (iguais/retomados)
+    store: dict = field(default_factory=dict)    # hits, misses, published, errors
+    memo: dict = field(default_factory=dict)     # hits, misses, entries, bytes
+    stages_computed: int = 0
+    workers: int = 1
+    max_concurrency: int = 0
+    busy_seconds: float = 0.0          # Soma do tempo dos jobs
+    utilisation: float = 0.0           # busy / (parede x workers)
+    budget: int = 0                    # Orçamento de memória do escalonador
+    peak_estimated: int = 0
+    peak_observed: int = None
+    peak_rss: int = None
+    largest_jobs: list = field(default_factory=list)  # Maiores estimativas de memória
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def collect(results, started, seconds, scheduler=None, evaluator=None, store=None,
+            presets=(), quality='release', source='', threshold=None, background=None):
+    """Monta o registro da execução a partir dos resultados e dos componentes"""
+    metrics = RunMetrics(started, seconds, list(presets), quality, source, threshold,
+                         background.hex if background is not None else '')
+    metrics.targets = [asdict(result) for result in results]
+    for status in (WRITTEN, UNCHANGED, RESUMED, FAILED):
+        metrics.status[status] = sum(1 for result in results if result.status == status)
+    metrics.bytes_written = sum(result.nbytes for result in results
+                                if result.status == WRITTEN)
+    metrics.bytes_saved = sum(result.nbytes for result in results
+                              if result.status in (UNCHANGED, RESUMED))
+    if store is not None:
+        metrics.store = store.stats()
+    if evaluator is not None:
+        memo = evaluator.memo.stats()
+        metrics.memo = {name: memo[name] for name in ('hits', 'misses', 'entries', 'bytes')}
+        metrics.stages_computed = evaluator.computed
+    if scheduler is not None:
+        report = scheduler.report()
+        metrics.workers = report['workers']
+        metrics.max_concurrency = report['max_concurrency']
+        metrics.budget = report['budget']
+        metrics.peak_estimated = report['peak_estimated']
+        metrics.peak_observed = report['peak_observed']
+        metrics.peak_rss = report['peak_rss']
+        metrics.largest_jobs = report['largest_jobs']
+        metrics.busy_seconds = sum(job[2] for job in scheduler.jobs)
+        if seconds > 0:
+            metrics.utilisation = metrics.busy_seconds / (seconds * metrics.workers)
+    return metrics
+
+
+def write_jsonl(metrics, path):
+    """Acrescenta o registro como uma linha JSON (histórico de execuções)"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(metrics.to_dict(), ensure_ascii=False, sort_keys=True) + '\n')
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def openmetrics(metrics):
+    """Texto no formato OpenMetrics (termina em '# EOF')"""
+    lines = []
+    base = {'quality': metrics.quality, 'presets': ','.join(metrics.presets)}
+
+    def family(name, kind, help, samples):
+        name = f"{METRIC_PREFIX}_{name}"
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"# HELP {name} {help}")
+        for labels, value in samples:
+            if value is not None:
+                lines.append(f"{name}{_labels(**base, **labels)} {value}")
+
+    family('last_run_timestamp_seconds', 'gauge', "Início da última execução.",
+           [({}, round(metrics.started, 3))])
+    family('duration_seconds', 'gauge', "Tempo de parede da execução.",
+           [({}, round(metrics.seconds, 6))])
+    family('targets', 'gauge', "Alvos por status.",
+           [({'status': status}, count) for status, count in metrics.status.items()])
+    family('bytes_written', 'gauge', "Bytes gravados no destino.",
+           [({}, metrics.bytes_written)])
+    family('bytes_saved', 'gauge', "Bytes que não precisaram ser gravados.",
+           [({}, metrics.bytes_saved)])
+    family('store_requests', 'gauge', "Consultas ao repositório de artefatos.",
+           [({'result': name}, metrics.store[name]) for name in ('hits', 'misses')
+            if name in metrics.store])
+    family('memo_requests', 'gauge', "Consultas ao memo do grafo.",
+           [({'result': name}, metrics.memo[name]) for name in ('hits', 'misses')
+            if name in metrics.memo])
+    family('stages_computed', 'gauge', "Etapas do grafo calculadas.",
+           [({}, metrics.stages_computed)])
+    family('background_threshold', 'gauge', "Corte do fundo branco aplicado.",
+           [({'background': metrics.background}, metrics.threshold)])
+    family('workers', 'gauge', "Threads disponíveis.", [({}, metrics.workers)])
+    family('worker_utilisation_ratio', 'gauge', "Tempo ocupado / (parede x workers).",
+           [({}, round(metrics.utilisation, 4))])
+    family('peak_rss_bytes', 'gauge', "Maior RSS do processo.", [({}, metrics.peak_rss)])
+    family('peak_estimated_bytes', 'gauge', "Pico de memória estimado pelo escalonador.",
+           [({}, metrics.peak_estimated)])
+    family('target_seconds', 'gauge', "Tempo de cada alvo.",
+           [({'path': target['path'], 'status': target['status']},
+             round(target['seconds'], 6)) for target in metrics.targets])
+    family('target_bytes', 'gauge', "Tamanho de cada alvo.",
+           [({'path': target['path']}, target['nbytes']) for target in metrics.targets])
+    lines.append('# EOF')
+    return '\n'.join(lines) + '\n'
+
+
+def write_openmetrics(metrics, path):
+    """Grava o textfile de forma atômica (o coletor nunca lê um arquivo pela metade)"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, temp = tempfile.mkstemp(dir=directory, prefix='.metrics-')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(openmetrics(metrics))
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
+
+
+def render_summary(metrics, log):
+    """Resumo legível (emojis) sobre o mesmo registro"""
+    resumed = metrics.status.get(RESUMED, 0)
+    if resumed:
+        print(f"♻️ {resumed} arquivo(s) já concluído(s) numa execução anterior", file=log)
+    print(f"⏱️ {len(metrics.targets)} arquivo(s) em {metrics.seconds:.2f}s "
+          f"({metrics.bytes_written} bytes gravados, {metrics.bytes_saved} sem mudança)",
+          file=log)
+    observed = metrics.peak_observed
+    observed = f"{observed / MB:.1f} MB" if observed is not None else "n/d"
+    print(f"🧠 Memória: pico estimado {metrics.peak_estimated / MB:.1f} MB, observado "
+          f"{observed} (orçamento {metrics.budget / MB:.0f} MB, até "
+          f"{metrics.max_concurrency} job(s) juntos)", file=log)
+    for job in metrics.largest_jobs[:3]:
+        print(f"   📐 {job['name']}: {job['estimate'] / MB:.1f} MB estimados, "
+              f"{job['seconds'] * 1000:.0f} ms", file=log)
+    print(f"🧵 {metrics.workers} thread(s), {metrics.utilisation:.0%} de ocupação", file=log)
+    if metrics.store:
+        store = metrics.store
+        print(f"🗄️ Repositório: {store['hits']} reaproveitado(s), {store['misses']} "
+              f"renderizado(s), {store['published']} publicado(s)", file=log)
+        if store['errors']:
+            print(f"   ⚠️ {store['errors']} falha(s) de acesso ao repositório", file=log)
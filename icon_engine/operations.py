@@ -0,0 +1,236 @@
+"""
+Operações de imagem usadas pelas variantes de ícone
+Versões únicas das funções que estavam copiadas entre os scripts
+"""
+
+import hashlib
+
+from PIL import Image, ImageDraw
+import numpy as np
+
+from . import color
+
+# Cor rose gold do tema (#E8B4B8)
+ROSE_GOLD = (232, 180, 184, 255)
+BLACK = (0, 0, 0, 255)
+TRANSPARENT = (0, 0, 0, 0)
+
+# Pixels com R, G, B acima deste valor são considerados brancos
+WHITE_THRESHOLD = 240
+
+# Alfa mínimo que entra na silhueta (abaixo disso é halo da remoção do fundo)
+MONOCHROME_THRESHOLD = 24
+NOTIFICATION_THRESHOLD = 64
+
+
+def decode(path, draft=None):
+    """
+    Abre a imagem mestre e converte para RGBA em sRGB (aplica o perfil ICC)
+
+    draft (largura, altura): pede ao decodificador uma versão reduzida (JPEG
+    decodifica direto em 1/2, 1/4 ou 1/8; nos demais formatos não muda nada).
+    """
+    img = Image.open(path)
+    if draft:
+        img.draft(None, tuple(draft))
+    img.load()
+    return color.to_srgb(img)
+
+
+def image_digest(img):
+    """Hash do conteúdo de uma imagem já decodificada"""
+    h = hashlib.sha256(f"{img.mode}{img.size}".encode())
+    h.update(img.tobytes())
+    return h.hexdigest()
+
+
+def remove_white_background(img, threshold=WHITE_THRESHOLD):
+    """Remove fundo branco da imagem (versão numpy)"""
+    data = np.array(img.convert('RGBA'))
+    white_mask = ((data[:, :, 0] > threshold) & (data[:, :, 1] > threshold)
+                  & (data[:, :, 2] > threshold))
+    data[white_mask] = [0, 0, 0, 0]
+    return Image.fromarray(data, 'RGBA')
+
+
+def resize(img, size):
+    """Redimensiona para um quadrado size x size"""
+    return img.resize((size, size), Image.Resampling.LANCZOS)
+
+
+# Filtros de redimensionamento por nome (o nome entra no hash do nó)
+FILTERS = {
+    'lanczos': Image.Resampling.LANCZOS,
+    'bilinear': Image.Resampling.BILINEAR,
+}
+
+
+def resize_to(img, size, filter='lanczos'):
+    """Redimensiona para (largura, altura)"""
+    return img.resize(tuple(size), FILTERS[filter])
+
+
+def reduce(img, factor):
+    """Reduz por um fator inteiro (média de blocos, bem mais barato que resample)"""
+    return img.reduce(factor) if factor > 1 else img
+
+
+# --- Luz linear --------------------------------------------------------------
+# Reamostrar sRGB direto escurece traços finos e bordas claras (a média é
+# feita nos valores com gama). No caminho linear a imagem passa por uma LUT
+# para 16 bits lineares pré-multiplicados, é reamostrada ali e volta por
+# outra LUT. Os níveis da pirâmide (mestre, 1/2, 1/4...) ficam nesse formato
+# e cada saída parte do menor nível com pelo menos o dobro do seu tamanho.
+
+def _srgb_to_linear():
+    c = np.arange(256) / 255
+    linear = np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+    return np.round(linear * 65535).astype(np.uint16)
+
+
+def _linear_to_srgb():
+    linear = np.arange(65536) / 65535
+    c = np.where(linear <= 0.0031308, linear * 12.92, 1.055 * linear ** (1 / 2.4) - 0.055)
+    return np.round(c * 255).astype(np.uint8)
+
+
+SRGB_TO_LINEAR = _srgb_to_linear()   # 256 entradas: sRGB 8 bits -> linear 16 bits
+LINEAR_TO_SRGB = _linear_to_srgb()   # 65536 entradas: linear 16 bits -> sRGB 8 bits
+
+# A mesma LUT já pré-multiplicada: índice (alfa << 8) | canal -> linear x alfa
+PREMULTIPLIED_LINEAR = np.round(
+    SRGB_TO_LINEAR[None, :] * (np.arange(256)[:, None] / 255)).astype(np.uint16).ravel()
+
+# Linhas convertidas por vez: o nível inteiro em 32 bits nunca fica em memória
+STRIP_ROWS = 256
+
+
+def _halve_plane(plane):
+    """Média 2x2 de um canal uint32 (lado ímpar repete a última linha/coluna)"""
+    if plane.shape[0] % 2 or plane.shape[1] % 2:
+        plane = np.pad(plane, ((0, plane.shape[0] % 2), (0, plane.shape[1] % 2)), mode='edge')
+    rows = plane[0::2] + plane[1::2]
+    return (rows[:, 0::2] + rows[:, 1::2] + 2) >> 2
+
+
+def linearize(img, factor=1):
+    """
+    RGBA sRGB -> buffer linear pré-multiplicado uint16 (H x W x 4)
+
+    factor 2 já devolve a metade (nível 1 da pirâmide) sem montar o nível 0.
+    Um canal por vez, em faixas de linhas: uma consulta à LUT por pixel.
+    """
+    if factor not in (1, 2):
+        raise ValueError(f"Fator de linearização inválido: {factor}")
+    data = np.asarray(img)
+    height, width = data.shape[:2]
+    out = np.empty((-(-height // factor), -(-width // factor), 4), dtype=np.uint16)
+    step = STRIP_ROWS * factor
+    for top in range(0, height, step):
+        strip = data[top:top + step]
+        alpha = strip[:, :, 3].astype(np.uint16)
+        index = alpha << 8
+        for band in range(4):
+            if band < 3:
+                plane = PREMULTIPLIED_LINEAR[index | strip[:, :, band]]
+            else:
+                plane = alpha * np.uint16(257)
+            if factor == 2:
+                plane = _halve_plane(plane.astype(np.uint32))
+            out[top // factor:top // factor + plane.shape[0], :, band] = plane
+    return out
+
+
+def halve(buffer):
+    """Próximo nível da pirâmide linear (média 2x2, correta em luz linear)"""
+    height, width = buffer.shape[:2]
+    out = np.empty((-(-height // 2), -(-width // 2), 4), dtype=np.uint16)
+    step = STRIP_ROWS * 2
+    for top in range(0, height, step):
+        for band in range(4):
+            plane = _halve_plane(buffer[top:top + step, :, band].astype(np.uint32))
+            out[top // 2:top // 2 + plane.shape[0], :, band] = plane
+    return out
+
+
+def resize_linear(buffer, size, filter='lanczos'):
+    """Reamostra um buffer linear pré-multiplicado e volta para RGBA sRGB"""
+    width, height = size
+    channels = np.empty((height, width, 4), dtype=np.float32)
+    for band in range(4):
+        plane = Image.fromarray(np.ascontiguousarray(buffer[:, :, band], dtype=np.float32), 'F')
+        channels[:, :, band] = np.asarray(plane.resize((width, height), FILTERS[filter]))
+    # O LANCZOS passa um pouco do intervalo nas bordas; a cor não passa do alfa
+    alpha = np.clip(channels[:, :, 3], 0, 65535)
+    rgb = np.minimum(np.clip(channels[:, :, :3], 0, None), alpha[:, :, None])
+    visible = alpha > 0
+    rgb[visible] *= (65535 / alpha[visible])[:, None]
+    rgb[~visible] = 0
+    out = np.empty((height, width, 4), dtype=np.uint8)
+    out[:, :, :3] = LINEAR_TO_SRGB[(rgb + 0.5).astype(np.uint16)]
+    out[:, :, 3] = (alpha / 257 + 0.5).astype(np.uint8)
+    return Image.fromarray(out, 'RGBA')
+
+
+def circle_mask(img):
+    """
+    Aplica máscara circular com margem de 12.5% (create_adaptive_icons.py)
+
+    Como no script, o resultado é colado num canvas transparente: a cor sob o
+    alfa 0 vira preto e os bytes do PNG saem iguais aos dele.
+    """
+    size = img.width
+    mask = Image.new('L', (size, size), 0)
+    draw = ImageDraw.Draw(mask)
+    margin = size // 8
+    draw.ellipse([margin, margin, size - margin, size - margin], fill=255)
+    masked = img.copy()
+    masked.putalpha(mask)
+    return compose(masked, size, offset=(0, 0))
+
+
+def compose(foreground, size, background=TRANSPARENT, offset=None):
+    """
+    Cola o foreground (com seu alfa) num canvas size x size
+
+    Um canvas por tamanho: um atlas único com todos os tamanhos foi medido mais lento.
+    """
+    canvas = Image.new('RGBA', (size, size), background)
+    if offset is None:
+        offset = ((size - foreground.width) // 2, (size - foreground.height) // 2)
+    canvas.paste(foreground, offset, foreground)
+    return canvas
+
+
+def alpha_channel(img):
+    """Canal alfa (modo L) de uma imagem RGBA"""
+    return img.getchannel('A')
+
+
+def crop_center(img, size):
+    """Recorte central size x size"""
+    left = (img.width - size) // 2
+    top = (img.height - size) // 2
+    return img.crop((left, top, left + size, top + size))
+
+
+def silhouette(alpha, threshold):
+    """Silhueta branca a partir de um alfa (modo L); abaixo do limiar vira 0"""
+    mask = np.asarray(alpha)
+    data = np.full(mask.shape + (4,), 255, dtype=np.uint8)
+    data[:, :, 3] = np.where(mask >= threshold, mask, 0)
+    return Image.fromarray(data, 'RGBA')
+
+
+def fit_size(width, height, box):
+    """Tamanho que cabe em box x box mantendo proporção (como thumbnail)"""
+    scale = min(box / width, box / height, 1.0)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def cover_size(width, height, size):
+    """Tamanho que cobre size x size mantendo proporção (fix_icon_fill.py)"""
+    ratio = width / height
+    if ratio > 1.0:
+        return int(size * ratio), size
+    return size, int(size / ratio)
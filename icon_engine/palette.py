@@ -0,0 +1,142 @@
+"""
+Paleta da marca extraída da mestre (cor dominante e complementar)
+
+A cor de fundo do ícone adaptativo (colors.xml), o rose gold do fundo das
+variantes 'backing' e o primary do tema (src/theme/colors.js) eram mantidos
+iguais à mão. Aqui a cor dominante da arte sai de uma quantização vetorizada
+(histograma de cores com 4 bits por canal, um bincount) numa cópia reduzida
+da mestre, sem os pixels do fundo (cor da borda) nem os transparentes. A
+mesma paleta vira parâmetro das variantes e é gravada nos arquivos de cor
+na mesma execução.
+"""
+
+import colorsys
+from dataclasses import dataclass
+import re
+import time
+
+import numpy as np
+
+from .targets import RES_DIR
+
+# Arquivos de cor atualizados com a paleta (relativos à raiz do repositório)
+COLORS_XML = f"{RES_DIR}/values/colors.xml"
+THEME_FILE = "src/theme/colors.js"
+
+# Lado menor da cópia reduzida analisada
+ANALYSIS_SIZE = 128
+
+# Bits por canal na quantização (16 níveis: 4096 caixas)
+QUANT_BITS = 4
+
+# Largura da borda amostrada para achar a cor do fundo, em fração do lado
+BORDER_FRACTION = 1 / 32
+
+# Pixels a até essa distância (maior diferença entre canais) da cor do fundo
+# são fundo, não arte
+BACKGROUND_DISTANCE = 48
+
+# Quanto as variações escura e clara do tema puxam para preto e para branco
+# (aproxima o primaryDark/primaryLight originais do rose gold)
+DARKEN = 0.08
+LIGHTEN = 0.35
+
+
+@dataclass(frozen=True)
+class Palette:
+    """Cores derivadas da arte (RGB)"""
+    dominant: tuple       # Cor mais frequente da arte: fundo do ícone e primary do tema
+    complementary: tuple  # Dominante com o matiz girado 180°
+    dark: tuple           # primaryDark
+    light: tuple          # primaryLight
+    analysed: tuple = ()  # Tamanho da cópia reduzida analisada (vazio = cor informada)
+    seconds: float = 0.0
+
+    @property
+    def background(self):
+        """Cor RGBA do fundo das variantes 'backing'"""
+        return self.dominant + (255,)
+
+
+def hex_color(rgb):
+    return '#' + ''.join(f'{channel:02X}' for channel in rgb[:3])
+
+
+def _mix(rgb, target, amount):
+    return tuple(round(channel + (goal - channel) * amount)
+                 for channel, goal in zip(rgb, target))
+
+
+def _complementary(rgb):
+    hue, lightness, saturation = colorsys.rgb_to_hls(*(channel / 255 for channel in rgb))
+    return tuple(round(channel * 255) for channel in
+                 colorsys.hls_to_rgb((hue + 0.5) % 1.0, lightness, saturation))
+
+
+def palette_from_color(rgb, analysed=(), seconds=0.0):
+    """Paleta completa a partir da cor dominante (informada ou detectada)"""
+    rgb = tuple(int(channel) for channel in rgb[:3])
+    return Palette(rgb, _complementary(rgb), _mix(rgb, (0, 0, 0), DARKEN),
+                   _mix(rgb, (255, 255, 255), LIGHTEN), analysed, seconds)
+
+
+def extract_palette(img):
+    """Paleta de uma imagem RGBA (qualquer tamanho), pela cor dominante da arte"""
+    start = time.perf_counter()
+    factor = max(1, min(img.size) // ANALYSIS_SIZE)
+    proxy = img.reduce(factor) if factor > 1 else img
+    data = np.asarray(proxy)
+    rgb = data[:, :, :3].astype(np.int16)
+    art = data[:, :, 3] > 0
+
+    border = max(1, round(min(proxy.size) * BORDER_FRACTION))
+    ring = np.ones(art.shape, dtype=bool)
+    ring[border:-border, border:-border] = False
+    ring &= art
+    if ring.any():
+        color = np.median(rgb[ring], axis=0)
+        art &= np.abs(rgb - color).max(axis=2) > BACKGROUND_DISTANCE
+    if not art.any():
+        raise ValueError("Não há arte na mestre para extrair a paleta")
+
+    # Uma caixa por cor quantizada; a cor da caixa vencedora é a média real
+    # dos pixels dela (não o centro da caixa)
+    pixels = rgb[art]
+    shift = 8 - QUANT_BITS
+    boxes = ((pixels[:, 0] >> shift) << (2 * QUANT_BITS)
+             | (pixels[:, 1] >> shift) << QUANT_BITS | pixels[:, 2] >> shift)
+    counts = np.bincount(boxes, minlength=1 << (3 * QUANT_BITS))
+    winner = boxes == counts.argmax()
+    dominant = np.round(pixels[winner].mean(axis=0))
+    return palette_from_color(dominant, proxy.size, time.perf_counter() - start)
+
+
+def detect_palette(evaluator, source_node):
+    """Paleta da mestre de um nó fonte (decodifica pelo evaluator, uma vez só)"""
+    return extract_palette(evaluator.evaluate(source_node))
+
+
+def colors_xml(text, palette):
+    """colors.xml com o ic_launcher_background trocado pela cor dominante"""
+    updated, count = re.subn(r'(<color name="ic_launcher_background">)[^<]*(</color>)',
+                             rf'\g<1>{hex_color(palette.dominant)}\g<2>', text)
+    if not count:
+        raise ValueError(f"{COLORS_XML} não tem a cor ic_launcher_background")
+    return updated
+
+
+# Chaves do tema que seguem a paleta
+THEME_KEYS = {
+    'primary': 'dominant',
+    'primaryDark': 'dark',
+    'primaryLight': 'light',
+    'buttonPrimary': 'dominant',
+}
+
+
+def theme_colors(text, palette):
+    """src/theme/colors.js com as cores primárias trocadas pela paleta"""
+    for key, attribute in THEME_KEYS.items():
+        text = re.sub(rf"(\b{key}:\s*')#[0-9A-Fa-f]{{6}}(')",
+                      rf"\g<1>{hex_color(getattr(palette, attribute))}\g<2>", text)
+    return text
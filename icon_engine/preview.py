@@ -0,0 +1,199 @@
+"""
+Servidor local de pré-visualização das variantes de ícone
+
+Cada renderização (variante, tamanho, parâmetros) fica num cache LRU em
+memória, chaveada pelo hash do nó no grafo de etapas; mudar um parâmetro
+re-renderiza apenas os tiles (e as etapas) que dependem dele.
+
+Rotas:
+    /                 folha de contato com todas as variantes lado a lado
+    /render           PNG de ?variant=...&size=...&<parâmetros> (size até MAX_SIZE)
+    /target           PNG/ICO de um alvo real: ?preset=...&path=...
+    /stats            estatísticas do cache (JSON)
+"""
+
+import hashlib
+import html
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+from . import operations as ops
+from .cache import LRUCache
+from .engine import encode
+from .targets import PRESETS
+from .graph import Evaluator, largest_side, layer_node, variant_node
+from .variants import VARIANTS, with_params
+
+# Tamanhos mostrados na folha de contato
+SHEET_SIZES = [20, 48, 96, 192, 432]
+
+# Parâmetros editáveis pela folha de contato
+SHEET_PARAMS = ['threshold', 'scale', 'padding', 'background']
+
+# Maior tamanho aceito por /render e maior lado de qualquer etapa (scale ou
+# padding grandes): o maior alvo real. Acima disso um pedido só serviria para
+# gastar memória e CPU do servidor
+MAX_SIZE = max(target.size for preset in PRESETS.values() for target in preset())
+
+
+class PreviewRenderer:
+    """Renderiza sob demanda a partir da mestre, com cache LRU em bytes"""
+
+    def __init__(self, source, max_bytes=64 * 1024 * 1024):
+        self.source = source
+        self.cache = LRUCache(max_bytes)
+        # As etapas intermediárias do grafo dividem o mesmo orçamento
+        self.evaluator = Evaluator(memo=self.cache)
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._node = None
+
+    def source_node(self):
+        """Nó fonte da mestre; recarrega se o arquivo mudou no disco"""
+        with self._lock:
+            mtime = os.path.getmtime(self.source)
+            if mtime != self._mtime:
+                with open(self.source, 'rb') as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()
+                self.evaluator.sources.clear()
+                self._node = self.evaluator.add_source(ops.decode(self.source), digest)
+                self._mtime = mtime
+            return self._node
+
+    def frame(self, variant, size):
+        return self.evaluator.evaluate(bounded(variant_node(variant, size, self.source_node())))
+
+    def render(self, variant, size):
+        """PNG de um tamanho da variante"""
+        node = bounded(variant_node(variant, size, self.source_node()))
+        key = ('png', node.digest)
+        return self.cache.get_or_compute(key, lambda: encode(self.evaluator.evaluate(node)))
+
+    def render_target(self, target, variant):
+        if target.layer:
+            node = bounded(layer_node(target.layer, variant, target.size, self.source_node()))
+            return self.cache.get_or_compute(('png', node.digest),
+                                             lambda: encode(self.evaluator.evaluate(node)))
+        if not target.frames:
+            return self.render(variant, target.size)
+        source = self.source_node()
+        key = ('ico', tuple(variant_node(variant, size, source).digest
+                            for size in target.frames))
+        return self.cache.get_or_compute(key, lambda: encode(
+            None, 'ICO', [self.frame(variant, size) for size in target.frames]))
+
+
+def render_size(value):
+    """Tamanho pedido a /render; fora de 1..MAX_SIZE vira ValueError (HTTP 400)"""
+    size = int(value)
+    if not 1 <= size <= MAX_SIZE:
+        raise ValueError(f"size deve estar entre 1 e {MAX_SIZE}: {size}")
+    return size
+
+
+def bounded(node):
+    """O próprio nó, se nenhuma etapa passar de MAX_SIZE (senão ValueError, HTTP 400)"""
+    side = largest_side(node)
+    if side > MAX_SIZE:
+        raise ValueError(f"Parâmetros geram uma etapa de {side}px (máximo {MAX_SIZE})")
+    return node
+
+
+def tile_url(variant, size):
+    """URL de um tile contendo só os parâmetros relevantes para a variante"""
+    query = {'variant': variant.name, 'size': size}
+    for name, value in variant.params().items():
+        if name in SHEET_PARAMS:
+            if name == 'background':
+                value = ''.join(f'{c:02X}' for c in value)
+            query[name] = value
+    return '/render?' + urlencode(query)
+
+
+def contact_sheet(overrides):
+    """HTML da folha de contato com as variantes nas linhas e tamanhos nas colunas"""
+    inputs = ''.join(
+        f'<label>{name} <input name="{name}" value="{html.escape(overrides.get(name, ""))}" '
+        f'size="8"></label> ' for name in SHEET_PARAMS)
+    header = ''.join(f'<th>{size}px</th>' for size in SHEET_SIZES)
+    rows = []
+    for name, base in VARIANTS.items():
+        variant = with_params(base, overrides)
+        cells = ''.join(
+            f'<td><img src="{html.escape(tile_url(variant, size))}" '
+            f'width="{size}" height="{size}" loading="lazy"></td>'
+            for size in SHEET_SIZES)
+        rows.append(f'<tr><th>{name}</th>{cells}</tr>')
+    return f"""<!DOCTYPE html>
+<html lang="pt-BR"><head><meta charset="utf-8"><title>Variantes de ícone</title>
+<style>
+body {{ font-family: sans-serif; background: #1A1A1A; color: #FFFFFF; }}
+td {{ padding: 8px; text-align: center; vertical-align: middle;
+      background: repeating-conic-gradient(#3A3A3A 0 25%, #2D2D2D 0 50%) 0 0 / 16px 16px; }}
+th {{ padding: 8px; color: #E8B4B8; }}
+</style></head><body>
+<h1>🎨 Variantes de ícone</h1>
+<form method="get">{inputs}<button>Atualizar</button></form>
+<table><tr><th></th>{header}</tr>{''.join(rows)}</table>
+</body></html>"""
+
+
+class PreviewHandler(BaseHTTPRequestHandler):
+    renderer = None  # Definido por make_server
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = dict(parse_qsl(url.query))
+        try:
+            if url.path == '/':
+                self._send(200, 'text/html; charset=utf-8', contact_sheet(query).encode())
+            elif url.path == '/render':
+                variant = with_params(VARIANTS[query.pop('variant')], query)
+                size = render_size(query['size'])
+                self._timed(lambda: self.renderer.render(variant, size), 'image/png')
+            elif url.path == '/target':
+                targets = {t.path: t for t in PRESETS[query.pop('preset')]()}
+                target = targets[query.pop('path')]
+                variant = with_params(VARIANTS[target.variant], query)
+                content_type = 'image/x-icon' if target.frames else 'image/png'
+                self._timed(lambda: self.renderer.render_target(target, variant), content_type)
+            elif url.path == '/stats':
+                self._send(200, 'application/json',
+                           json.dumps(self.renderer.cache.stats()).encode())
+            else:
+                self._send(404, 'text/plain; charset=utf-8', b'not found')
+        except (KeyError, ValueError, OverflowError) as e:
+            self._send(400, 'text/plain; charset=utf-8', f'{e}'.encode())
+
+    def _timed(self, render, content_type):
+        start = time.perf_counter()
+        data = render()
+        elapsed = (time.perf_counter() - start) * 1000
+        headers = {
+            'X-Render-Ms': f'{elapsed:.2f}',
+            'Cache-Control': 'no-cache',
+        }
+        self._send(200, content_type, data, headers)
+
+    def _send(self, status, content_type, body, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(source, host='127.0.0.1', port=8765, max_bytes=64 * 1024 * 1024):
+    """Cria o servidor HTTP de pré-visualização (sem iniciar)"""
+    renderer = PreviewRenderer(source, max_bytes)
+    handler = type('BoundPreviewHandler', (PreviewHandler,), {'renderer': renderer})
+    return ThreadingHTTPServer((host, port), handler)
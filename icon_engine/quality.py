@@ -0,0 +1,62 @@
+"""
+Modos de qualidade: release (o que vai para o repositório) e proxy (rascunho)
+
+O proxy serve para iterar no desenho da mestre: decodifica reduzido, usa um
+filtro de redimensionamento mais barato e codifica o PNG no nível mais rápido
+do zlib. As diferenças entram nos hashes dos nós e na chave dos artefatos,
+então memo, repositório e diário nunca confundem um proxy com a release.
+Qualquer modo pode reamostrar em luz linear (with_linear) e usar um corte
+de fundo próprio (with_threshold) e trocar o fundo das variantes 'backing'
+pela cor da paleta (with_backing); todos mudam os nós e, com eles, as chaves.
+"""
+
+from dataclasses import dataclass, field, replace
+
+# Pasta de rascunho padrão do proxy (fora do git, fora das árvores de release)
+PROXY_DIR = '.icon_proxy'
+
+
+@dataclass(frozen=True)
+class Quality:
+    """Como a mestre é reduzida, reamostrada e codificada"""
+    name: str
+    png: dict = field(hash=False)  # Parâmetros do PNG (entram na chave do artefato)
+    filter: str = ''          # Filtro do redimensionamento ('' = LANCZOS de sempre)
+    reduce: bool = False      # Reduzir a mestre até perto do maior alvo antes de tudo
+    linear: bool = False      # Reamostrar em luz linear (pirâmide de 16 bits)
+    threshold: int = None     # Corte do fundo branco em todas as variantes (None = o de cada uma)
+    backing: tuple = None     # Fundo RGBA das variantes 'backing' (None = o de cada uma)
+
+
+RELEASE = Quality('release', {'compress_level': 6, 'optimize': False})
+PROXY = Quality('proxy', {'compress_level': 1, 'optimize': False},
+                filter='bilinear', reduce=True)
+
+QUALITIES = {quality.name: quality for quality in (RELEASE, PROXY)}
+
+
+def with_threshold(quality, threshold):
+    """A mesma qualidade com o corte do fundo fixado (ex.: o detectado na mestre)"""
+    return replace(quality, threshold=threshold)
+
+
+def with_backing(quality, background):
+    """A mesma qualidade com o fundo das variantes 'backing' trocado (ex.: pela paleta)"""
+    return replace(quality, backing=tuple(background))
+
+
+def with_linear(quality):
+    """A mesma qualidade reamostrando em luz linear (o nome ganha '+linear')"""
+    if quality.linear:
+        return quality
+    return replace(quality, name=f"{quality.name}+linear", linear=True)
+
+
+def reduce_factor(dimensions, largest):
+    """
+    Maior fator inteiro que mantém o lado menor da mestre >= largest
+
+    A redução nunca faz um alvo ser ampliado: o maior tamanho pedido continua
+    vindo de pixels reais.
+    """
+    return max(1, min(dimensions) // max(largest, 1))
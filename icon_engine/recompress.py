@@ -0,0 +1,282 @@
+"""
+Recompressão sem perda dos PNGs versionados que a build não gera
+
+Nenhum script otimizava os PNGs que estão no repositório fora da build (os
+node_modules_reactnavigation_* copiados para drawable-*dpi e afins). Aqui cada PNG é
+recodificado no nível máximo do zlib, também nos modos menores que guardam
+os mesmos pixels (RGB sem alfa, cinza, paleta exata de até 256 cores); o
+menor só substitui o arquivo depois de decodificado e comparado pixel a
+pixel com o original. Os arquivos rodam em paralelo no MemoryScheduler do
+motor e os que já estão no menor tamanho ficam num índice ao lado
+(RECOMPRESS_INDEX), pelo hash do conteúdo, para as próximas execuções os
+pularem.
+
+Os ícones que algum preset grava ficam de fora por padrão: a build os
+regrava com os bytes da release (nível 6) e a próxima build desfaria a
+recompressão. find_pngs(exclude=()) os inclui (recompress --include-build).
+"""
+
+from dataclasses import dataclass
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+import zlib
+
+import PIL
+from PIL import Image
+import numpy as np
+
+from .scheduler import JOB_OVERHEAD, MemoryScheduler
+from .targets import IOS_DIR, PRESETS, RES_DIR
+
+# Índice local dos arquivos já no menor tamanho (no .gitignore: depende do
+# Pillow/zlib de cada máquina)
+RECOMPRESS_INDEX = '.icon_recompress.json'
+
+# Árvores percorridas por padrão
+TREES = (RES_DIR, IOS_DIR)
+
+# Modos que o encoder PNG do Pillow grava sem perda (8 bits por canal)
+MODES = ('L', 'LA', 'P', 'RGB', 'RGBA')
+
+# Metadados que o Pillow lê mas não grava: arquivos com eles ficam como estão
+UNWRITABLE = ('gamma', 'chromaticity', 'srgb')
+
+# Candidatos codificados de uma vez por arquivo (cópias RGBA, índices, bytes)
+WORKING_COPIES = 6
+
+# Status de um arquivo
+SMALLER = 'smaller'     # Recodificado menor (e gravado, fora do dry-run)
+OPTIMAL = 'optimal'     # Nenhum candidato menor: entra no índice
+INDEXED = 'indexed'     # Pulado: mesmo conteúdo já registrado no índice
+KEPT = 'kept'           # Não recomprimível (modo ou metadados)
+FAILED = 'failed'
+
+
+def recompress_version():
+    """Entra no índice: outro Pillow/zlib pode achar arquivos menores"""
+    return f"Pillow {PIL.__version__}; zlib {zlib.ZLIB_RUNTIME_VERSION}; optimize"
+
+
+@dataclass
+class RecompressResult:
+    """O que aconteceu com um PNG"""
+    path: str
+    status: str
+    before: int = 0
+    after: int = 0
+    mode: str = ''        # Modo do PNG gravado
+    seconds: float = 0.0
+    sha256: str = ''      # Hash do conteúdo final (o que vai para o índice)
+    error: str = ''
+
+    @property
+    def saved(self):
+        return self.before - self.after if self.status == SMALLER else 0
+
+
+def build_outputs():
+    """Caminhos que algum preset grava na árvore do projeto"""
+    return {target.path for preset in PRESETS.values() for target in preset()}
+
+
+def find_pngs(trees=TREES, root='.', exclude=None):
+    """
+    PNGs das árvores, relativos a root, em ordem (nine-patch fica de fora)
+
+    exclude: caminhos ignorados; por padrão os que a build gera (build_outputs),
+    () para não ignorar nenhum.
+    """
+    exclude = build_outputs() if exclude is None else set(exclude)
+    paths = []
+    for tree in trees:
+        for directory, _, files in os.walk(os.path.join(root, tree)):
+            for name in files:
+                if name.endswith('.png') and not name.endswith('.9.png'):
+                    paths.append(os.path.relpath(os.path.join(directory, name), root))
+    paths = (path.replace(os.sep, '/') for path in paths)
+    return sorted(path for path in paths if path not in exclude)
+
+
+def load_index(path, version=None):
+    """caminho -> hash do conteúdo já no menor tamanho (vazio se o encoder mudou)"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get('encoder') != (version or recompress_version()):
+        return {}
+    return dict(data.get('files', {}))
+
+
+def save_index(path, files, version=None):
+    """Grava o índice de forma atômica, em ordem (diff estável no git)"""
+    directory = os.path.dirname(path) or '.'
+    fd, temp = tempfile.mkstemp(dir=directory, prefix='.recompress-')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'encoder': version or recompress_version(),
+                       'files': dict(sorted(files.items()))}, f, indent=1)
+            f.write('\n')
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
+
+
+def _candidates(img, rgba):
+    """Imagens com os mesmos pixels RGBA nos modos que podem sair menores"""
+    yield img
+    opaque = bool((rgba[:, :, 3] == 255).all())
+    gray = bool((rgba[:, :, 0] == rgba[:, :, 1]).all() and (rgba[:, :, 1] == rgba[:, :, 2]).all())
+    if gray:
+        if opaque:
+            yield Image.fromarray(np.ascontiguousarray(rgba[:, :, 0]), 'L')
+        else:
+            yield Image.fromarray(np.ascontiguousarray(rgba[:, :, [0, 3]]), 'LA')
+    elif opaque:
+        yield Image.fromarray(np.ascontiguousarray(rgba[:, :, :3]), 'RGB')
+
+    # Paleta exata: cada cor RGBA distinta vira uma entrada (sem quantizar)
+    colors, index = np.unique(rgba.view(np.uint32).reshape(rgba.shape[:2]),
+                              return_inverse=True)
+    if len(colors) <= 256:
+        palette = colors.view(np.uint8).reshape(-1, 4)
+        indexed = Image.fromarray(index.reshape(rgba.shape[:2]).astype(np.uint8), 'P')
+        indexed.putpalette(palette[:, :3].tobytes())
+        if not opaque:
+            indexed.info['transparency'] = palette[:, 3].tobytes()
+        yield indexed
+
+
+def _encode(img, info):
+    buffer = io.BytesIO()
+    options = {'optimize': True}
+    if 'transparency' in img.info:
+        options['transparency'] = img.info['transparency']
+    for name in ('icc_profile', 'dpi'):
+        if name in info:
+            options[name] = info[name]
+    img.save(buffer, format='PNG', **options)
+    return buffer.getvalue()
+
+
+def _pixels(data):
+    with Image.open(io.BytesIO(data)) as img:
+        return np.asarray(img.convert('RGBA'))
+
+
+def recompress_png(path, data):
+    """
+    Menor PNG com os mesmos pixels de data; retorna (RecompressResult, bytes novos ou None)
+    """
+    start = time.perf_counter()
+    sha256 = hashlib.sha256(data).hexdigest()
+    with Image.open(io.BytesIO(data)) as img:
+        img.load()
+    info = img.info
+    if img.mode not in MODES or any(name in info for name in UNWRITABLE):
+        return RecompressResult(path, KEPT, len(data), len(data), img.mode,
+                                time.perf_counter() - start, sha256), None
+    rgba = np.ascontiguousarray(np.asarray(img.convert('RGBA')))
+
+    encoded = sorted(((_encode(candidate, info), candidate.mode)
+                      for candidate in _candidates(img, rgba)), key=lambda pair: len(pair[0]))
+    for candidate, mode in encoded:
+        if len(candidate) >= len(data):
+            break
+        # Só substitui o que decodifica exatamente nos mesmos pixels
+        if np.array_equal(_pixels(candidate), rgba):
+            return RecompressResult(path, SMALLER, len(data), len(candidate), mode,
+                                    time.perf_counter() - start,
+                                    hashlib.sha256(candidate).hexdigest()), candidate
+    return RecompressResult(path, OPTIMAL, len(data), len(data), img.mode,
+                            time.perf_counter() - start, sha256), None
+
+
+def _estimate(path):
+    try:
+        with Image.open(path) as img:
+            width, height = img.size
+    except OSError:
+        return JOB_OVERHEAD
+    return width * height * 4 * WORKING_COPIES + JOB_OVERHEAD
+
+
+def _replace(path, data):
+    """Troca o arquivo de forma atômica (um leitor nunca vê meio PNG)"""
+    fd, temp = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix='.recompress-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        mode = os.stat(path).st_mode & 0o777
+        os.chmod(temp, mode)
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
+
+
+def recompress(paths, root='.', index_path=RECOMPRESS_INDEX, scheduler=None, dry_run=False,
+               on_result=None):
+    """
+    Recomprime os PNGs (caminhos relativos a root) e retorna um resultado por arquivo
+
+    Arquivos cujo hash está no índice são pulados; os maiores entram primeiro
+    no scheduler. A gravação e o índice seguem a ordem dos caminhos. Com
+    dry_run nada é gravado (nem o índice): só o quanto seria economizado.
+    """
+    scheduler = scheduler or MemoryScheduler(max_workers=1)
+    version = recompress_version()
+    index_file = os.path.join(root, index_path)
+    index = load_index(index_file, version)
+
+    results = {}
+    pending = []
+    for path in paths:
+        full_path = os.path.join(root, path)
+        try:
+            with open(full_path, 'rb') as f:
+                data = f.read()
+        except OSError as e:
+            results[path] = RecompressResult(path, FAILED, error=f"{type(e).__name__}: {e}")
+            continue
+        sha256 = hashlib.sha256(data).hexdigest()
+        if index.get(path) == sha256:
+            results[path] = RecompressResult(path, INDEXED, len(data), len(data),
+                                             sha256=sha256)
+        else:
+            pending.append((path, data))
+
+    def job(item):
+        path, data = item
+        try:
+            return recompress_png(path, data)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            return RecompressResult(path, FAILED, len(data), error=error), None
+
+    estimates = [_estimate(os.path.join(root, path)) for path, _ in pending]
+    order = sorted(range(len(pending)), key=lambda i: estimates[i], reverse=True)
+    outputs = scheduler.map(job, pending, estimates, [path for path, _ in pending], order=order)
+    for (path, _), (result, data) in zip(pending, outputs):
+        if data is not None and not dry_run:
+            try:
+                _replace(os.path.join(root, path), data)
+            except OSError as e:
+                result = RecompressResult(path, FAILED, result.before,
+                                          error=f"{type(e).__name__}: {e}")
+        if result.status in (SMALLER, OPTIMAL):
+            index[path] = result.sha256
+        results[path] = result
+        if on_result is not None:
+            on_result(result)
+
+    if not dry_run:
+        save_index(index_file, {path: sha256 for path, sha256 in index.items()
+                                if os.path.exists(os.path.join(root, path))}, version)
+    return [results[path] for path in paths]
@@ -0,0 +1,308 @@
+"""
+Escalonador de renderizações em paralelo limitado por memória
+
+Cada job (um alvo) tem o pico de memória estimado a partir do grafo de
+etapas: dimensões da mestre, tamanho de saída e operações ainda não
+calculadas. Os jobs entram em execução enquanto a soma das estimativas cabe
+no orçamento, então muitos ícones pequenos rodam juntos e os grandes
+(icon-1024, drawable de 432px, mestre 8K) não se somam além do limite.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+import os
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from .background import KEY_ROWS
+from .operations import STRIP_ROWS
+
+MB = 1024 * 1024
+
+# Orçamento padrão: folga abaixo do limite de 1 GB dos containers de CI
+DEFAULT_BUDGET = 768 * MB
+
+# Custo fixo por job (objetos PIL, buffers do zlib, bytes codificados)
+JOB_OVERHEAD = 1 * MB
+
+
+# Bytes por pixel dos níveis da pirâmide linear (4 canais de 16 bits)
+LINEAR_BANDS = 8
+
+
+def node_shape(node):
+    """(largura, altura, canais) da imagem produzida por um nó (canais = bytes por pixel)"""
+    if node.op in ('source', 'reduce'):
+        width, height = node.param('dimensions')
+        return width, height, 4
+    if node.op in ('linearize', 'halve'):
+        width, height = node.param('dimensions')
+        return width, height, LINEAR_BANDS
+    if node.op in ('resize', 'crop_center'):
+        bands = node_shape(node.inputs[0])[2]
+        if bands == LINEAR_BANDS:
+            bands = 4  # Volta da pirâmide linear já em RGBA
+        size = node.param('size')
+        width, height = (size, size) if isinstance(size, int) else size
+        return width, height, bands
+    if node.op == 'compose':
+        return node.param('size'), node.param('size'), 4
+    if node.op == 'alpha':
+        width, height, _ = node_shape(node.inputs[0])
+        return width, height, 1
+    if node.op == 'silhouette':
+        width, height, _ = node_shape(node.inputs[0])
+        return width, height, 4
+    # remove_white, circle_mask: mesma forma da entrada
+    return node_shape(node.inputs[0])
+
+
+def _bytes(shape):
+    width, height, bands = shape
+    return width * height * bands
+
+
+def working_bytes(node):
+    """Memória temporária da operação além da imagem de saída (medida no Pillow 12)"""
+    out = _bytes(node_shape(node))
+    if node.op == 'remove_white':
+        # Cópia do convert('RGBA') + array numpy + máscara booleana
+        width, height, _ = node_shape(node)
+        return out * 2 + width * height
+    if node.op == 'key_background':
+        # Cópia numpy do foreground + cópia int16, distância e rampa (int32) de uma faixa
+        width, height, _ = node_shape(node)
+        return out + width * min(height, KEY_ROWS) * (6 + 2 + 8)
+    if node.op in ('linearize', 'halve'):
+        # Um canal de uma faixa em uint32 (+ índice da LUT e soma das linhas)
+        in_width = node_shape(node.inputs[0])[0]
+        factor = node.param('factor') if node.op == 'linearize' else 2
+        return in_width * STRIP_ROWS * factor * 4 * 3
+    if node.op == 'resize' and node_shape(node.inputs[0])[2] == LINEAR_BANDS:
+        # Um canal por vez em float32 (entrada + passada intermediária) e a
+        # saída em float32 de 4 canais antes da LUT
+        in_width, in_height, _ = node_shape(node.inputs[0])
+        out_width, out_height, _ = node_shape(node)
+        return ((in_width * in_height + min(out_width * in_height, in_width * out_height)) * 4
+                + out_width * out_height * 16)
+    if node.op == 'resize':
+        # RGBA é pré-multiplicado numa cópia da entrada; LANCZOS em duas
+        # passadas cria a imagem intermediária largura_saída x altura_entrada
+        in_width, in_height, bands = node_shape(node.inputs[0])
+        out_width, out_height, _ = node_shape(node)
+        premultiplied = in_width * in_height * bands if bands == 4 else 0
+        return premultiplied + min(out_width * in_height, in_width * out_height) * bands
+    if node.op == 'circle_mask':
+        width, height, _ = node_shape(node)
+        return width * height
+    if node.op == 'silhouette':
+        # np.where cria um temporário do tamanho do alfa
+        width, height, _ = node_shape(node)
+        return width * height
+    return 0
+
+
+def estimate_nodes(nodes, evaluator, claimed=None):
+    """
+    Pico estimado para avaliar e codificar os nós de saída de um alvo
+
+    Soma as saídas das etapas ainda não calculadas (ficam vivas até o fim do
+    job) mais o maior temporário de uma etapa; etapas já no memo e a mestre
+    já decodificada não custam nada. Com claimed (conjunto compartilhado
+    entre as estimativas de uma execução), uma etapa comum só é cobrada do
+    primeiro alvo que a usa.
+    """
+    outputs = 0
+    working = 0
+    seen = set() if claimed is None else claimed
+    stack = list(nodes)
+    while stack:
+        node = stack.pop()
+        if node.digest in seen:
+            continue
+        seen.add(node.digest)
+        if node.op == 'source':
+            if not evaluator.is_loaded(node):
+                # Decodificação (+ conversão para RGBA, se a mestre não for RGBA)
+                outputs += _bytes(node_shape(node))
+                working = max(working, _bytes(node_shape(node)))
+            continue
+        if node.digest in evaluator.memo:
+            continue
+        outputs += _bytes(node_shape(node))
+        working = max(working, working_bytes(node))
+        stack.extend(node.inputs)
+    # Codificação: cópia dos pixels de saída para o encoder
+    encoded = sum(_bytes(node_shape(node)) for node in nodes)
+    return outputs + working + encoded + JOB_OVERHEAD
+
+
+def current_rss():
+    """RSS atual do processo em bytes (None se não houver /proc)"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss():
+    """Maior RSS do processo até agora em bytes (None se indisponível)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB, macOS em bytes
+    return peak if os.uname().sysname == 'Darwin' else peak * 1024
+
+
+class _RssSampler(threading.Thread):
+    """Amostra o RSS durante a execução para medir o pico observado"""
+
+    def __init__(self, interval=0.005):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.baseline = current_rss()
+        self.peak = self.baseline
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            rss = current_rss()
+            if rss is not None and rss > self.peak:
+                self.peak = rss
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def admit_next(pending, estimates, running, in_flight, available, max_workers):
+    """
+    Tira de pending (índices em ordem de prioridade) o primeiro job que cabe
+    no orçamento e retorna (índice, estimativa); (None, 0) = esperar
+
+    Regra única de admissão do MemoryScheduler e do render_async: com nada
+    rodando, o próximo entra mesmo se for maior que o disponível.
+    """
+    if running >= max_workers:
+        return None, 0
+    for position, index in enumerate(pending):
+        need = estimates[index]
+        if running == 0 or in_flight + need <= available:
+            return pending.pop(position), need
+    return None, 0
+
+
+class MemoryScheduler:
+    """
+    Executa jobs em threads admitindo-os pelo orçamento de memória
+
+    O Pillow e o numpy liberam o GIL nas operações pesadas, então threads
+    bastam e o memo do grafo fica compartilhado. resident (função) informa a
+    memória que continua ocupada entre jobs (mestre decodificada, memo) e
+    também conta no orçamento. Um job maior que o orçamento disponível roda
+    sozinho. max_workers limita apenas o número de threads.
+    """
+
+    def __init__(self, budget=DEFAULT_BUDGET, max_workers=None, resident=None):
+        self.budget = budget
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.resident = resident
+        self.in_flight = 0
+        self.running = 0
+        self.peak_estimated = 0   # Maior soma de estimativas em execução + residente
+        self.max_concurrency = 0
+        self.observed_peak = None  # Maior RSS acima do início da execução
+        self.jobs = []  # (nome, estimativa, segundos)
+        self._condition = threading.Condition()
+
+    def _admit(self, pending, estimates):
+        """Primeiro job pendente que cabe no orçamento (None = esperar)"""
+        available = self.budget - (self.resident() if self.resident else 0)
+        return admit_next(pending, estimates, self.running, self.in_flight, available,
+                          self.max_workers)
+
+    def _run_job(self, fn, job, name, need, estimate, future):
+        start = time.perf_counter()
+        try:
+            future.set_result(fn(job))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._condition:
+                self.in_flight -= need
+                self.running -= 1
+                self.jobs.append((name, estimate, time.perf_counter() - start))
+                self._condition.notify_all()
+
+    def _dispatch(self, fn, jobs, estimates, names, futures, order, cancelled):
+        pending = list(order)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending:
+                with self._condition:
+                    while True:
+                        if cancelled.is_set():
+                            return
+                        index, need = self._admit(pending, estimates)
+                        if index is not None:
+                            break
+                        self._condition.wait()
+                    self.in_flight += need
+                    self.running += 1
+                    resident = self.resident() if self.resident else 0
+                    self.peak_estimated = max(self.peak_estimated, self.in_flight + resident)
+                    self.max_concurrency = max(self.max_concurrency, self.running)
+                pool.submit(self._run_job, fn, jobs[index], names[index], need,
+                            estimates[index], futures[index])
+
+    def map(self, fn, jobs, estimates, names=None, order=None):
+        """
+        Executa fn(job) para cada job e gera os resultados na ordem dos jobs
+
+        order: índices na ordem de prioridade de início (padrão: a dos jobs).
+        """
+        names = names or [str(job) for job in jobs]
+        order = list(range(len(jobs))) if order is None else order
+        futures = [Future() for _ in jobs]
+        # Um sinal de parada por chamada: o mesmo scheduler pode rodar vários map()
+        cancelled = threading.Event()
+        for future in futures:
+            future.set_running_or_notify_cancel()
+        sampler = _RssSampler() if current_rss() is not None else None
+        if sampler is not None:
+            sampler.start()
+        dispatcher = threading.Thread(target=self._dispatch,
+                                      args=(fn, jobs, estimates, names, futures, order,
+                                            cancelled),
+                                      daemon=True)
+        dispatcher.start()
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            with self._condition:
+                cancelled.set()
+                self._condition.notify_all()
+            dispatcher.join()
+            if sampler is not None:
+                sampler.stop()
+                self.observed_peak = sampler.peak - sampler.baseline
+
+    def report(self):
+        """Resumo: orçamento, pico estimado x observado e maiores jobs"""
+        largest = sorted(self.jobs, key=lambda job: job[1], reverse=True)
+        return {
+            'budget': self.budget,
+            'workers': self.max_workers,
+            'max_concurrency': self.max_concurrency,
+            'peak_estimated': self.peak_estimated,
+            'peak_observed': self.observed_peak,
+            'peak_rss': peak_rss(),
+            'largest_jobs': [{'name': name, 'estimate': estimate, 'seconds': seconds}
+                             for name, estimate, seconds in largest[:5]],
+        }
@@ -0,0 +1,144 @@
+"""
+Destinos de saída do motor: árvore de arquivos ou arquivo zip/tar em streaming
+"""
+
+import hashlib
+import io
+import os
+import sys
+import tarfile
+import zipfile
+
+# Data fixa das entradas do arquivo, para saída determinística
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+ARCHIVE_FORMATS = ('zip', 'tar', 'tar.gz')
+
+
+class OutputSink:
+    """Recebe os bytes já codificados de cada alvo pelo caminho relativo"""
+
+    def write(self, path, data):
+        raise NotImplementedError
+
+    def contains(self, path, sha256):
+        """Se o destino já tem este conteúdo no caminho (para retomar builds)"""
+        return False
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class DirectorySink(OutputSink):
+    """Grava os arquivos sob uma pasta raiz (comportamento dos scripts)"""
+
+    def __init__(self, root="."):
+        self.root = root
+
+    def contains(self, path, sha256):
+        try:
+            with open(os.path.join(self.root, path), 'rb') as f:
+                return hashlib.sha256(f.read()).hexdigest() == sha256
+        except OSError:
+            return False
+
+    def write(self, path, data):
+        full_path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(full_path) or ".", exist_ok=True)
+
+        # Não reescrever arquivos idênticos (preserva mtime e evita I/O)
+        if os.path.exists(full_path) and os.path.getsize(full_path) == len(data):
+            with open(full_path, 'rb') as f:
+                if f.read() == data:
+                    return False
+
+        with open(full_path, 'wb') as f:
+            f.write(data)
+        return True
+
+
+class ArchiveSink(OutputSink):
+    """
+    Escreve os bytes direto num stream zip ou tar (arquivo ou '-' para stdout)
+
+    As entradas são gravadas na ordem de chegada (o motor entrega ordenado
+    pelo caminho) com data, dono e permissões fixos. Caminhos repetidos com o
+    mesmo conteúdo são ignorados; no tar, conteúdo idêntico em outro caminho
+    vira hardlink para a primeira entrada.
+    """
+
+    def __init__(self, destination, format='zip'):
+        if format not in ARCHIVE_FORMATS:
+            raise ValueError(f"Formato de arquivo desconhecido: {format}")
+        self.format = format
+        self._owns_stream = False
+        if destination == '-':
+            self.stream = sys.stdout.buffer
+        elif isinstance(destination, (str, os.PathLike)):
+            self.stream = open(destination, 'wb')
+            self._owns_stream = True
+        else:
+            self.stream = destination
+
+        self._digests = {}   # caminho -> sha256 do conteúdo
+        self._by_digest = {}  # sha256 -> primeiro caminho gravado
+        if format == 'zip':
+            self._archive = zipfile.ZipFile(self.stream, 'w')
+        else:
+            mode = 'w|gz' if format == 'tar.gz' else 'w|'
+            self._archive = tarfile.open(fileobj=self.stream, mode=mode,
+                                         format=tarfile.PAX_FORMAT)
+
+    def write(self, path, data):
+        path = path.replace(os.sep, '/').lstrip('/')
+        digest = hashlib.sha256(data).hexdigest()
+
+        previous = self._digests.get(path)
+        if previous is not None:
+            if previous != digest:
+                raise ValueError(f"Conteúdo diferente para a mesma entrada: {path}")
+            return False
+        self._digests[path] = digest
+
+        if self.format == 'zip':
+            info = zipfile.ZipInfo(path, date_time=ZIP_EPOCH)
+            info.external_attr = 0o644 << 16
+            # PNG já é comprimido; deflate só gastaria CPU
+            if path.lower().endswith('.png'):
+                info.compress_type = zipfile.ZIP_STORED
+            else:
+                info.compress_type = zipfile.ZIP_DEFLATED
+            self._archive.writestr(info, data)
+        else:
+            info = tarfile.TarInfo(path)
+            info.mtime = 0
+            info.mode = 0o644
+            info.uid = info.gid = 0
+            info.uname = info.gname = ''
+            link = self._by_digest.get(digest)
+            if link is not None:
+                info.type = tarfile.LNKTYPE
+                info.linkname = link
+                self._archive.addfile(info)
+            else:
+                info.size = len(data)
+                self._archive.addfile(info, io.BytesIO(data))
+        self._by_digest.setdefault(digest, path)
+        return True
+
+    def close(self):
+        if self._archive is None:
+            return
+        self._archive.close()
+        self._archive = None
+        if self._owns_stream:
+            self.stream.close()
+        else:
+            self.stream.flush()
@@ -0,0 +1,221 @@
+"""
+Repositório de artefatos endereçado por conteúdo (compartilhado entre cópias e CI)
+
+A chave de cada arquivo gerado é o hash de (hash da mestre, hash do grafo de
+etapas, configuração do codificador); como a saída é reproduzível byte a
+byte, qualquer máquina com a mesma chave pode reaproveitar os bytes em vez de
+renderizar. O repositório pode ser uma pasta compartilhada ou um servidor
+HTTP simples (GET/PUT /<chave>), como o de make_store_server.
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+import re
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+
+# Chaves são sha256 em hexadecimal
+KEY_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+
+def check_key(key):
+    if not KEY_PATTERN.match(key):
+        raise ValueError(f"Chave de artefato inválida: {key!r}")
+    return key
+
+
+class ArtifactStore:
+    """Busca e publica bytes pela chave; falhas viram miss (o motor renderiza)"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.published = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        data = self._get(check_key(key))
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def put(self, key, data):
+        if self._put(check_key(key), data):
+            with self._lock:
+                self.published += 1
+
+    def contains(self, key):
+        """Se a chave já foi publicada (sem baixar os bytes)"""
+        return self._contains(check_key(key))
+
+    def _get(self, key):
+        raise NotImplementedError
+
+    def _contains(self, key):
+        raise NotImplementedError
+
+    def _put(self, key, data):
+        raise NotImplementedError
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'published': self.published, 'errors': self.errors}
+
+
+class DirectoryStore(ArtifactStore):
+    """Pasta local ou de rede: <raiz>/<2 primeiros dígitos>/<chave>"""
+
+    def __init__(self, root):
+        super().__init__()
+        self.root = root
+
+    def path(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def _contains(self, key):
+        return os.path.exists(self.path(key))
+
+    def _get(self, key):
+        try:
+            with open(self.path(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _put(self, key, data):
+        path = self.path(key)
+        if os.path.exists(path):
+            return False
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # Escrita atômica: leitores concorrentes nunca veem arquivo parcial
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return True
+
+
+class HttpStore(ArtifactStore):
+    """
+    Servidor HTTP com GET/PUT <url>/<chave>
+
+    Se o servidor não responder, o repositório é desligado no resto da
+    execução (tudo vira miss) para não pagar o timeout em cada alvo.
+    """
+
+    def __init__(self, url, timeout=10):
+        super().__init__()
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.available = True
+
+    def _failed(self, disable):
+        with self._lock:
+            self.errors += 1
+            if disable:
+                self.available = False
+
+    def _get(self, key):
+        if not self.available:
+            return None
+        try:
+            with urllib.request.urlopen(f"{self.url}/{key}", timeout=self.timeout) as response:
+                return response.read()
+        except urllib.error.HTTPError as e:
+            if e.code != 404:
+                self._failed(disable=False)
+        except OSError:
+            self._failed(disable=True)
+        return None
+
+    def _contains(self, key):
+        if not self.available:
+            return False
+        request = urllib.request.Request(f"{self.url}/{key}", method='HEAD')
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout):
+                return True
+        except urllib.error.HTTPError as e:
+            if e.code != 404:
+                self._failed(disable=False)
+        except OSError:
+            self._failed(disable=True)
+        return False
+
+    def _put(self, key, data):
+        if not self.available:
+            return False
+        request = urllib.request.Request(f"{self.url}/{key}", data=data, method='PUT',
+                                         headers={'Content-Type': 'application/octet-stream'})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.status == 201
+        except urllib.error.HTTPError:
+            self._failed(disable=False)
+        except OSError:
+            self._failed(disable=True)
+        return False
+
+
+def open_store(spec):
+    """Abre o repositório pela especificação: URL http(s):// ou pasta"""
+    if spec.startswith(('http://', 'https://')):
+        return HttpStore(spec)
+    return DirectoryStore(spec)
+
+
+class StoreHandler(BaseHTTPRequestHandler):
+    """GET/HEAD/PUT /<chave> sobre um DirectoryStore"""
+
+    store = None  # Definido por make_store_server
+
+    def _key(self):
+        key = self.path.strip('/')
+        return key if KEY_PATTERN.match(key) else None
+
+    def do_GET(self):
+        key = self._key()
+        data = self.store._get(key) if key else None
+        if data is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(data)
+
+    do_HEAD = do_GET
+
+    def do_PUT(self):
+        key = self._key()
+        if key is None:
+            self.send_error(400, "Chave inválida")
+            return
+        data = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        created = self.store._put(key, data)
+        self.send_response(201 if created else 200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_store_server(root, host='127.0.0.1', port=8766):
+    """Servidor HTTP do repositório (substituto local de um cache remoto)"""
+    handler = type('BoundStoreHandler', (StoreHandler,), {'store': DirectoryStore(root)})
+    return ThreadingHTTPServer((host, port), handler)
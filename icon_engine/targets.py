@@ -0,0 +1,162 @@
+"""
+Tabelas de tamanhos e conjuntos de alvos (presets) dos ícones do app
+Reúne em um só lugar os tamanhos que cada script create_*.py repetia
+"""
+
+from dataclasses import dataclass, replace
+
+from .variants import VARIANTS
+
+# Pastas de destino (relativas à raiz do repositório)
+RES_DIR = "android/app/src/main/res"
+IOS_DIR = "ios/lojaroupasapp/Images.xcassets/AppIcon.appiconset"
+ICO_FILE = "custom_icon.ico"
+
+# Tamanhos para Android (mipmap)
+ANDROID_MIPMAP_SIZES = {
+    'mipmap-mdpi': 48,
+    'mipmap-hdpi': 72,
+    'mipmap-xhdpi': 96,
+    'mipmap-xxhdpi': 144,
+    'mipmap-xxxhdpi': 192
+}
+
+# Tamanhos para Android (drawable - foreground adaptativo)
+ANDROID_DRAWABLE_SIZES = {
+    'drawable-mdpi': 108,
+    'drawable-hdpi': 162,
+    'drawable-xhdpi': 216,
+    'drawable-xxhdpi': 324,
+    'drawable-xxxhdpi': 432
+}
+
+# Tamanhos para Android (drawable - ícone de notificação, 24dp)
+ANDROID_NOTIFICATION_SIZES = {
+    'drawable-mdpi': 24,
+    'drawable-hdpi': 36,
+    'drawable-xhdpi': 48,
+    'drawable-xxhdpi': 72,
+    'drawable-xxxhdpi': 96
+}
+
+# Tamanhos para iOS
+IOS_SIZES = [20, 29, 40, 58, 60, 76, 80, 87, 120, 152, 167, 180, 1024]
+
+# Tamanhos comuns para ICO (em pixels)
+ICO_SIZES = [16, 24, 32, 48, 64, 128, 256]
+
+
+@dataclass(frozen=True)
+class Target:
+    """Um arquivo de saída: caminho relativo, variante e tamanho"""
+    path: str
+    variant: str
+    size: int
+    frames: tuple = ()  # Tamanhos dos quadros de um ICO (vazio = PNG)
+    layer: str = ''     # Camada derivada do foreground (graph.LAYERS); vazio = a variante
+
+    @property
+    def format(self):
+        return 'ICO' if self.frames else 'PNG'
+
+
+def launcher_targets(variant):
+    """ic_launcher.png e ic_launcher_round.png em todas as densidades"""
+    targets = []
+    for folder, size in ANDROID_MIPMAP_SIZES.items():
+        targets.append(Target(f"{RES_DIR}/{folder}/ic_launcher.png", variant, size))
+        targets.append(Target(f"{RES_DIR}/{folder}/ic_launcher_round.png", variant, size))
+    return targets
+
+
+def mipmap_foreground_targets(variant):
+    """ic_launcher_foreground.png nas pastas mipmap"""
+    return [Target(f"{RES_DIR}/{folder}/ic_launcher_foreground.png", variant, size)
+            for folder, size in ANDROID_MIPMAP_SIZES.items()]
+
+
+def drawable_foreground_targets(variant):
+    """ic_launcher_foreground.png nas pastas drawable (ícone adaptativo)"""
+    return [Target(f"{RES_DIR}/{folder}/ic_launcher_foreground.png", variant, size)
+            for folder, size in ANDROID_DRAWABLE_SIZES.items()]
+
+
+def monochrome_targets(variant):
+    """ic_launcher_monochrome.png nas pastas drawable (ícone temático, Android 13+)"""
+    return [Target(f"{RES_DIR}/{folder}/ic_launcher_monochrome.png", variant, size,
+                   layer='monochrome')
+            for folder, size in ANDROID_DRAWABLE_SIZES.items()]
+
+
+def notification_targets(variant):
+    """ic_notification.png (silhueta branca de 24dp) nas pastas drawable"""
+    return [Target(f"{RES_DIR}/{folder}/ic_notification.png", variant, size,
+                   layer='notification')
+            for folder, size in ANDROID_NOTIFICATION_SIZES.items()]
+
+
+def themed_targets(variant):
+    return monochrome_targets(variant) + notification_targets(variant)
+
+
+def ios_targets(variant):
+    """icon-N.png do AppIcon.appiconset"""
+    return [Target(f"{IOS_DIR}/icon-{size}.png", variant, size) for size in IOS_SIZES]
+
+
+def ico_targets(variant):
+    """custom_icon.ico com múltiplos tamanhos"""
+    return [Target(ICO_FILE, variant, max(ICO_SIZES), tuple(ICO_SIZES))]
+
+
+# Cada preset reproduz a saída de um dos scripts existentes
+PRESETS = {
+    # generate_app_icons.py
+    'app': lambda: (launcher_targets('plain') + ios_targets('plain')
+                    + ico_targets('plain')),
+    # create_perfect_icons.py / create_perfect_icons_simple.py
+    'perfect': lambda: (launcher_targets('transparent')
+                        + mipmap_foreground_targets('rose_gold')
+                        + ico_targets('transparent')),
+    # create_adaptive_icons.py
+    'adaptive': lambda: (launcher_targets('circle')
+                         + mipmap_foreground_targets('rose_gold_raw')),
+    # create_adaptive_icons_centered.py
+    'centered': lambda: (drawable_foreground_targets('centered')
+                         + themed_targets('centered')
+                         + launcher_targets('centered') + ico_targets('centered')),
+    # create_adaptive_icons_flutter_style.py
+    'flutter': lambda: (drawable_foreground_targets('transparent')
+                        + themed_targets('transparent')
+                        + launcher_targets('transparent') + ico_targets('transparent')),
+    # Só as camadas monocromática e de notificação (a partir do foreground centered)
+    'themed': lambda: themed_targets('centered'),
+    # fix_icon_background.py
+    'black': lambda: launcher_targets('black') + ios_targets('black'),
+    # fix_icon_fill.py
+    'fill': lambda: launcher_targets('fill') + ios_targets('fill'),
+}
+
+
+def collect_targets(presets, split=False):
+    """
+    Junta os alvos de vários presets, sem repetição, ordenados pelo caminho
+
+    Com split=True cada preset vai para uma pasta com o seu nome, para gerar
+    variantes concorrentes (ex.: perfect e centered) numa mesma execução.
+    """
+    by_path = {}
+    for name in presets:
+        if name not in PRESETS:
+            raise ValueError(f"Preset desconhecido: {name}")
+        for target in PRESETS[name]():
+            if split:
+                target = replace(target, path=f"{name}/{target.path}")
+            if target.variant not in VARIANTS:
+                raise ValueError(f"Variante desconhecida: {target.variant}")
+            previous = by_path.get(target.path)
+            if previous is not None and previous != target:
+                raise ValueError(
+                    f"Conflito em {target.path}: {previous.variant} x {target.variant}")
+            by_path[target.path] = target
+    return [by_path[path] for path in sorted(by_path)]
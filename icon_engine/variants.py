@@ -0,0 +1,90 @@
+"""
+Variantes de ícone: cada uma descreve como um tamanho é montado a partir da mestre
+"""
+
+from dataclasses import dataclass, fields, replace
+import math
+
+from . import operations as ops
+from .graph import Evaluator, variant_node
+
+
+@dataclass(frozen=True)
+class Variant:
+    """Receita de uma variante de ícone"""
+    name: str
+    remove_background: bool = False  # Remover fundo branco antes de redimensionar
+    layout: str = 'stretch'          # stretch | circle | backing | pad | cover
+    background: tuple = ops.TRANSPARENT
+    scale: float = 1.0               # backing: fração do lado ocupada pelo ícone
+    padding: float = 0.0             # pad: padding_percent de cada lado
+    threshold: int = ops.WHITE_THRESHOLD  # Corte do branco ao remover o fundo
+
+    def params(self):
+        """Parâmetros que de fato influenciam o resultado (chave de cache)"""
+        params = {'layout': self.layout, 'remove_background': self.remove_background}
+        if self.remove_background:
+            params['threshold'] = self.threshold
+        if self.layout in ('backing', 'pad', 'cover'):
+            params['background'] = self.background
+        if self.layout == 'backing':
+            params['scale'] = self.scale
+        if self.layout == 'pad':
+            params['padding'] = self.padding
+        return params
+
+
+VARIANTS = {
+    # generate_app_icons.py / create_custom_icons.py / create_ico.py
+    'plain': Variant('plain'),
+    # create_perfect_icons.py / create_adaptive_icons_flutter_style.py
+    'transparent': Variant('transparent', remove_background=True),
+    # create_adaptive_icons.py (ic_launcher)
+    'circle': Variant('circle', layout='circle'),
+    # create_perfect_icons.py (ic_launcher_foreground)
+    'rose_gold': Variant('rose_gold', remove_background=True, layout='backing',
+                         background=ops.ROSE_GOLD, scale=0.7),
+    # create_adaptive_icons.py (ic_launcher_foreground, sem remover o fundo)
+    'rose_gold_raw': Variant('rose_gold_raw', layout='backing',
+                             background=ops.ROSE_GOLD, scale=0.7),
+    # create_adaptive_icons_centered.py
+    'centered': Variant('centered', remove_background=True, layout='pad', padding=0.1),
+    # fix_icon_background.py
+    'black': Variant('black', layout='cover', background=ops.BLACK),
+    # fix_icon_fill.py
+    'fill': Variant('fill', layout='cover'),
+}
+
+
+def parse_color(value):
+    """Converte 'E8B4B8', '#E8B4B8' ou 'E8B4B880' numa tupla RGBA"""
+    value = value.lstrip('#')
+    if len(value) not in (6, 8):
+        raise ValueError(f"Cor inválida: {value}")
+    rgba = tuple(int(value[i:i + 2], 16) for i in range(0, len(value), 2))
+    return rgba if len(rgba) == 4 else rgba + (255,)
+
+
+def with_params(variant, overrides):
+    """Cópia da variante com parâmetros vindos de texto (ex.: query string)"""
+    types = {f.name: f.type for f in fields(Variant)}
+    changes = {}
+    for name, value in overrides.items():
+        if name not in types or name == 'name' or value == '':
+            continue
+        if name == 'background':
+            changes[name] = parse_color(value)
+        elif name == 'remove_background':
+            changes[name] = str(value).lower() in ('1', 'true', 'yes', 'sim')
+        else:
+            changes[name] = types[name](value)
+            if isinstance(changes[name], float) and not math.isfinite(changes[name]):
+                raise ValueError(f"{name} deve ser um número finito: {value}")
+    return replace(variant, **changes)
+
+
+def render_variant(master, variant, size, evaluator=None):
+    """Monta um tamanho da variante a partir da imagem mestre (RGBA)"""
+    evaluator = evaluator or Evaluator()
+    source = evaluator.add_source(master, ops.image_digest(master))
+    return evaluator.evaluate(variant_node(variant, size, source))
@@ -0,0 +1,10 @@
+"""
+Configuração do pytest: os testes importam icon_engine e backup_tools da raiz
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
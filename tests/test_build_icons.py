@@ -0,0 +1,56 @@
+"""
+Testes da CLI de build: arquivos de cor gravados com --palette
+"""
+
+from dataclasses import replace
+import os
+import shutil
+
+import pytest
+
+import build_icons
+from icon_engine import COLORS_XML, THEME_FILE
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_FILES = ('custom_icon.png', COLORS_XML, THEME_FILE)
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Cópia mínima do projeto (mestre e arquivos de cor) como diretório atual"""
+    for path in PROJECT_FILES:
+        os.makedirs(tmp_path / os.path.dirname(path), exist_ok=True)
+        shutil.copy(os.path.join(ROOT, path), tmp_path / path)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def _read(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def test_split_palette_writes_colors_per_preset(project):
+    original = {path: _read(path) for path in (COLORS_XML, THEME_FILE)}
+    argv = ['build', '--preset', 'perfect', '--preset', 'adaptive', '--split',
+            '--palette', '#2E7D6B', '--quiet', '--profile-file', str(project / 'profile.json')]
+    assert build_icons.main(argv) == 0
+    for path, text in original.items():
+        assert _read(path) == text
+        for preset in ('perfect', 'adaptive'):
+            assert '#2E7D6B' in _read(project / preset / path)
+
+
+def test_palette_is_not_written_when_a_target_fails(project, monkeypatch):
+    real_build = build_icons.build
+
+    def failing_build(*args, **kwargs):
+        results = real_build(*args, **kwargs)
+        return [replace(results[0], status='failed', error='falha simulada')] + results[1:]
+
+    monkeypatch.setattr(build_icons, 'build', failing_build)
+    original = _read(COLORS_XML)
+    argv = ['build', '--preset', 'perfect', '--palette', '#2E7D6B', '--quiet',
+            '--profile-file', str(project / 'profile.json')]
+    assert build_icons.main(argv) == 1
+    assert _read(COLORS_XML) == original
@@ -0,0 +1,51 @@
+"""
+Testes da conversão XLSX -> SQLite e da exportação de volta (ida e volta sem perda)
+"""
+
+import sqlite3
+
+import pytest
+
+from backup_tools.convert import convert
+from backup_tools.export import export_database
+from backup_tools.generate import Profile, generate
+from backup_tools.validate import validate_file
+
+TABLES = ('products', 'customers', 'orders', 'order_items')
+PROFILE = Profile('tiny', 20, 10, 60)
+
+
+def _dump(db_path):
+    connection = sqlite3.connect(db_path)
+    try:
+        return {table: connection.execute(f"SELECT * FROM {table} ORDER BY 1").fetchall()
+                for table in TABLES}
+    finally:
+        connection.close()
+
+
+def test_generate_convert_export_round_trip(tmp_path):
+    backup, exported = str(tmp_path / 'backup.xlsx'), str(tmp_path / 'export.xlsx')
+    generate(backup, PROFILE, seed=3)
+
+    summary = convert(backup, str(tmp_path / 'backup.db'))
+    assert summary['skipped_count'] == 0
+    assert (summary['products'], summary['customers'], summary['order_items']) == (20, 10, 60)
+
+    exported_summary = export_database(str(tmp_path / 'backup.db'), exported)
+    assert exported_summary['order_rows'] == 60
+    report = validate_file(exported)
+    assert report.ok, (report.errors, [sheet.details for sheet in report.sheets])
+
+    # O backup exportado volta para exatamente o mesmo banco
+    convert(exported, str(tmp_path / 'export.db'))
+    assert _dump(str(tmp_path / 'export.db')) == _dump(str(tmp_path / 'backup.db'))
+
+
+def test_convert_refuses_to_overwrite(tmp_path):
+    backup = str(tmp_path / 'backup.xlsx')
+    generate(backup, PROFILE)
+    convert(backup, str(tmp_path / 'backup.db'))
+    with pytest.raises(FileExistsError):
+        convert(backup, str(tmp_path / 'backup.db'))
+    assert convert(backup, str(tmp_path / 'backup.db'), overwrite=True)['products'] == 20
@@ -0,0 +1,61 @@
+"""
+Testes do diff entre backups: linhas incluídas, alteradas e removidas, e o delta
+"""
+
+from backup_tools.diff import REMOVED_SHEET, diff_backups
+from backup_tools.schema import CUSTOMERS, ORDERS, PRODUCTS
+from backup_tools.xlsx import XlsxReader, XlsxWriter
+
+
+def _write(path, products, orders):
+    with XlsxWriter(str(path)) as writer:
+        for sheet, rows in ((PRODUCTS, products), (CUSTOMERS, []), (ORDERS, orders)):
+            with writer.sheet(sheet.name, sheet.headers) as out:
+                for row in rows:
+                    out.write_row(row)
+    return str(path)
+
+
+def _product(product_id, name, quantity):
+    return [product_id, name, quantity, 10, '01/01/2024', '01/01/2024']
+
+
+def _item(order_id, item, product, quantity):
+    return [order_id, 'Ana', 'paid', 100, 100, 0, '', '10/03/2024', item, product, quantity,
+            50, quantity * 50, 10, quantity * 10]
+
+
+def _sheets(report):
+    return {sheet.name: sheet for sheet in report.sheets}
+
+
+def test_diff_finds_changed_added_and_removed_rows(tmp_path):
+    old = _write(tmp_path / 'old.xlsx',
+                 [_product(1, 'Sutiã', 5), _product(2, 'Pijama', 2), _product(3, 'Meia', 9)],
+                 [_item(1, 1, 'Sutiã', 1), _item(1, 2, 'Meia', 1), _item(2, 1, 'Pijama', 2)])
+    new = _write(tmp_path / 'new.xlsx',
+                 [_product(1, 'Sutiã', 4), _product(3, 'Meia', 9), _product(4, 'Body', 1)],
+                 # Linhas do pedido 1 em outra ordem: o pedido não mudou
+                 [_item(1, 2, 'Meia', 1), _item(1, 1, 'Sutiã', 1), _item(3, 1, 'Body', 1)])
+
+    delta = str(tmp_path / 'delta.xlsx')
+    sheets = _sheets(diff_backups(old, new, delta, parallel=False))
+    products, orders = sheets[PRODUCTS.name], sheets[ORDERS.name]
+    assert (products.added, products.changed, products.removed, products.unchanged) == (
+        [4], [1], [2], 1)
+    assert (orders.added, orders.changed, orders.removed, orders.unchanged) == ([3], [], [2], 1)
+    assert sheets[CUSTOMERS.name].total == 0
+
+    with XlsxReader(delta) as reader:
+        assert [record['ID'] for _, record in reader.iter_records(PRODUCTS.name)] == [1, 4]
+        assert [record['ID do Pedido'] for _, record in reader.iter_records(ORDERS.name)] == [3]
+        removed = [(record['Aba'], record['Chave'])
+                   for _, record in reader.iter_records(REMOVED_SHEET)]
+    assert removed == [(PRODUCTS.name, 2), (ORDERS.name, 2)]
+
+
+def test_diff_sees_an_edited_order_item(tmp_path):
+    old = _write(tmp_path / 'old.xlsx', [], [_item(1, 1, 'Sutiã', 1), _item(1, 2, 'Meia', 1)])
+    new = _write(tmp_path / 'new.xlsx', [], [_item(1, 1, 'Sutiã', 1), _item(1, 2, 'Meia', 3)])
+    orders = _sheets(diff_backups(old, new, parallel=False))[ORDERS.name]
+    assert (orders.added, orders.changed, orders.removed) == ([], [1], [])
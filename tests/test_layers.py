@@ -0,0 +1,67 @@
+"""
+Testes das camadas temáticas (monocromática e notificação)
+"""
+
+from PIL import Image, ImageDraw
+import numpy as np
+
+from icon_engine import Evaluator, Target
+from icon_engine.engine import load_source, target_nodes
+
+
+def _master(background):
+    """Disco rosa no meio de um fundo opaco"""
+    img = Image.new('RGBA', (400, 400), background)
+    ImageDraw.Draw(img).ellipse([100, 100, 300, 300], fill=(232, 180, 184, 255))
+    return img
+
+
+def _layer(master, layer, size):
+    evaluator = Evaluator()
+    source = load_source(evaluator, master)
+    target = Target(f'{layer}.png', 'centered', size, layer=layer)
+    return np.asarray(evaluator.evaluate(target_nodes(target, source)[0]))[:, :, 3]
+
+
+def test_monochrome_follows_art_on_black_background():
+    alpha = _layer(_master((0, 0, 0, 255)), 'monochrome', 216)
+    assert alpha[0, 0] == 0 and alpha[20, 20] == 0   # Fundo preto recortado
+    assert alpha[108, 108] == 255                      # Centro do disco
+    assert 0.1 < (alpha > 0).mean() < 0.5
+
+
+def test_notification_is_not_an_opaque_square():
+    for background in ((0, 0, 0, 255), (255, 255, 255, 255), (30, 90, 60, 255)):
+        alpha = _layer(_master(background), 'notification', 48)
+        assert alpha[0, 0] == 0
+        assert alpha[24, 24] == 255
+        assert (alpha == 255).mean() < 0.9
+
+
+def _nodes(node):
+    """Todos os nós alcançáveis a partir de node"""
+    found, pending = set(), [node]
+    while pending:
+        current = pending.pop()
+        if current not in found:
+            found.add(current)
+            pending.extend(current.inputs)
+    return found
+
+
+def test_layers_reuse_the_foreground_resize():
+    evaluator = Evaluator()
+    source = load_source(evaluator, _master((0, 0, 0, 255)))
+    foreground = _nodes(target_nodes(Target('fg.png', 'centered', 216), source)[0])
+    for layer, size in (('monochrome', 216), ('notification', 48)):
+        layer_graph = _nodes(target_nodes(Target('l.png', 'centered', size, layer=layer), source)[0])
+        # Só a redução da notificação (alfa 72dp -> 24dp) é um resize novo
+        extra = {node for node in layer_graph - foreground if node.op == 'resize'}
+        assert all(node.inputs[0].op == 'crop_center' for node in extra)
+
+
+def test_transparent_master_keeps_its_alpha():
+    master = Image.new('RGBA', (400, 400), (0, 0, 0, 0))
+    ImageDraw.Draw(master).ellipse([100, 100, 300, 300], fill=(232, 180, 184, 255))
+    alpha = _layer(master, 'monochrome', 216)
+    assert alpha[108, 108] == 255 and alpha[0, 0] == 0
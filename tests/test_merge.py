@@ -0,0 +1,74 @@
+"""
+Testes da mesclagem: clientes unidos pelo telefone, produtos pelo nome
+"""
+
+from backup_tools.merge import merge_backups
+from backup_tools.schema import CUSTOMERS, ORDERS, PRODUCTS
+from backup_tools.xlsx import XlsxReader, XlsxWriter
+
+
+def _write(path, products, customers, orders):
+    with XlsxWriter(str(path)) as writer:
+        for sheet, rows in ((PRODUCTS, products), (CUSTOMERS, customers), (ORDERS, orders)):
+            with writer.sheet(sheet.name, sheet.headers) as out:
+                for row in rows:
+                    out.write_row(row)
+    return str(path)
+
+
+def _records(path, sheet):
+    with XlsxReader(path) as reader:
+        return [record for _, record in reader.iter_records(sheet.name)]
+
+
+def _order(order_id, customer, product):
+    return [order_id, customer, 'paid', 50, 50, 0, '', '10/03/2024', 1, product, 1, 50, 50,
+            10, 10]
+
+
+def test_merge_dedups_customers_by_phone_and_products_by_name(tmp_path):
+    first = _write(tmp_path / 'a.xlsx',
+                   [[1, 'Sutiã Renda', 5, 10, '01/01/2024', '01/02/2024']],
+                   [[1, 'Ana Silva', '(11) 98765-4321', '', 'Rua das Flores', '', '']],
+                   [_order(1, 'Ana Silva', 'Sutiã Renda')])
+    second = _write(tmp_path / 'b.xlsx',
+                    [[1, 'sutia  renda', 3, 12, '01/01/2024', '01/03/2024'],
+                     [2, 'Pijama Seda', 2, 40, '01/01/2024', '01/01/2024']],
+                    [[1, 'Ana S.', '+55 11 98765-4321', 'ana@x.com', '', '', ''],
+                     [2, 'Bruna Costa', '(21) 91234-5678', '', '', '', '']],
+                    [_order(1, 'Ana S.', 'sutia  renda'), _order(2, 'Bruna Costa', 'Pijama Seda')])
+
+    output = str(tmp_path / 'merged.xlsx')
+    summary = merge_backups([first, second], output)
+    assert (summary.products_in, summary.products_out) == (3, 2)
+    assert (summary.customers_in, summary.customers_out) == (3, 2)
+    assert summary.unresolved_count == 0
+
+    products = {record['Nome']: record for record in _records(output, PRODUCTS)}
+    assert set(products) == {'Sutiã Renda', 'Pijama Seda'}
+    # Estoque e custo do cadastro atualizado por último (o do segundo aparelho)
+    assert (products['Sutiã Renda']['Quantidade em Estoque'],
+            products['Sutiã Renda']['Preço de Custo']) == (3, 12)
+
+    customers = {record['Nome']: record for record in _records(output, CUSTOMERS)}
+    assert set(customers) == {'Ana Silva', 'Bruna Costa'}
+    # Contatos vazios completados pelo duplicado
+    assert customers['Ana Silva']['Email'] == 'ana@x.com'
+    assert customers['Ana Silva']['Endereço'] == 'Rua das Flores'
+
+    # Pedidos com IDs novos e nomes do registro consolidado
+    orders = _records(output, ORDERS)
+    assert [record['ID do Pedido'] for record in orders] == [1, 2, 3]
+    assert [(record['Cliente'], record['Produto']) for record in orders] == [
+        ('Ana Silva', 'Sutiã Renda'), ('Ana Silva', 'Sutiã Renda'),
+        ('Bruna Costa', 'Pijama Seda')]
+
+
+def test_merge_keeps_namesakes_with_different_phones_apart(tmp_path):
+    first = _write(tmp_path / 'a.xlsx', [],
+                   [[1, 'Ana Silva', '(11) 98765-4321', '', '', '', '']], [])
+    second = _write(tmp_path / 'b.xlsx', [],
+                    [[1, 'Ana Silva', '(31) 99999-0000', '', '', '', '']], [])
+    summary = merge_backups([first, second], str(tmp_path / 'merged.xlsx'))
+    assert summary.customers_out == 2
+    assert summary.renamed == ['Ana Silva -> Ana Silva (2)']
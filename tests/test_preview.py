@@ -0,0 +1,60 @@
+"""
+Testes do servidor de pré-visualização (limites de /render)
+"""
+
+import os
+import threading
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from icon_engine.preview import MAX_SIZE, make_server
+
+SOURCE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      'custom_icon.png')
+
+
+@pytest.fixture(scope='module')
+def server():
+    server = make_server(SOURCE, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _status(url):
+    try:
+        with urlopen(url) as response:
+            return response.status
+    except HTTPError as e:
+        return e.code
+
+
+def test_max_size_is_the_largest_target():
+    assert MAX_SIZE == 1024
+
+
+@pytest.mark.parametrize('size, status', [(48, 200), (MAX_SIZE, 200), (MAX_SIZE + 1, 400),
+                                          (100000, 400), (0, 400), (-5, 400), ('abc', 400)])
+def test_render_size_bounds(server, size, status):
+    assert _status(f"{server}/render?variant=plain&size={size}") == status
+
+
+@pytest.mark.parametrize('query', ['variant=rose_gold&size=64&scale=150',
+                                   'variant=rose_gold&size=64&scale=inf',
+                                   'variant=rose_gold&size=64&scale=nan',
+                                   'variant=rose_gold&size=64&scale=1e308',
+                                   'variant=rose_gold&size=64&scale=-2',
+                                   'variant=centered&size=64&padding=inf'])
+def test_render_rejects_oversized_or_invalid_params(server, query):
+    assert _status(f"{server}/render?{query}") == 400
+
+
+def test_target_rejects_oversized_params(server):
+    path = 'android/app/src/main/res/mipmap-mdpi/ic_launcher_foreground.png'
+    assert _status(f"{server}/target?preset=perfect&path={path}") == 200
+    assert _status(f"{server}/target?preset=perfect&path={path}&scale=150") == 400
+    assert _status(f"{server}/target?preset=perfect&path={path}&scale=inf") == 400
@@ -0,0 +1,99 @@
+"""
+Testes da recompressão: o PNG gravado decodifica nos mesmos pixels
+"""
+
+import io
+import os
+
+import numpy as np
+from PIL import Image
+
+import build_icons
+from icon_engine.recompress import (OPTIMAL, SMALLER, build_outputs, find_pngs, load_index,
+                                    recompress, recompress_png)
+from icon_engine.targets import RES_DIR
+
+
+def _png(img):
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG', compress_level=1)
+    return buffer.getvalue()
+
+
+def _rgba(data):
+    with Image.open(io.BytesIO(data)) as img:
+        return np.asarray(img.convert('RGBA'))
+
+
+def _images():
+    """Uma imagem por candidato (paleta, cinza com/sem alfa, RGB opaco, RGBA cheio)"""
+    rng = np.random.default_rng(7)
+    gradient = np.tile(np.arange(64, dtype=np.uint8) * 4, (64, 1))
+    rgba = rng.integers(0, 256, (64, 64, 4), dtype=np.uint8)
+    few = np.zeros((64, 64, 4), dtype=np.uint8)
+    few[16:48, 16:48] = (232, 180, 184, 255)
+    few[24:40, 24:40] = (0, 0, 0, 128)
+    return {
+        'palette': Image.fromarray(few, 'RGBA'),
+        'gray': Image.fromarray(np.dstack([gradient] * 3 + [np.full_like(gradient, 255)]), 'RGBA'),
+        'gray_alpha': Image.fromarray(np.dstack([gradient] * 3 + [gradient[::-1]]), 'RGBA'),
+        'rgb': Image.fromarray(np.dstack([gradient, gradient.T, gradient[::-1],
+                                          np.full_like(gradient, 255)]), 'RGBA'),
+        'noise': Image.fromarray(rgba, 'RGBA'),
+    }
+
+
+def test_recompressed_png_has_identical_pixels():
+    for name, img in _images().items():
+        data = _png(img)
+        result, candidate = recompress_png(name, data)
+        assert result.status in (SMALLER, OPTIMAL), name
+        if candidate is not None:
+            assert len(candidate) < len(data)
+            assert np.array_equal(_rgba(candidate), _rgba(data)), name
+
+
+def test_recompress_rewrites_tree_and_indexes(tmp_path):
+    originals = {}
+    for name, img in _images().items():
+        path = f"{RES_DIR}/drawable-mdpi/{name}.png"
+        os.makedirs(tmp_path / os.path.dirname(path), exist_ok=True)
+        data = _png(img)
+        (tmp_path / path).write_bytes(data)
+        originals[path] = data
+
+    paths = find_pngs(root=str(tmp_path))
+    assert paths == sorted(originals)
+    results = recompress(paths, root=str(tmp_path))
+    assert any(result.status == SMALLER for result in results)
+    for path, data in originals.items():
+        assert np.array_equal(_rgba((tmp_path / path).read_bytes()), _rgba(data)), path
+    assert set(load_index(str(tmp_path / '.icon_recompress.json'))) == set(originals)
+
+    again = recompress(paths, root=str(tmp_path))
+    assert all(result.status == 'indexed' for result in again)
+
+
+def test_build_outputs_are_not_recompressed(tmp_path):
+    generated = sorted(build_outputs())[0]
+    os.makedirs(tmp_path / os.path.dirname(generated))
+    (tmp_path / generated).write_bytes(_png(_images()['palette']))
+    assert find_pngs(root=str(tmp_path)) == []
+    assert find_pngs(root=str(tmp_path), exclude=()) == [generated]
+
+
+def test_include_build_recompresses_build_outputs(tmp_path, monkeypatch):
+    generated = sorted(build_outputs())[0]
+    other = f"{RES_DIR}/drawable-mdpi/other.png"
+    data = _png(_images()['palette'])
+    for path in (generated, other):
+        os.makedirs(tmp_path / os.path.dirname(path), exist_ok=True)
+        (tmp_path / path).write_bytes(data)
+    monkeypatch.chdir(tmp_path)
+
+    assert build_icons.main(['recompress', RES_DIR, '--quiet']) == 0
+    assert (tmp_path / generated).read_bytes() == data
+    assert len((tmp_path / other).read_bytes()) < len(data)
+
+    assert build_icons.main(['recompress', RES_DIR, '--quiet', '--include-build']) == 0
+    assert len((tmp_path / generated).read_bytes()) < len(data)
@@ -0,0 +1,89 @@
+"""
+Build de release x scripts originais: cada preset grava os mesmos bytes que
+o script create_*.py/generate_app_icons.py que ele substitui
+
+Diferenças conhecidas, em que a build corrige o script:
+- ICO: o script passa o quadro de 16px como base e o Pillow descarta os
+  maiores; a build grava todos. Cada quadro do script tem de ter os mesmos
+  pixels na build.
+- centered: o thumbnail() do script reduz a imagem compartilhada no lugar,
+  então só o primeiro tamanho parte da mestre (os demais reaproveitam a cópia
+  já reduzida). Só esse primeiro arquivo é comparado.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+
+import numpy as np
+from PIL import Image
+import pytest
+
+from icon_engine import DirectorySink, build, collect_targets
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# preset -> script original que ele reproduz
+SCRIPTS = {
+    'app': 'generate_app_icons.py',
+    'perfect': 'create_perfect_icons.py',
+    'adaptive': 'create_adaptive_icons.py',
+    'centered': 'create_adaptive_icons_centered.py',
+}
+
+# Camadas temáticas: só a build gera
+THEMED = ('ic_launcher_monochrome.png', 'ic_notification.png')
+
+# Presets em que só parte dos arquivos do script é comparável (ver acima)
+COMPARED = {
+    'centered': {'android/app/src/main/res/drawable-mdpi/ic_launcher_foreground.png'},
+}
+
+
+def _ico_frames(path):
+    with Image.open(path) as ico:
+        frames = {}
+        for size in ico.info['sizes']:
+            ico.size = size
+            frames[size] = np.asarray(ico.convert('RGBA'))
+        return frames
+
+
+def _files(root):
+    files = {}
+    for directory, _, names in os.walk(root):
+        for name in names:
+            if name not in THEMED:
+                path = os.path.join(directory, name)
+                files[os.path.relpath(path, root).replace(os.sep, '/')] = path
+    return files
+
+
+@pytest.mark.parametrize('preset', sorted(SCRIPTS))
+def test_release_build_matches_original_script(tmp_path, preset):
+    script_dir = tmp_path / 'script'
+    script_dir.mkdir()
+    shutil.copy(os.path.join(ROOT, 'custom_icon.png'), script_dir)
+    subprocess.run([sys.executable, os.path.join(ROOT, SCRIPTS[preset])], cwd=script_dir,
+                   check=True, capture_output=True)
+    os.remove(script_dir / 'custom_icon.png')
+
+    out = tmp_path / 'build'
+    results = build(collect_targets([preset]), os.path.join(ROOT, 'custom_icon.png'),
+                    DirectorySink(str(out)))
+    assert all(result.ok for result in results)
+
+    expected = _files(script_dir)
+    produced = _files(out)
+    assert expected and sorted(produced) == sorted(expected)
+    for path, original in expected.items():
+        if preset in COMPARED and path not in COMPARED[preset]:
+            continue
+        if path.endswith('.ico'):
+            built = _ico_frames(produced[path])
+            for size, pixels in _ico_frames(original).items():
+                assert np.array_equal(built[size], pixels), (path, size)
+            continue
+        with open(original, 'rb') as a, open(produced[path], 'rb') as b:
+            assert a.read() == b.read(), path
@@ -0,0 +1,79 @@
+"""
+Testes dos relatórios: séries incrementais x relatório completo com pedidos editados
+"""
+
+import sqlite3
+
+import pytest
+
+from backup_tools.convert import create_schema
+from backup_tools.report import Rollups, build_report
+
+DAY = '2024-03-10 12:00:00'
+
+
+@pytest.fixture
+def connection():
+    connection = sqlite3.connect(':memory:', isolation_level=None)
+    create_schema(connection)
+    connection.execute("INSERT INTO products (id, name, quantity, cost_price) "
+                       "VALUES (1, 'Sutiã', 5, 10)")
+    connection.execute("INSERT INTO customers (id, name) VALUES (1, 'Ana')")
+    connection.execute("INSERT INTO orders (id, customer_id, total_amount, paid_amount, "
+                       "created_at) VALUES (1, 1, 100, 0, ?)", (DAY,))
+    _insert_item(connection, quantity=2)
+    yield connection
+    connection.close()
+
+
+def _insert_item(connection, quantity):
+    connection.execute("INSERT INTO order_items (order_id, product_id, quantity, unit_price, "
+                       "total_price) VALUES (1, 1, ?, 50, ?)", (quantity, quantity * 50.0))
+
+
+def _totals(rollups):
+    (_, values), = rollups.daily()
+    return values['revenue'], values['cost']
+
+
+def _report_totals(connection):
+    report = build_report(connection, today=0)
+    return report.total.revenue, report.total.cost
+
+
+def test_rollup_rebuilds_after_payment_and_item_reinsert(connection, tmp_path):
+    rollups = Rollups()
+    rollups.update(connection)
+    assert _totals(rollups) == (0.0, 20.0)
+    path = str(tmp_path / 'rollups.json')
+    rollups.save(path)
+
+    # Como database.js: pagamento registrado e itens do pedido regravados
+    connection.execute("UPDATE orders SET paid_amount = 100 WHERE id = 1")
+    connection.execute("DELETE FROM order_items WHERE order_id = 1")
+    _insert_item(connection, quantity=2)
+
+    rollups = Rollups.load(path)
+    rollups.update(connection)
+    assert rollups.rebuilt
+    assert _totals(rollups) == _report_totals(connection) == (100.0, 20.0)
+
+
+def test_rollup_only_adds_appended_rows(connection):
+    rollups = Rollups()
+    rollups.update(connection)
+    connection.execute("INSERT INTO orders (id, customer_id, total_amount, paid_amount, "
+                       "created_at) VALUES (2, 1, 50, 50, ?)", (DAY,))
+    assert rollups.update(connection) == (1, 0)
+    assert not rollups.rebuilt
+    assert _totals(rollups) == _report_totals(connection) == (50.0, 20.0)
+
+
+def test_rollup_rebuilds_when_order_total_changes(connection):
+    rollups = Rollups()
+    rollups.update(connection)
+    connection.execute("UPDATE orders SET total_amount = 80 WHERE id = 1")
+    rollups.update(connection)
+    assert rollups.rebuilt
+    (_, values), = rollups.daily()
+    assert values['billed'] == 80.0
@@ -0,0 +1,62 @@
+"""
+Testes do MemoryScheduler (reuso entre execuções) e da admissão compartilhada com o aio
+"""
+
+import asyncio
+
+from PIL import Image
+
+from icon_engine import DirectorySink, MemoryScheduler, Target, build, build_async
+from icon_engine.scheduler import admit_next
+
+
+def test_map_twice_on_same_scheduler():
+    scheduler = MemoryScheduler(max_workers=2)
+    first = list(scheduler.map(lambda job: job * 2, [1, 2, 3], [1, 1, 1]))
+    second = list(scheduler.map(lambda job: job + 1, [1, 2], [1, 1]))
+    assert first == [2, 4, 6]
+    assert second == [2, 3]
+
+
+def test_map_after_abandoned_iteration():
+    scheduler = MemoryScheduler(max_workers=1)
+    results = scheduler.map(lambda job: job, [1, 2, 3], [1, 1, 1])
+    assert next(results) == 1
+    results.close()  # Consumidor parou no meio: o finally cancela só este map
+    assert list(scheduler.map(lambda job: -job, [4, 5], [1, 1])) == [-4, -5]
+
+
+def test_build_twice_with_same_scheduler(tmp_path):
+    master = Image.new('RGBA', (64, 64), (200, 40, 80, 255))
+    targets = [Target('a/icon-16.png', 'plain', 16), Target('a/icon-32.png', 'plain', 32)]
+    scheduler = MemoryScheduler(max_workers=2)
+    for run in ('one', 'two'):
+        results = build(targets, master, DirectorySink(str(tmp_path / run)), scheduler=scheduler)
+        assert [result.ok for result in results] == [True, True]
+    assert (tmp_path / 'one/a/icon-32.png').read_bytes() == \
+        (tmp_path / 'two/a/icon-32.png').read_bytes()
+
+
+def test_admit_next_respects_budget_and_workers():
+    estimates = [60, 50, 30]
+    pending = [0, 1, 2]
+    # Nada rodando: o primeiro entra mesmo maior que o disponível
+    assert admit_next(pending, estimates, 0, 0, 40, 4) == (0, 60)
+    # Só o job de 30 cabe ao lado do de 60 num orçamento de 100
+    assert admit_next(pending, estimates, 1, 60, 100, 4) == (2, 30)
+    assert admit_next(pending, estimates, 2, 90, 100, 4) == (None, 0)
+    assert admit_next(pending, estimates, 2, 0, 1000, 2) == (None, 0)
+    assert pending == [1]
+
+
+def test_build_async_matches_build(tmp_path):
+    master = Image.new('RGBA', (64, 64), (200, 40, 80, 255))
+    targets = [Target(f'a/icon-{size}.png', 'plain', size) for size in (16, 32, 48)]
+    build(targets, master, DirectorySink(str(tmp_path / 'sync')),
+          scheduler=MemoryScheduler(budget=1, max_workers=2))
+    results = asyncio.run(build_async(targets, master, DirectorySink(str(tmp_path / 'async')),
+                                      max_workers=2, budget=1))
+    assert [result.ok for result in results] == [True] * 3
+    for target in targets:
+        assert (tmp_path / 'sync' / target.path).read_bytes() == \
+            (tmp_path / 'async' / target.path).read_bytes()
@@ -0,0 +1,27 @@
+"""
+Testes das verificações de tipo do esquema com números fora do float
+"""
+
+import pytest
+
+from backup_tools.convert import integer, real
+from backup_tools.schema import PRODUCTS, check_value, to_number
+
+QUANTITY = PRODUCTS.column('Quantidade em Estoque')
+COST = PRODUCTS.column('Preço de Custo')
+
+
+@pytest.mark.parametrize('value', ['inf', '-inf', 'nan', '1e999', float('inf'), float('nan')])
+def test_non_finite_values_are_not_numbers(value):
+    assert to_number(value) is None
+    assert check_value(QUANTITY, value)
+    assert check_value(COST, value)
+    assert integer(value) == 0
+    assert real(value) == 0.0
+
+
+def test_finite_values_still_convert():
+    assert to_number('12,5') == 12.5
+    assert check_value(QUANTITY, 3) is None
+    assert check_value(QUANTITY, '3,5')
+    assert check_value(COST, '1e3') is None
@@ -0,0 +1,120 @@
+"""
+Testes dos caminhos de erro da leitura de XLSX (células que não batem com o tipo)
+"""
+
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+
+import pytest
+
+from backup_tools.schema import SHEETS
+from backup_tools.validate import validate_file, validate_many
+from backup_tools.xlsx import SharedStringsXlsxWriter, XlsxError, XlsxReader, XlsxWriter
+
+QUANTITY = 12345
+
+
+def _write_backup(path, writer_class=XlsxWriter):
+    with writer_class(str(path)) as writer:
+        for sheet in SHEETS:
+            with writer.sheet(sheet.name, sheet.headers) as rows:
+                if sheet.name == 'Produtos':
+                    rows.write_row([1, 'Camiseta', QUANTITY, 19.9, '01/01/2024', '01/01/2024'])
+    return path
+
+
+def _rewrite(path, name, change):
+    """Reescreve o backup trocando a parte name por change(bytes) (None = remove)"""
+    with zipfile.ZipFile(path) as source:
+        entries = [(info, source.read(info)) for info in source.infolist()]
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as target:
+        for info, data in entries:
+            if info.filename == name:
+                data = change(data)
+                if data is None:
+                    continue
+            target.writestr(info, data)
+    return path
+
+
+def _patch_sheet(path, pattern, replacement):
+    """Reescreve a primeira aba do backup trocando pattern por replacement"""
+    def change(data):
+        data, count = re.subn(pattern.encode(), replacement.encode(), data)
+        assert count
+        return data
+    return _rewrite(path, 'xl/worksheets/sheet1.xml', change)
+
+
+def test_valid_backup_has_no_errors(tmp_path):
+    report = validate_file(str(_write_backup(tmp_path / 'ok.xlsx')))
+    assert report.ok, report.errors
+
+
+def test_bad_number_raises_xlsx_error_with_cell(tmp_path):
+    path = _patch_sheet(_write_backup(tmp_path / 'bad.xlsx'),
+                        f'<v>{QUANTITY}</v>', '<v>doze</v>')
+    with XlsxReader(str(path)) as reader, pytest.raises(XlsxError, match=r'Produtos.*C2.*doze'):
+        list(reader.iter_rows('Produtos'))
+
+
+def test_shared_string_out_of_range_is_reported(tmp_path):
+    path = _patch_sheet(_write_backup(tmp_path / 'sst.xlsx', SharedStringsXlsxWriter),
+                        r't="s"><v>\d+</v>', 't="s"><v>999</v>')
+    report = validate_file(str(path))
+    assert not report.ok
+    assert any('A1' in error and '999' in error for error in report.errors)
+
+
+def test_negative_shared_string_index_is_an_error(tmp_path):
+    path = _patch_sheet(_write_backup(tmp_path / 'negative.xlsx', SharedStringsXlsxWriter),
+                        r't="s"><v>\d+</v>', 't="s"><v>-1</v>')
+    assert not validate_file(str(path)).ok
+
+
+def test_folder_validation_continues_past_bad_file(tmp_path):
+    _patch_sheet(_write_backup(tmp_path / 'a.xlsx'), f'<v>{QUANTITY}</v>', '<v>x</v>')
+    _write_backup(tmp_path / 'b.xlsx')
+    reports = list(validate_many([str(tmp_path)], jobs=1))
+    assert [report.ok for report in reports] == [False, True]
+
+
+@pytest.mark.parametrize('writer_class', [XlsxWriter, SharedStringsXlsxWriter])
+def test_control_characters_round_trip(tmp_path, writer_class):
+    texts = ['Rua A\x0bapto 2', 'linha\x01\x1f', '_x000D_ literal', 'a < b & "c"', 'Maria']
+    path = str(tmp_path / 'controls.xlsx')
+    with writer_class(path) as writer:
+        with writer.sheet('Clientes', ['Endereço']) as rows:
+            for text in texts:
+                rows.write_row([text])
+    with zipfile.ZipFile(path) as archive:
+        for name in archive.namelist():
+            if name.endswith('.xml'):
+                ET.fromstring(archive.read(name))  # XML válido
+    with XlsxReader(path) as reader:
+        values = [row[0] for _, row in reader.iter_rows('Clientes')]
+    assert values == ['Endereço'] + texts
+
+
+def test_truncated_shared_strings_is_reported(tmp_path):
+    path = _rewrite(_write_backup(tmp_path / 'sst.xlsx', SharedStringsXlsxWriter),
+                    'xl/sharedStrings.xml', lambda data: data[:len(data) // 2])
+    with XlsxReader(str(path)) as reader, pytest.raises(XlsxError, match='compartilhadas'):
+        reader.shared_strings
+    report = validate_file(str(path))
+    assert not report.ok and 'compartilhadas' in report.errors[0]
+
+
+def test_missing_sheet_part_is_reported(tmp_path):
+    path = _rewrite(_write_backup(tmp_path / 'missing.xlsx'), 'xl/worksheets/sheet1.xml',
+                    lambda data: None)
+    assert not validate_file(str(path)).ok
+
+
+def test_folder_validation_continues_past_damaged_workbook(tmp_path):
+    _rewrite(_write_backup(tmp_path / 'a.xlsx', SharedStringsXlsxWriter),
+             'xl/sharedStrings.xml', lambda data: data[:20])
+    _write_backup(tmp_path / 'b.xlsx')
+    reports = list(validate_many([str(tmp_path)], jobs=1))
+    assert [report.ok for report in reports] == [False, True]